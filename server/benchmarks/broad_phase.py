@@ -0,0 +1,74 @@
+"""
+Broad-phase benchmark: SpatialHashGrid vs SweepAndPrune.
+
+Each tick every object moves by its velocity and then runs one radius query, which is
+what the engine asks of the broad phase per agent. Two fields are measured:
+
+    dense   the whole field packed into SPREAD_DENSE metres of track, like a race start
+    spread  the field spread evenly around the full lap
+
+    python -m benchmarks.broad_phase --agents 100,1000,5000 --ticks 50
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from configs.settings import (TRACK_LENGTH, TRACK_INNER_RADIUS, TRACK_OUTER_RADIUS,
+                              DEFAULT_SEARCH_RADIUS, MAX_SPEED, SIM_TICK_RATE)
+from sim.engine.sim_engine import BROAD_PHASES
+from utils.track_geometry import position_at
+
+SPREAD_DENSE = 150.0
+LANE_HALF_WIDTH = (TRACK_OUTER_RADIUS - TRACK_INNER_RADIUS) / 2.0 - 5.0
+
+
+def field(n: int, length: float, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Progress, lateral offset and per-tick progress step for `n` objects."""
+    s = rng.uniform(0.0, length, n)
+    lateral = rng.uniform(-LANE_HALF_WIDTH, LANE_HALF_WIDTH, n)
+    step = rng.uniform(0.3, 1.0, n) * MAX_SPEED / SIM_TICK_RATE
+    return s, lateral, step
+
+
+def run(name: str, n: int, length: float, ticks: int, seed: int) -> tuple[float, float]:
+    """Return (seconds per tick, mean candidates per query)."""
+    rng = np.random.default_rng(seed)
+    s, lateral, step = field(n, length, rng)
+    broad_phase = BROAD_PHASES[name]()
+    positions = position_at(s, lateral).tolist()
+    for i, (x, y) in enumerate(positions):
+        broad_phase.insert(i, x, y)
+
+    candidates = 0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        s += step
+        positions = position_at(s, lateral).tolist()
+        for i, (x, y) in enumerate(positions):
+            broad_phase.move(i, x, y)
+        for x, y in positions:
+            candidates += len(broad_phase.query_radius(x, y, DEFAULT_SEARCH_RADIUS))
+    elapsed = time.perf_counter() - start
+    return elapsed / ticks, candidates / (ticks * n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the broad-phase structures")
+    parser.add_argument("--agents", default="100,1000,5000", help="comma-separated field sizes")
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'field':>7} {'agents':>7} {'broad phase':>16} {'ms/tick':>9} {'cand/query':>11}")
+    for layout, length in (('dense', SPREAD_DENSE), ('spread', TRACK_LENGTH)):
+        for n in (int(a) for a in args.agents.split(',')):
+            for name in BROAD_PHASES:
+                per_tick, cand = run(name, n, length, args.ticks, args.seed)
+                print(f"{layout:>7} {n:>7} {name:>16} {per_tick * 1000:>9.2f} {cand:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Lookahead fork benchmark: cost of SimulationEngine.fork() rollouts, and a check that
+they agree with the engine.
+
+Each round forks the whole race, holds one random action per agent for --ticks ticks,
+and times the fork and the step. With --verify the same actions are then applied to the
+engine's own Agent objects, as DecisionScheduler slices them, and the two are compared:
+
+    drift_m     largest position difference among agents the fork did not crash
+    walls       agents the engine integration put off the racing surface that the fork
+                did not crash (should be 0)
+
+    python -m benchmarks.fork_rollout --agents 100,800 --ticks 40 --verify
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from sim.action import ACTION_LIST
+from sim.engine.decision_scheduler import DecisionScheduler
+from sim.engine.sim_engine import SimulationEngine, DT
+from utils.track_sdf import get_track_sdf
+
+from configs.settings import SIM_TICK_RATE, DECISION_TICK_RATE, REPLAN_TTC_THRESHOLD
+
+
+def run(n: int, ticks: int, rounds: int, seed: int, verify: bool) -> dict:
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    engine = SimulationEngine()
+    engine.init_agents(n)
+    ids = engine.world_arrays().ids.tolist()
+
+    fork_s = step_s = 0.0
+    for _ in range(rounds):
+        actions = dict(zip(ids, rng.integers(len(ACTION_LIST), size=len(ids)).tolist()))
+        start = time.perf_counter()
+        fork = engine.fork()
+        forked = time.perf_counter()
+        crashed = fork.step(actions, ticks)
+        fork_s += forked - start
+        step_s += time.perf_counter() - forked
+    result = {'agents': n, 'fork_ms': 1000.0 * fork_s / rounds, 'step_ms': 1000.0 * step_s / rounds}
+    if not verify:
+        return result
+
+    # The engine's agents integrate the last round's actions on their own; contacts
+    # between them are not simulated, so only kinematics and walls are compared.
+    scheduler = DecisionScheduler(round(SIM_TICK_RATE / DECISION_TICK_RATE), REPLAN_TTC_THRESHOLD)
+    agents = engine.world_arrays().agents
+    for agent in agents:
+        scheduler.hold(agent.obj_id, ACTION_LIST[actions[agent.obj_id]])
+        for _ in range(ticks):
+            agent.update_agent_state(DT, scheduler.held(agent.obj_id))
+    positions = np.array([agent.position._v for agent in agents], dtype=float)
+    gap = positions - fork.positions
+    result['drift_m'] = float(np.sqrt(np.einsum('ij,ij->i', gap, gap))[~crashed].max(initial=0.0))
+    result['walls'] = int((~crashed & (get_track_sdf().signed_distance(positions) <= 0.0)).sum())
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and check engine fork rollouts")
+    parser.add_argument("--agents", default="100,800", help="comma-separated field sizes")
+    parser.add_argument("--ticks", type=int, default=40, help="ticks per rollout")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verify", action="store_true",
+                        help="compare the rollout with the engine's own integration")
+    args = parser.parse_args()
+
+    failed = False
+    for n in (int(a) for a in args.agents.split(',')):
+        result = run(n, args.ticks, args.rounds, args.seed, args.verify)
+        line = f"{n:>7} agents: fork {result['fork_ms']:.3f} ms, step {result['step_ms']:.2f} ms"
+        if args.verify:
+            line += f", drift {result['drift_m']:.2e} m, walls missed {result['walls']}"
+            failed |= result['drift_m'] > 1e-6 or result['walls'] > 0
+        print(line)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
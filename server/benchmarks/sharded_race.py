@@ -0,0 +1,529 @@
+"""
+Sharding benchmark: a sector-sharded, multi-process race over shared memory.
+
+This is a standalone simulator, not a mode of SimulationEngine. It has its own array
+agents, policy and contact rules, so its numbers show how far sector sharding can
+scale a race kernel, not what the engine itself achieves.
+
+The track is cut into `num_workers` equal arc-length sectors and each worker process
+owns the agents whose progress falls in its sector. Race state lives in two
+`multiprocessing.shared_memory` buffers: a tick reads one and writes the other, then
+the roles swap. Each tick runs in two phases separated by a barrier:
+
+    decide   owned agents pick an action from the state of every agent within
+             SENSE_WINDOW of arc length (the halo: neighbors in adjacent sectors are
+             read straight from the shared buffer) and integrate one step.
+    contact  owned agents that came into contact with another agent during the step,
+             or left the track surface, crash.
+
+Ownership is recomputed from the shared arc-length column at the start of each tick,
+so an agent that crosses a sector boundary is handed to the neighboring worker on the
+next tick without any message passing.
+
+Results are bit-identical to the single-process kernel (num_workers=0) for the same
+seed: every row is written by exactly one process, per-agent randomness comes from a
+counter-based hash of (seed, tick, agent) instead of a shared generator, decisions use
+only order-independent reductions (minimum, first argmax), and the geometry used for
+decisions avoids transcendental functions whose vectorized results can depend on
+batch layout.
+
+It runs an array-native policy in the spirit of the heuristic controller: the
+object-based controllers read Agent objects through a WorldView and draw from the
+global `random` module, neither of which can be split across processes reproducibly.
+
+    python -m benchmarks.sharded_race --agents 20000 --workers 8 --ticks 200 --verify
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from sim.action import ACTION_NAMES, ACTION_SPEED_FACTORS, ACTION_STEER_RADS
+from utils.track_geometry import (arc_length, heading_at, lateral_frame, position_at,
+                                  MAX_ARC_STRETCH)
+
+from configs.settings import (
+    AGENT_RADIUS,
+    DEFAULT_SEARCH_RADIUS,
+    DEFAULT_TIME_HORIZON_LOWER,
+    DEFAULT_TIME_HORIZON_UPPER,
+    LEFT_RECT_HALF,
+    MAX_SPEED,
+    SIM_TICK_RATE,
+    TRACK_INNER_RADIUS,
+    TRACK_OUTER_RADIUS,
+    TRACK_LENGTH,
+)
+
+DT = 1.0 / SIM_TICK_RATE
+EPS = np.finfo(float).eps
+HALF_WIDTH = (TRACK_OUTER_RADIUS - TRACK_INNER_RADIUS) / 2.0
+WALL_CLEARANCE = HALF_WIDTH - AGENT_RADIUS
+SPAWN_SPEED_MIN = 50.0
+
+MAINTAIN = ACTION_NAMES.index('maintain')
+ACCEL = ACTION_NAMES.index('accel_soft')
+ACCEL_PROBABILITY = 0.4
+COS_STEER = np.cos(ACTION_STEER_RADS)
+SIN_STEER = np.sin(ACTION_STEER_RADS)
+
+# Arc-length half-widths of the neighbor searches; MAX_ARC_STRETCH turns a Euclidean
+# radius into the arc-length window that is guaranteed to contain it.
+SENSE_WINDOW = DEFAULT_SEARCH_RADIUS * MAX_ARC_STRETCH
+CONTACT_WINDOW = AGENT_RADIUS * MAX_ARC_STRETCH
+
+# (name, per-row shape, dtype) of each double-buffered state column.
+STATE_FIELDS: tuple[tuple[str, tuple[int, ...], str], ...] = (
+    ('positions', (2,), 'f8'),
+    ('directions', (2,), 'f8'),
+    ('speeds', (), 'f8'),
+    ('arcs', (), 'f8'),
+    ('laps', (), 'i8'),
+    ('crashed', (), '?'),
+)
+_ALIGNMENT = 64
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+# -----------------------------------------------------
+# Counter-based randomness
+# -----------------------------------------------------
+def _splitmix64(z: np.ndarray) -> np.ndarray:
+    z = (z ^ (z >> np.uint64(30))) * _MIX1
+    z = (z ^ (z >> np.uint64(27))) * _MIX2
+    return z ^ (z >> np.uint64(31))
+
+
+def hash_uniform(seed: int, stream: int, tick: int, rows: np.ndarray) -> np.ndarray:
+    """
+    Uniform [0, 1) draws that are a pure function of (seed, stream, tick, row), so any
+    process can reproduce the draw for any agent without sharing generator state.
+    """
+    key = (seed * 0x100000001B3 + stream * 0x10001 + tick) & 0xFFFFFFFFFFFFFFFF
+    with np.errstate(over='ignore'):
+        z = _splitmix64(rows.astype(np.uint64) * _GOLDEN + _splitmix64(np.array(key, dtype=np.uint64)))
+    return (z >> np.uint64(11)).astype(float) * (1.0 / (1 << 53))
+
+
+# -----------------------------------------------------
+# Shared state
+# -----------------------------------------------------
+class StateBuffer:
+    """One tick's worth of race state as named column views."""
+
+    __slots__ = tuple(name for name, _, _ in STATE_FIELDS)
+
+    def copy(self) -> StateBuffer:
+        out = StateBuffer.__new__(StateBuffer)
+        for name in self.__slots__:
+            setattr(out, name, getattr(self, name).copy())
+        return out
+
+
+class SharedRaceState:
+    """
+    Two StateBuffers plus an ownership column and a control block, laid out in one
+    shared-memory segment. The creating process owns the segment and unlinks it.
+    """
+
+    __slots__ = ('num_agents', 'shm', 'buffers', 'owner', 'control', '_created')
+
+    def __init__(self, num_agents: int, name: str | None = None):
+        self.num_agents = num_agents
+        layout, size = self._layout(num_agents)
+        self._created = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self._created, size=max(size, 1))
+
+        def view(offset, shape, dtype):
+            return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+
+        self.buffers = []
+        for b in range(2):
+            buffer = StateBuffer.__new__(StateBuffer)
+            for field, shape, dtype in STATE_FIELDS:
+                setattr(buffer, field, view(layout[f'{b}.{field}'], (num_agents,) + shape, dtype))
+            self.buffers.append(buffer)
+        self.owner = view(layout['owner'], (num_agents,), 'i2')
+        # [ticks to run (-1 = shut down), first tick]
+        self.control = view(layout['control'], (2,), 'i8')
+
+    @staticmethod
+    def _layout(num_agents: int) -> tuple[dict[str, int], int]:
+        """Byte offset of every column, each aligned to _ALIGNMENT, and the total size."""
+        columns = [(f'{b}.{field}', num_agents * int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize)
+                   for b in range(2) for field, shape, dtype in STATE_FIELDS]
+        columns += [('owner', num_agents * 2), ('control', 16)]
+        layout = {}
+        offset = 0
+        for name, nbytes in columns:
+            offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+            layout[name] = offset
+            offset += nbytes
+        return layout, offset
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self) -> None:
+        # Views must go before the mapping can be closed.
+        self.buffers = []
+        self.owner = self.control = None
+        self.shm.close()
+        if self._created:
+            self.shm.unlink()
+
+
+# -----------------------------------------------------
+# Kernel
+# -----------------------------------------------------
+def sector_of(arcs: np.ndarray, num_sectors: int) -> np.ndarray:
+    return np.minimum((arcs * (num_sectors / TRACK_LENGTH)).astype(np.intp), num_sectors - 1)
+
+
+def rows_near_sector(arcs: np.ndarray, sector: int, num_sectors: int, margin: float) -> np.ndarray:
+    """Rows whose progress lies in `sector` or within `margin` of it, across the finish line."""
+    if num_sectors == 1 or 2 * margin >= TRACK_LENGTH:
+        return np.arange(len(arcs))
+    length = TRACK_LENGTH / num_sectors
+    offset = np.mod(arcs - (sector * length - margin), TRACK_LENGTH)
+    return np.flatnonzero(offset <= length + 2 * margin)
+
+
+def window_pairs(query_rows: np.ndarray, query_arcs: np.ndarray, candidate_rows: np.ndarray,
+                 candidate_arcs: np.ndarray, width: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    All (query, candidate) row pairs whose progress differs by at most `width`, across
+    the finish line, excluding self pairs. Pairs come out grouped by query, in the
+    order of `query_rows`.
+    """
+    order = np.argsort(candidate_arcs, kind='stable')
+    sorted_arcs = candidate_arcs[order]
+    # Copies shifted by one lap either way make the wrap-around a plain range search.
+    ext_arcs = np.concatenate([sorted_arcs - TRACK_LENGTH, sorted_arcs, sorted_arcs + TRACK_LENGTH])
+    ext_rows = np.tile(candidate_rows[order], 3)
+
+    lo = np.searchsorted(ext_arcs, query_arcs - width, side='left')
+    hi = np.searchsorted(ext_arcs, query_arcs + width, side='right')
+    counts = hi - lo
+    first = np.cumsum(counts) - counts
+    i = np.repeat(query_rows, counts)
+    j = ext_rows[np.arange(counts.sum()) + np.repeat(lo - first, counts)]
+    keep = i != j
+    return i[keep], j[keep]
+
+
+def group_min(values: np.ndarray, groups: np.ndarray, size: int) -> np.ndarray:
+    """Minimum of `values` per non-decreasing group index, inf for empty groups."""
+    out = np.full(size, np.inf)
+    if len(values):
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        out[groups[starts]] = np.minimum.reduceat(values, starts)
+    return out
+
+
+def agent_ttc(dp: np.ndarray, dv: np.ndarray) -> np.ndarray:
+    """Vectorized controllers.heuristics.ttc.ttc_to_agent over (K, 2) offsets and relative velocities."""
+    a = dv[:, 0] * dv[:, 0] + dv[:, 1] * dv[:, 1]
+    b = 2.0 * (dv[:, 0] * dp[:, 0] + dv[:, 1] * dp[:, 1])
+    c = dp[:, 0] * dp[:, 0] + dp[:, 1] * dp[:, 1] - AGENT_RADIUS * AGENT_RADIUS
+    disc = b * b - 4.0 * a * c
+    valid = (a > EPS) & (disc >= 0.0)
+    root = np.sqrt(np.where(valid, disc, 0.0))
+    two_a = np.where(valid, 2.0 * a, 1.0)
+    t1 = (-b - root) / two_a
+    t2 = (-b + root) / two_a
+    return np.where(valid, np.where(t1 >= 0.0, t1, np.where(t2 >= 0.0, t2, np.inf)), np.inf)
+
+
+def wall_ttc(lateral: np.ndarray, normals: np.ndarray, velocities: np.ndarray) -> np.ndarray:
+    """Time until the lateral offset reaches either boundary, holding the normal fixed."""
+    rate = normals[:, 0] * velocities[:, 0] + normals[:, 1] * velocities[:, 1]
+    safe = np.where(np.abs(rate) > EPS, rate, 1.0)
+    out = np.where(rate > EPS, (WALL_CLEARANCE - lateral) / safe,
+                   np.where(rate < -EPS, (lateral + WALL_CLEARANCE) / -safe, np.inf))
+    return np.maximum(out, 0.0)
+
+
+def _rotate(directions: np.ndarray, actions: np.ndarray) -> np.ndarray:
+    c = COS_STEER[actions]
+    s = SIN_STEER[actions]
+    dx = directions[:, 0]
+    dy = directions[:, 1]
+    return np.column_stack([dx * c - dy * s, dx * s + dy * c])
+
+
+def _evasive_actions(threatened: np.ndarray, li: np.ndarray, pair_dp: np.ndarray,
+                     pair_vj: np.ndarray, directions: np.ndarray, speeds: np.ndarray,
+                     lateral: np.ndarray, normals: np.ndarray) -> np.ndarray:
+    """For threatened local rows, the action that maximizes the smallest TTC (first wins ties)."""
+    # Work on the threatened rows and their pairs only, renumbered 0..len(threatened).
+    in_pairs = np.isin(li, threatened)
+    tli = np.searchsorted(threatened, li[in_pairs])
+    pair_dp = pair_dp[in_pairs]
+    pair_vj = pair_vj[in_pairs]
+    directions = directions[threatened]
+    speeds = speeds[threatened]
+    lateral = lateral[threatened]
+    normals = normals[threatened]
+
+    n = len(threatened)
+    best_score = np.full(n, -np.inf)
+    best = np.full(n, MAINTAIN, dtype=np.intp)
+    for action in range(len(ACTION_NAMES)):
+        velocities = _rotate(directions, np.full(n, action, dtype=np.intp)) \
+            * (speeds * ACTION_SPEED_FACTORS[action])[:, None]
+        score = np.minimum(
+            group_min(agent_ttc(pair_dp, velocities[tli] - pair_vj), tli, n),
+            wall_ttc(lateral, normals, velocities),
+        )
+        better = score > best_score
+        best[better] = action
+        best_score[better] = score[better]
+    return best
+
+
+def decide_and_move(rows: np.ndarray, prev: StateBuffer, nxt: StateBuffer,
+                    candidates: np.ndarray, tick: int, seed: int) -> None:
+    """Phase 1: choose actions for `rows` from `prev` and write their next state to `nxt`."""
+    crashed = prev.crashed[rows]
+    parked = rows[crashed]
+    for name, _, _ in STATE_FIELDS:
+        getattr(nxt, name)[parked] = getattr(prev, name)[parked]
+
+    moving = rows[~crashed]
+    if not len(moving):
+        return
+    positions = prev.positions[moving]
+    directions = prev.directions[moving]
+    speeds = prev.speeds[moving]
+    velocities = directions * speeds[:, None]
+
+    i, j = window_pairs(moving, prev.arcs[moving], candidates, prev.arcs[candidates], SENSE_WINDOW)
+    pair_dp = prev.positions[i] - prev.positions[j]
+    # The window spans the full track width; keep the neighbors inside the sensing radius.
+    near = (pair_dp[:, 0] * pair_dp[:, 0] + pair_dp[:, 1] * pair_dp[:, 1]
+            <= DEFAULT_SEARCH_RADIUS * DEFAULT_SEARCH_RADIUS)
+    i, j, pair_dp = i[near], j[near], pair_dp[near]
+    li = np.searchsorted(moving, i)
+    pair_vj = prev.directions[j] * prev.speeds[j, None]
+    nearest = group_min(agent_ttc(pair_dp, velocities[li] - pair_vj), li, len(moving))
+    lateral, normals = lateral_frame(positions)
+    wall = wall_ttc(lateral, normals, velocities)
+
+    horizon = DEFAULT_TIME_HORIZON_LOWER + (
+        DEFAULT_TIME_HORIZON_UPPER - DEFAULT_TIME_HORIZON_LOWER) * hash_uniform(seed, 0, tick, moving)
+    accelerate = (speeds < MAX_SPEED) & (hash_uniform(seed, 1, tick, moving) < ACCEL_PROBABILITY)
+    actions = np.where(accelerate, ACCEL, MAINTAIN)
+    threatened = np.flatnonzero(np.minimum(nearest, wall) <= horizon)
+    if len(threatened):
+        actions[threatened] = _evasive_actions(threatened, li, pair_dp, pair_vj, directions,
+                                               speeds, lateral, normals)
+
+    new_speeds = speeds * ACTION_SPEED_FACTORS[actions]
+    new_directions = _rotate(directions, actions)
+    new_positions = positions + new_directions * (new_speeds * DT)[:, None]
+
+    # A lap completes on crossing the start/finish line at the right end of the top straight.
+    crossed = ((positions[:, 0] > LEFT_RECT_HALF) & (new_positions[:, 0] <= LEFT_RECT_HALF)
+               & (new_positions[:, 1] > 0.0))
+
+    nxt.positions[moving] = new_positions
+    nxt.directions[moving] = new_directions
+    nxt.speeds[moving] = new_speeds
+    nxt.arcs[moving] = arc_length(new_positions)
+    nxt.laps[moving] = prev.laps[moving] + crossed
+    nxt.crashed[moving] = False
+
+
+def resolve_contacts(rows: np.ndarray, prev: StateBuffer, nxt: StateBuffer,
+                     candidates: np.ndarray) -> None:
+    """Phase 2: crash `rows` that made new contact with an agent or left the track this tick."""
+    moving = rows[~prev.crashed[rows]]
+    if not len(moving):
+        return
+    i, j = window_pairs(moving, nxt.arcs[moving], candidates, nxt.arcs[candidates], CONTACT_WINDOW)
+    radius_sq = AGENT_RADIUS * AGENT_RADIUS
+    gap_next = nxt.positions[i] - nxt.positions[j]
+    gap_prev = prev.positions[i] - prev.positions[j]
+    touching = (gap_next[:, 0] * gap_next[:, 0] + gap_next[:, 1] * gap_next[:, 1]) <= radius_sq
+    touched = (gap_prev[:, 0] * gap_prev[:, 0] + gap_prev[:, 1] * gap_prev[:, 1]) <= radius_sq
+
+    hit = np.zeros(len(nxt.crashed), dtype=bool)
+    hit[i[touching & ~touched]] = True
+    lateral, _ = lateral_frame(nxt.positions[moving])
+    hit[moving[np.abs(lateral) > WALL_CLEARANCE]] = True
+
+    crashing = moving[hit[moving]]
+    nxt.crashed[crashing] = True
+    nxt.speeds[crashing] = 0.0
+
+
+def contact_margin(nxt: StateBuffer) -> float:
+    """Sector margin for phase 2: the contact window plus the furthest any agent moved."""
+    top_speed = float(nxt.speeds.max()) if len(nxt.speeds) else 0.0
+    return CONTACT_WINDOW + 2.0 * MAX_ARC_STRETCH * top_speed * DT
+
+
+def step_sector(sector: int, num_sectors: int, prev: StateBuffer, nxt: StateBuffer,
+                tick: int, seed: int, owner: np.ndarray, barrier=None) -> None:
+    """Run one tick for one sector; `barrier` separates the phases across workers."""
+    owned = np.flatnonzero(sector_of(prev.arcs, num_sectors) == sector)
+    decide_and_move(owned, prev, nxt, rows_near_sector(prev.arcs, sector, num_sectors, SENSE_WINDOW),
+                    tick, seed)
+    owner[owned] = sector
+    if barrier is not None:
+        barrier.wait()
+    halo = rows_near_sector(nxt.arcs, sector, num_sectors, contact_margin(nxt))
+    resolve_contacts(owned, prev, nxt, halo)
+    if barrier is not None:
+        barrier.wait()
+
+
+def _worker(sector: int, num_sectors: int, shm_name: str, num_agents: int, seed: int,
+            start: mp.Barrier, phase: mp.Barrier, done: mp.Barrier) -> None:
+    state = SharedRaceState(num_agents, shm_name)
+    try:
+        while True:
+            start.wait()
+            ticks, first_tick = state.control.tolist()
+            if ticks < 0:
+                return
+            for tick in range(first_tick, first_tick + ticks):
+                step_sector(sector, num_sectors, state.buffers[tick % 2],
+                            state.buffers[(tick + 1) % 2], tick, seed, state.owner, phase)
+            done.wait()
+    finally:
+        state.close()
+
+
+# -----------------------------------------------------
+# Driver
+# -----------------------------------------------------
+class ShardedRace:
+    """
+    A race of `num_agents` array agents stepped by `num_workers` sector processes.
+
+    With num_workers=0 the same kernel runs in this process over the whole track; it
+    is the reference the sharded run must reproduce exactly.
+    """
+
+    __slots__ = ('num_agents', 'num_workers', 'seed', 'tick', 'handoffs', '_state',
+                 '_processes', '_start', '_done', '_last_owner')
+
+    def __init__(self, num_agents: int, num_workers: int = 4, seed: int = 0):
+        self.num_agents = num_agents
+        self.num_workers = num_workers
+        self.seed = seed
+        self.tick = 0
+        self.handoffs = 0
+        self._state = SharedRaceState(num_agents)
+        self._spawn(self._state.buffers[0], np.random.default_rng(seed))
+        self._state.owner[:] = sector_of(self._state.buffers[0].arcs, max(num_workers, 1))
+        self._last_owner = self._state.owner.copy()
+        self._processes: list[mp.Process] = []
+
+        if num_workers > 0:
+            self._start = mp.Barrier(num_workers + 1)
+            self._done = mp.Barrier(num_workers + 1)
+            phase = mp.Barrier(num_workers)
+            for sector in range(num_workers):
+                process = mp.Process(
+                    target=_worker, daemon=True,
+                    args=(sector, num_workers, self._state.name, num_agents, seed,
+                          self._start, phase, self._done))
+                process.start()
+                self._processes.append(process)
+
+    def _spawn(self, buffer: StateBuffer, rng: np.random.Generator) -> None:
+        s = rng.uniform(0.0, TRACK_LENGTH, self.num_agents)
+        lateral = rng.uniform(-WALL_CLEARANCE + AGENT_RADIUS, WALL_CLEARANCE - AGENT_RADIUS,
+                              self.num_agents)
+        buffer.positions[:] = position_at(s, lateral)
+        buffer.directions[:] = heading_at(s)
+        buffer.speeds[:] = rng.uniform(SPAWN_SPEED_MIN, MAX_SPEED, self.num_agents)
+        buffer.arcs[:] = arc_length(buffer.positions)
+        buffer.laps[:] = 0
+        buffer.crashed[:] = False
+
+    def step(self, ticks: int = 1) -> None:
+        """Advance the race by `ticks` ticks."""
+        if ticks <= 0:
+            return
+        state = self._state
+        if self.num_workers == 0:
+            for tick in range(self.tick, self.tick + ticks):
+                step_sector(0, 1, state.buffers[tick % 2], state.buffers[(tick + 1) % 2],
+                            tick, self.seed, state.owner)
+        else:
+            state.control[:] = (ticks, self.tick)
+            self._start.wait()
+            self._done.wait()
+        self.tick += ticks
+        self.handoffs += int(np.count_nonzero(state.owner != self._last_owner))
+        self._last_owner[:] = state.owner
+
+    def current(self) -> StateBuffer:
+        """A private copy of the state after the last completed tick."""
+        return self._state.buffers[self.tick % 2].copy()
+
+    def close(self) -> None:
+        if self._processes:
+            self._state.control[:] = (-1, self.tick)
+            self._start.wait()
+            for process in self._processes:
+                process.join()
+            self._processes = []
+        self._state.close()
+
+    def __enter__(self) -> ShardedRace:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a standalone sector-sharded race")
+    parser.add_argument("--agents", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=max(1, (mp.cpu_count() or 2) - 1))
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verify", action="store_true",
+                        help="also run single-process and check the results are identical")
+    args = parser.parse_args()
+
+    with ShardedRace(args.agents, args.workers, args.seed) as race:
+        start = time.perf_counter()
+        race.step(args.ticks)
+        elapsed = time.perf_counter() - start
+        sharded = race.current()
+        handoffs = race.handoffs
+    rate = args.ticks / elapsed
+    print(f"{args.agents} agents, {args.workers} workers: {rate:.1f} ticks/s "
+          f"({rate / SIM_TICK_RATE:.2f}x real time), {handoffs} handoffs, "
+          f"{int(sharded.crashed.sum())} crashed")
+
+    if args.verify:
+        with ShardedRace(args.agents, 0, args.seed) as reference:
+            start = time.perf_counter()
+            reference.step(args.ticks)
+            elapsed = time.perf_counter() - start
+            single = reference.current()
+        identical = all(np.array_equal(getattr(single, name), getattr(sharded, name))
+                        for name, _, _ in STATE_FIELDS)
+        print(f"single process: {args.ticks / elapsed:.1f} ticks/s; "
+              f"results {'identical' if identical else 'DIFFER'}")
+        if not identical:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import math
 import os
 import yaml
 
@@ -17,13 +18,28 @@ MAX_SPEED = cfg['max_speed']
 LAP_LIMIT = cfg['lap_limit']
 DEFAULT_SEARCH_RADIUS = cfg['default_search_radius']
 DEFAULT_CONTROLLER = cfg['default_controller']
+# registry name -> weight; falls back to an all-default-controller field
+CONTROLLER_MIX = cfg['controller_mix'] or {DEFAULT_CONTROLLER: 1.0}
 DEFAULT_TIME_HORIZON_UPPER = cfg['default_time_horizon_upper']
 DEFAULT_TIME_HORIZON_LOWER = cfg['default_time_horizon_lower']
 LEFT_RECT_HALF = cfg['left_rect_half']
 TRACK_INNER_RADIUS = cfg['track_inner_radius']
 TRACK_OUTER_RADIUS = cfg['track_outer_radius']
+# centerline length of the oval: two straights of 2 * left_rect_half plus two mid-radius semicircles
+TRACK_LENGTH = 4 * LEFT_RECT_HALF + math.pi * (TRACK_INNER_RADIUS + TRACK_OUTER_RADIUS)
+TRACK_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "track.json")
 SIM_TICK_RATE = cfg['sim_tick_rate']
 TELEMETRY_TICK_RATE = cfg['telemetry_tick_rate']
+WARP_TELEMETRY_RATE = cfg['warp_telemetry_rate']
+TELEMETRY_TIERS = cfg['telemetry_tiers']
+WARP_CHUNK_TICKS = cfg['warp_chunk_ticks']
+MAX_SKIP_SECONDS = cfg['max_skip_seconds']
+# controller decisions per second, staggered across physics ticks
+DECISION_TICK_RATE = cfg['decision_tick_rate']
+PRIMITIVE_DEPTH = cfg['primitive_depth']
+PRIMITIVE_HORIZON = cfg['primitive_horizon']
+# a newly seen neighbor at or below this TTC forces an immediate re-plan
+REPLAN_TTC_THRESHOLD = cfg['replan_ttc_threshold']
 AGENT_RADIUS = cfg['agent_radius']
 NUM_OBSTACLES = cfg['num_obstacles']
 # right slant length x for first slant
@@ -50,3 +66,53 @@ RLI_BOUND2_LENGTH_Y = cfg['rli_bound2_length_y']
 RLO_BOUND2_LENGTH_Y = cfg['rlo_bound2_length_y']
 # right upper slant length y for first slant
 RSU1_LENGTH_Y = cfg['rs1_length_y']
+# swept collision pass over each tick, so lower tick rates cannot tunnel
+CCD_ENABLED = cfg['ccd_enabled']
+TRACK_SDF_RESOLUTION = cfg['track_sdf_resolution']
+TRACK_SDF_CACHE_DIR = cfg['track_sdf_cache_dir']
+COLLISION_RESPONSE = cfg['collision_response']
+RESTITUTION = cfg['restitution']
+BROAD_PHASE = cfg['broad_phase']
+SHM_EXPORT_NAME = cfg['shm_export_name']
+SHM_EXPORT_CAPACITY = cfg['shm_export_capacity']
+SHM_EXPORT_SLOTS = cfg['shm_export_slots']
+ANALYTICS_SECTORS = cfg['analytics_sectors']
+ANALYTICS_WINDOW = cfg['analytics_window']
+ANALYTICS_FUEL_EVERY = cfg['analytics_fuel_every']
+NEAR_MISS_TTC = cfg['near_miss_ttc']
+# ticks an isolated agent may coast without running its controller (0 disables LOD)
+LOD_SAFE_TICKS = cfg['lod_safe_ticks']
+SPAWN_SPACING = cfg['spawn_spacing']
+SPAWN_FRONT_ARC = cfg['spawn_front_arc']
+COMMAND_LOG_PATH = cfg['command_log_path']
+COMMAND_LOG_SEED = cfg['command_log_seed']
+COMMAND_LOG_DIGEST_EVERY = cfg['command_log_digest_every']
+REPLAY_CHECKPOINT_EVERY = cfg['replay_checkpoint_every']
+LOG_LEVEL = cfg['log_level']
+LOG_FILE = cfg['log_file']
+LOG_STRUCTURED = cfg['log_structured']
+# emit one per-agent debug record every N controller calls
+AGENT_DEBUG_SAMPLE_EVERY = cfg['agent_debug_sample_every']
+
+EVENTS = cfg['events']
+EVENT_SEED = EVENTS['seed']
+# random event rates are per second and converted to per-tick probabilities
+CRASH_RATE = EVENTS['crash_rate']
+RECOVERY_RATE = EVENTS['recovery_rate']
+RECOVERY_SPEED = EVENTS['recovery_speed']
+SAFETY_CAR_RATE = EVENTS['safety_car_rate']
+SAFETY_CAR_DURATION = EVENTS['safety_car_duration']
+SAFETY_CAR_SPEED = EVENTS['safety_car_speed']
+
+OVERLOAD = cfg['overload']
+OVERLOAD_WINDOW = OVERLOAD['window']
+OVERLOAD_HIGH_LOAD = OVERLOAD['high_load']
+OVERLOAD_LOW_LOAD = OVERLOAD['low_load']
+OVERLOAD_BACKLOG_TICKS = OVERLOAD['backlog_ticks']
+OVERLOAD_ESCALATE_AFTER = OVERLOAD['escalate_after']
+OVERLOAD_RECOVER_AFTER = OVERLOAD['recover_after']
+# what each degradation level does (see SimulationEngine._apply_overload_level)
+DEGRADED_TELEMETRY_RATE = OVERLOAD['telemetry_rate']
+DEGRADED_DECISION_SLOWDOWN = OVERLOAD['decision_slowdown']
+DEGRADED_LOD_SLOWDOWN = OVERLOAD['lod_slowdown']
+MAX_CATCH_UP_TICKS = OVERLOAD['max_catch_up_ticks']
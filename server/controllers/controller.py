@@ -1,6 +1,15 @@
 """Controller module for predicting actions"""
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from sim.action import Action
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from sim.action import Action, ACTION_INDEX
+
+if TYPE_CHECKING:
+    from sim.engine.world_arrays import WorldArrays
 
 
 class Controller(ABC):
@@ -11,3 +20,22 @@ class Controller(ABC):
     def predict(self) -> Action:
         pass
 
+    @classmethod
+    def predict_batch(cls, agent_indices: np.ndarray, world_arrays: WorldArrays) -> np.ndarray:
+        """
+        Decide actions for many agents driven by this controller type in one call.
+
+        The engine calls this once per controller type per tick. The default falls
+        back to one predict() per agent; vectorized or offloaded controllers override it.
+
+        Args:
+            agent_indices: (K,) rows of `world_arrays` whose agents use this controller.
+            world_arrays: Snapshot of all agents for this tick.
+
+        Returns:
+            (K,) indices into sim.action.ACTION_LIST, aligned with `agent_indices`.
+        """
+        agents = world_arrays.agents
+        return np.fromiter(
+            (ACTION_INDEX[agents[i].controller.predict()] for i in agent_indices),
+            dtype=np.intp, count=len(agent_indices))
@@ -5,7 +5,9 @@ from sim.object.agent import Agent
 from sim.object.obstacle import Obstacle
 from sim.engine.world_view import WorldView
 from controllers.heuristics.ttc import ttc_to_boundary, ttc_to_object, ttc_to_agent
+from utils.track_sdf import get_track_sdf
 from controllers.controller import Controller
+from controllers.registry import register_controller
 from sim.action import Action
 from sim.action import DEFAULT_ACTIONS
 from utils.vector import Vector
@@ -14,23 +16,28 @@ import numpy as np
 import random
 
 from configs.settings import DEFAULT_TIME_HORIZON_LOWER, DEFAULT_TIME_HORIZON_UPPER, MAX_SPEED
+from configs.settings import LOG_LEVEL, LOG_FILE, AGENT_DEBUG_SAMPLE_EVERY
+from utils.logger import get_logger, SampledLogger
 import sys
 
 ESP = sys.float_info.epsilon
 
+logger = get_logger(__name__, LOG_LEVEL, LOG_FILE)
+agent_debug = SampledLogger(logger, sample_every=AGENT_DEBUG_SAMPLE_EVERY)
+
+@register_controller('heuristic')
 class HeuristicController(Controller):
 
     __slot__ = ('agent_id', 'world_view',)
-    _ttc_cache: dict[tuple[int, int], float] = {}
 
     def __init__(self, agent: Agent, world_view: WorldView) -> None:
         self.agent = agent
         self.world_view = world_view
 
     def predict(self) -> Action:
-        print(f"[INIT] Controller created {id(self.agent)}")
-        bound_ttc = ttc_to_boundary(self.agent.position,
-                                    self.agent.direction * self.agent.speed)
+        agent_debug.debug(self.agent.obj_id, "predict",
+                          extra={'agent_id': self.agent.obj_id, 'speed': self.agent.speed})
+        bound_ttc = self._boundary_ttc(self.agent.direction * self.agent.speed)
 
        # if bound_ttc <= random.uniform(DEFAULT_TIME_HORIZON_LOWER, DEFAULT_TIME_HORIZON_UPPER):
        #     smallest_ttc = bound_ttc
@@ -40,18 +47,20 @@ class HeuristicController(Controller):
         neighors: list[int] = self.world_view.get_neighbors(
             self.agent.position)
         smallest_ttc = np.inf
+        closest_ttc = np.inf
         for neighbor_id in neighors:
             if neighbor_id == self.agent.obj_id:
                 continue
 
             neighbor_object = self.world_view.get_object_by_id(neighbor_id)
             ttc = self._compute_ttc(neighbor_object)
+            closest_ttc = min(closest_ttc, ttc)
             if ttc <= random.uniform(DEFAULT_TIME_HORIZON_LOWER, DEFAULT_TIME_HORIZON_UPPER) and ttc < smallest_ttc:
                 smallest_ttc = ttc
+        # Unfiltered by the randomized horizon, so near-miss counts are not noisy.
+        self.world_view.report_ttc(self.agent.obj_id, closest_ttc)
         if smallest_ttc <= ESP or smallest_ttc <= 0:
-            self.agent.state = 'crashed'
-            self.agent.speed = 0
-            self.agent.direction = Vector(0, 0)
+            # Already in contact; the engine's collision phase decides what happens.
             return DEFAULT_ACTIONS['brake_hard']
         elif (smallest_ttc <= 0.15):
             best_actions = self.find_best_evasive_action(smallest_ttc)
@@ -98,10 +107,9 @@ class HeuristicController(Controller):
         for action_name, action in DEFAULT_ACTIONS.items():
             if (random.random() > 0.9 and action_name not in ['steer_left', 'steer_right', 'maintain', 'overtake_left', 'overtake_right']):
                 continue
-            bound_ttc = ttc_to_boundary(
-                self.agent.position,
-                (self.agent.direction.rotate(action.steer_rad)
-                 * self.agent.speed * action.speed_factor)
+            bound_ttc = self._boundary_ttc(
+                self.agent.direction.rotate(action.steer_rad)
+                * self.agent.speed * action.speed_factor
             )
             smallest_ttc = np.inf
             if bound_ttc <= random.uniform(DEFAULT_TIME_HORIZON_LOWER, DEFAULT_TIME_HORIZON_UPPER):
@@ -123,6 +131,17 @@ class HeuristicController(Controller):
                 best_action = action_name
         return best_action
 
+    def _boundary_ttc(self, velocity: Vector) -> float:
+        """
+        Boundary TTC, or inf without solving it when the track SDF shows no wall within
+        the longest horizon the callers compare against.
+        """
+        position = self.agent.position
+        if get_track_sdf().clear_of_walls(position.x, position.y,
+                                          velocity.magnitude() * DEFAULT_TIME_HORIZON_UPPER):
+            return np.inf
+        return ttc_to_boundary(position, velocity)
+
     def compute_ttc_for_action(self, action: Action, neighbor: Object) -> float:
         if isinstance(neighbor, Obstacle):
             ttc = ttc_to_object(
@@ -156,19 +175,12 @@ class HeuristicController(Controller):
             return ttc
 
         if isinstance(obj, Agent):
-            agent = obj
-            key = (obj.obj_id, agent.obj_id)
-            if key in self._ttc_cache:
-                return self._ttc_cache[key]
-
             ttc = ttc_to_agent(
                 self.agent.direction * self.agent.speed,
                 obj.direction * obj.speed,
                 self.agent.position,
                 obj.position
             )
-            key = (agent.obj_id, obj.obj_id)
-            self._ttc_cache[key] = ttc
             return ttc
 
         raise ValueError("Unsupported object type for TTC computation")
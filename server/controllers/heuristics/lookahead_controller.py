@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import numpy as np
+
+from controllers.controller import Controller
+from controllers.registry import register_controller
+from sim.action import Action, ACTION_LIST
+from sim.engine.collision import near_pairs
+from sim.engine.world_arrays import WorldArrays
+from sim.engine.world_view import WorldView
+from sim.motion_primitives import MotionPrimitives
+from sim.object.agent import Agent
+from utils.track_geometry import arc_length, arc_distance
+from utils.track_sdf import get_track_sdf
+
+from configs.settings import AGENT_RADIUS, MAX_SPEED
+
+PRIMITIVES = MotionPrimitives()
+
+
+@register_controller('lookahead')
+class LookaheadController(Controller):
+    """
+    Picks actions by sweeping whole motion primitives against neighbors, obstacles and walls.
+
+    For every deciding agent each primitive in the library is turned into a world
+    trajectory at once, neighbors are extrapolated at constant velocity over the same
+    ticks, obstacle segments are tested at every trajectory point, and walls are looked
+    up in the track SDF. The primitive that stays clear of
+    contact longest wins, ties broken by progress along the track without exceeding
+    MAX_SPEED; its first action is returned and the rest is re-planned next decision.
+    The chosen primitive's time to first contact (inf if it stays clear) is reported
+    to the world view as the agent's TTC.
+    """
+
+    __slots__ = ('agent', 'world_view')
+
+    def __init__(self, agent: Agent, world_view: WorldView) -> None:
+        self.agent = agent
+        self.world_view = world_view
+
+    def predict(self) -> Action:
+        world_arrays = self.world_view.world_arrays()
+        row = world_arrays.rows[self.agent.obj_id]
+        return ACTION_LIST[self.predict_batch(np.array([row]), world_arrays)[0]]
+
+    @classmethod
+    def predict_batch(cls, agent_indices: np.ndarray, world_arrays: WorldArrays) -> np.ndarray:
+        rows = np.asarray(agent_indices, dtype=np.intp)
+        positions = world_arrays.positions
+        speeds = np.where(world_arrays.active, world_arrays.speeds, 0.0)
+        paths = PRIMITIVES.trajectories(positions[rows], world_arrays.directions[rows], speeds[rows])
+        count, num_primitives, ticks = paths.shape[:3]
+
+        # Walls: touching one or leaving the racing surface ends a primitive.
+        distance = get_track_sdf().signed_distance(paths.reshape(-1, 2))
+        hit = (distance < AGENT_RADIUS).reshape(count, num_primitives, ticks)
+
+        # Neighbors that could come within contact range during the horizon, with the
+        # cell hash over the widest reach proposing candidates instead of all K x N pairs.
+        horizon = ticks * PRIMITIVES.dt
+        own_reach = speeds[rows] * PRIMITIVES.speed_scales.max() * horizon
+        widest = AGENT_RADIUS + own_reach.max(initial=0.0) + speeds.max(initial=0.0) * horizon
+        k, j = near_pairs(positions[rows], positions, widest)
+        reach = AGENT_RADIUS + own_reach[k] + speeds[j] * horizon
+        gap = positions[j] - positions[rows[k]]
+        gap_sq = np.einsum('mi,mi->m', gap, gap)
+        # Pairs already touching are left to the collision phase.
+        near = (gap_sq <= reach * reach) & (gap_sq > AGENT_RADIUS * AGENT_RADIUS)
+        k, j = k[near], j[near]
+        if len(k):
+            steps = np.arange(1, ticks + 1) * PRIMITIVES.dt
+            # (M, T) neighbor positions at constant velocity, then (M, P, T) separations.
+            others_x = positions[j, 0, None] + steps * (world_arrays.directions[j, 0] * speeds[j])[:, None]
+            others_y = positions[j, 1, None] + steps * (world_arrays.directions[j, 1] * speeds[j])[:, None]
+            dx = paths[k, :, :, 0] - others_x[:, None, :]
+            dy = paths[k, :, :, 1] - others_y[:, None, :]
+            touching = dx * dx + dy * dy < AGENT_RADIUS * AGENT_RADIUS
+            # Pairs come out grouped by k, so one reduce folds them into their agent.
+            starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+            hit[k[starts]] |= np.logical_or.reduceat(touching, starts, axis=0)
+
+        # Obstacles: sweep every trajectory point against the segments the agent could
+        # reach within the horizon.
+        seg_starts, seg_ends = world_arrays.obstacle_starts, world_arrays.obstacle_ends
+        if len(seg_starts):
+            seg = seg_ends - seg_starts
+            seg_len_sq = np.maximum(np.einsum('mi,mi->m', seg, seg), 1e-12)
+            rel = positions[rows, None, :] - seg_starts[None, :, :]
+            t = np.clip(np.einsum('kmi,mi->km', rel, seg) / seg_len_sq, 0.0, 1.0)
+            offset = rel - t[:, :, None] * seg[None, :, :]
+            limit = AGENT_RADIUS + own_reach
+            k, m = np.nonzero(np.einsum('kmi,kmi->km', offset, offset) <= (limit * limit)[:, None])
+            if len(k):
+                # (M', P, T) distance from each trajectory point to its candidate segment.
+                rel = paths[k] - seg_starts[m, None, None, :]
+                t = np.clip(np.einsum('mptj,mj->mpt', rel, seg[m]) / seg_len_sq[m, None, None], 0.0, 1.0)
+                offset = rel - t[..., None] * seg[m, None, None, :]
+                touching = np.einsum('mptj,mptj->mpt', offset, offset) < AGENT_RADIUS * AGENT_RADIUS
+                starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+                hit[k[starts]] |= np.logical_or.reduceat(touching, starts, axis=0)
+
+        clear_ticks = np.where(hit.any(axis=2), hit.argmax(axis=2), ticks)
+
+        start_arc = arc_length(positions[rows])
+        end_arc = arc_length(paths[:, :, -1].reshape(-1, 2)).reshape(count, num_primitives)
+        progress = arc_distance(start_arc[:, None], end_arc)
+        end_scale = PRIMITIVES.speed_scales[None, :, -1]
+        speeding = (speeds[rows, None] * end_scale > MAX_SPEED) & (end_scale > 1.0)
+        span = progress.max(axis=1, keepdims=True) - progress.min(axis=1, keepdims=True)
+        rank = (progress - progress.min(axis=1, keepdims=True)) / np.maximum(span, 1e-9)
+        # Clear ticks dominate; progress only breaks ties, and never rewards speeding.
+        score = clear_ticks + np.where(speeding, -0.5, 0.99 * rank)
+        chosen = score.argmax(axis=1)
+
+        # Path index t is the position after t + 1 ticks.
+        chosen_clear = clear_ticks[np.arange(count), chosen]
+        ttcs = np.where(chosen_clear < ticks, (chosen_clear + 1) * PRIMITIVES.dt, np.inf)
+        agents, ids = world_arrays.agents, world_arrays.ids
+        for row, ttc in zip(rows.tolist(), ttcs.tolist()):
+            agents[row].controller.world_view.report_ttc(int(ids[row]), ttc)
+        return PRIMITIVES.first_actions[chosen]
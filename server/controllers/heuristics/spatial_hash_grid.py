@@ -2,6 +2,8 @@ from collections import defaultdict
 from typing import Dict, List, Tuple, Any, Iterable
 import math
 
+import numpy as np
+
 
 class SpatialHashGrid:
     """
@@ -55,6 +57,30 @@ class SpatialHashGrid:
         self.cells[key].append(obj_id)
         self.object_cells[obj_id] = key
 
+    def insert_many(self, obj_ids: List[int], positions: np.ndarray) -> None:
+        """
+        Insert many objects at once, with the same result as inserting them in order.
+
+        Args:
+            obj_ids: Unique identifiers.
+            positions: (N, 2) coordinates, row-aligned with obj_ids.
+        """
+        if not len(obj_ids):
+            return
+        cells = np.floor(positions / self.cell_size).astype(np.int64)
+        # Group rows by cell, keeping their order within a cell and the order cells
+        # are first seen in.
+        unique, first, inverse = np.unique(cells, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        by_cell = np.argsort(inverse, kind='stable')
+        bounds = np.searchsorted(inverse[by_cell], np.arange(len(unique) + 1))
+        ids = np.asarray(obj_ids)[by_cell].tolist()
+        keys = [tuple(key) for key in unique.tolist()]
+        for u in np.argsort(first).tolist():
+            members = ids[bounds[u]:bounds[u + 1]]
+            self.cells[keys[u]].extend(members)
+            self.object_cells.update(dict.fromkeys(members, keys[u]))
+
     def remove(self, obj_id: int) -> None:
         """
         Remove an object from the grid.
@@ -122,6 +148,40 @@ class SpatialHashGrid:
 
         return candidates
 
+    def query_rect(self, x_min: float, y_min: float, x_max: float, y_max: float) -> Iterable[Any]:
+        """
+        Return all object IDs in cells overlapping an axis-aligned rectangle.
+        Broad-phase only; user should perform precise bounds checks.
+
+        Args:
+            x_min: Left edge.
+            y_min: Bottom edge.
+            x_max: Right edge.
+            y_max: Top edge.
+
+        Returns:
+            Iterable of object IDs that may be inside the rectangle.
+        """
+        cx_min, cy_min = self._cell_key(x_min, y_min)
+        cx_max, cy_max = self._cell_key(x_max, y_max)
+
+        candidates: List[Any] = []
+
+        # A wide rectangle spans more cells than are occupied; scan whichever is smaller.
+        if (cx_max - cx_min + 1) * (cy_max - cy_min + 1) > len(self.cells):
+            for (cx, cy), ids in self.cells.items():
+                if cx_min <= cx <= cx_max and cy_min <= cy <= cy_max:
+                    candidates.extend(ids)
+            return candidates
+
+        for cx in range(cx_min, cx_max + 1):
+            for cy in range(cy_min, cy_max + 1):
+                cell_key = (cx, cy)
+                if cell_key in self.cells:
+                    candidates.extend(self.cells[cell_key])
+
+        return candidates
+
     def get_cell_contents(self, x: float, y: float) -> Iterable[Any]:
         """
         Return all object IDs in the same grid cell as the given position.
@@ -137,3 +197,35 @@ class SpatialHashGrid:
         key = self._cell_key(x, y)
         return self.cells.get(key, [])
 
+
+    def state_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Export the grid as flat arrays, preserving per-cell insertion order so a
+        restored grid answers queries in exactly the same order.
+
+        Returns:
+            dict with 'cell_keys' (K, 2), 'cell_offsets' (K + 1,) and 'cell_ids' (M,).
+        """
+        keys = [key for key, ids in self.cells.items() if ids]
+        counts = [len(self.cells[key]) for key in keys]
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        ids = [obj_id for key in keys for obj_id in self.cells[key]]
+        return {
+            'cell_keys': np.array(keys, dtype=np.int64).reshape(-1, 2),
+            'cell_offsets': offsets,
+            'cell_ids': np.array(ids, dtype=np.int64),
+        }
+
+    def load_state_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        """Replace the grid contents with arrays produced by state_arrays()."""
+        self.cells.clear()
+        self.object_cells.clear()
+        offsets = arrays['cell_offsets'].tolist()
+        ids = arrays['cell_ids'].tolist()
+        for i, (cx, cy) in enumerate(arrays['cell_keys'].tolist()):
+            key = (cx, cy)
+            members = ids[offsets[i]:offsets[i + 1]]
+            self.cells[key] = members
+            for obj_id in members:
+                self.object_cells[obj_id] = key
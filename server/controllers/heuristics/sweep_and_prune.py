@@ -0,0 +1,193 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Tuple, Any, Iterable
+
+import numpy as np
+
+from configs.settings import TRACK_LENGTH
+from utils.track_geometry import arc_length_xy, MAX_ARC_STRETCH
+
+
+class SweepAndPrune:
+    """
+    One-dimensional sweep-and-prune broad phase along track arc length.
+
+    Objects are kept sorted by their progress along the centerline. The field barely
+    reorders between ticks, so moves are applied with an insertion-sort step that
+    usually swaps zero or one neighbor. A radius query converts the radius into an
+    arc-length window, scans it (wrapping across the start/finish line) and keeps
+    only objects within the radius.
+
+    Drop-in replacement for SpatialHashGrid: same insert/remove/move/query API.
+
+    Suitable for real-time simulations where objects stay on the track.
+    """
+
+    __slots__ = ('_ids', '_keys', '_positions', '_index')
+
+    def __init__(self):
+        """Initialize an empty sweep list."""
+        self._ids: List[int] = []
+        self._keys: List[float] = []
+        self._positions: Dict[int, Tuple[float, float]] = {}
+        self._index: Dict[int, int] = {}
+
+    def insert(self, obj_id: int, x: float, y: float) -> None:
+        """
+        Insert an object into the sweep list.
+
+        Args:
+            obj_id: Unique identifier (e.g., agent_id).
+            x: X coordinate of the object.
+            y: Y coordinate of the object.
+        """
+        key = arc_length_xy(x, y)
+        i = bisect_right(self._keys, key)
+        self._keys.insert(i, key)
+        self._ids.insert(i, obj_id)
+        self._positions[obj_id] = (x, y)
+        for j in range(i, len(self._ids)):
+            self._index[self._ids[j]] = j
+
+    def insert_many(self, obj_ids: List[int], positions: np.ndarray) -> None:
+        """
+        Insert many objects with one merge, with the same result as inserting them in order.
+
+        Args:
+            obj_ids: Unique identifiers.
+            positions: (N, 2) coordinates, row-aligned with obj_ids.
+        """
+        if not len(obj_ids):
+            return
+        # Scalar keys match the ones move() computes. A stable sort keeps existing objects
+        # ahead of new ones with equal keys, and new ones in the given order, just as
+        # repeated bisect_right inserts would.
+        keys = np.array(self._keys + [arc_length_xy(x, y) for x, y in positions.tolist()])
+        ids = self._ids + list(obj_ids)
+        order = np.argsort(keys, kind='stable').tolist()
+        self._keys = keys[order].tolist()
+        self._ids = [ids[i] for i in order]
+        self._positions.update(zip(obj_ids, map(tuple, positions.tolist())))
+        self._index = {obj_id: i for i, obj_id in enumerate(self._ids)}
+
+    def remove(self, obj_id: int) -> None:
+        """
+        Remove an object from the sweep list.
+
+        Args:
+            obj_id: Unique identifier of the object to remove.
+        """
+        i = self._index.pop(obj_id, None)
+        if i is None:
+            return
+
+        del self._keys[i]
+        del self._ids[i]
+        del self._positions[obj_id]
+        for j in range(i, len(self._ids)):
+            self._index[self._ids[j]] = j
+
+    def move(self, obj_id: int, new_x: float, new_y: float) -> None:
+        """
+        Update the position of an existing object and restore sort order.
+
+        Args:
+            obj_id: Unique identifier.
+            new_x: New X coordinate.
+            new_y: New Y coordinate.
+        """
+        i = self._index.get(obj_id)
+        if i is None:
+            self.insert(obj_id, new_x, new_y)
+            return
+
+        key = arc_length_xy(new_x, new_y)
+        self._positions[obj_id] = (new_x, new_y)
+        ids, keys, index = self._ids, self._keys, self._index
+
+        # Insertion-sort step. Crossing the start/finish line walks the whole list
+        # once, which happens once per lap per object.
+        while i > 0 and keys[i - 1] > key:
+            keys[i] = keys[i - 1]
+            ids[i] = ids[i - 1]
+            index[ids[i]] = i
+            i -= 1
+        while i < len(keys) - 1 and keys[i + 1] < key:
+            keys[i] = keys[i + 1]
+            ids[i] = ids[i + 1]
+            index[ids[i]] = i
+            i += 1
+        keys[i] = key
+        ids[i] = obj_id
+        index[obj_id] = i
+
+    def _window(self, lo: float, hi: float) -> List[int]:
+        """IDs with keys in [lo, hi], where the interval may wrap around the loop."""
+        keys, ids = self._keys, self._ids
+        if hi - lo >= TRACK_LENGTH:
+            return list(ids)
+        lo %= TRACK_LENGTH
+        hi %= TRACK_LENGTH
+        if lo <= hi:
+            return ids[bisect_left(keys, lo):bisect_right(keys, hi)]
+        return ids[bisect_left(keys, lo):] + ids[:bisect_right(keys, hi)]
+
+    def query_radius(self, x: float, y: float, radius: float) -> Iterable[Any]:
+        """
+        Return all object IDs within a given radius of a point.
+
+        Args:
+            x: Query point X.
+            y: Query point Y.
+            radius: Search radius.
+
+        Returns:
+            Iterable of object IDs within the radius.
+        """
+        key = arc_length_xy(x, y)
+        # Two points `radius` apart can be up to MAX_ARC_STRETCH * radius apart in arc
+        # length (inside of a bend); the window must cover that.
+        reach = radius * MAX_ARC_STRETCH
+        positions = self._positions
+        r2 = radius * radius
+
+        candidates: List[Any] = []
+        for obj_id in self._window(key - reach, key + reach):
+            px, py = positions[obj_id]
+            if (px - x) * (px - x) + (py - y) * (py - y) <= r2:
+                candidates.append(obj_id)
+        return candidates
+
+    def query_rect(self, x_min: float, y_min: float, x_max: float, y_max: float) -> Iterable[Any]:
+        """
+        Return all object IDs inside an axis-aligned rectangle.
+
+        A rectangle does not map to one arc-length window, so this scans every object.
+
+        Returns:
+            Iterable of object IDs inside the rectangle.
+        """
+        return [obj_id for obj_id in self._ids
+                if x_min <= self._positions[obj_id][0] <= x_max
+                and y_min <= self._positions[obj_id][1] <= y_max]
+
+    def state_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Export the sweep list in sort order, so a restored list breaks key ties and
+        answers queries in exactly the same order.
+
+        Returns:
+            dict with 'ids' (N,), 'keys' (N,) and 'positions' (N, 2).
+        """
+        return {
+            'ids': np.array(self._ids, dtype=np.int64),
+            'keys': np.array(self._keys, dtype=float),
+            'positions': np.array([self._positions[i] for i in self._ids], dtype=float).reshape(-1, 2),
+        }
+
+    def load_state_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        """Replace the sweep list contents with arrays produced by state_arrays()."""
+        self._ids = arrays['ids'].tolist()
+        self._keys = arrays['keys'].tolist()
+        positions = arrays['positions'].tolist()
+        self._positions = {obj_id: tuple(positions[i]) for i, obj_id in enumerate(self._ids)}
+        self._index = {obj_id: i for i, obj_id in enumerate(self._ids)}
@@ -0,0 +1,43 @@
+"""Registry mapping config names to controller classes."""
+from __future__ import annotations
+
+from controllers.controller import Controller
+
+CONTROLLER_REGISTRY: dict[str, type[Controller]] = {}
+
+
+def register_controller(name: str):
+    """Class decorator registering a controller under `name` for use in settings."""
+    def decorator(cls: type[Controller]) -> type[Controller]:
+        if name in CONTROLLER_REGISTRY and CONTROLLER_REGISTRY[name] is not cls:
+            raise ValueError(f"Controller name '{name}' is already registered")
+        CONTROLLER_REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+def create_controller(name: str, agent, world_view) -> Controller:
+    """Instantiate the controller registered as `name` for one agent."""
+    if name not in CONTROLLER_REGISTRY:
+        raise KeyError(f"Unknown controller '{name}', registered: {sorted(CONTROLLER_REGISTRY)}")
+    return CONTROLLER_REGISTRY[name](agent=agent, world_view=world_view)
+
+
+def assign_controllers(mix: dict[str, float], count: int) -> list[str]:
+    """
+    Deal `count` agents across controller names in proportion to `mix` weights.
+    Uses smooth weighted round-robin so each type is spread evenly through the field.
+    """
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("Controller mix weights must sum to a positive value")
+
+    credit = {name: 0.0 for name in mix}
+    names: list[str] = []
+    for _ in range(count):
+        for name, weight in mix.items():
+            credit[name] += weight
+        chosen = max(credit, key=credit.__getitem__)
+        credit[chosen] -= total
+        names.append(chosen)
+    return names
@@ -1,21 +1,31 @@
 import asyncio
+import logging
+import math
+import time
 
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, WebSocket, HTTPException, Header, Response
 import uvicorn
 
 from sim.engine.sim_engine import SimulationEngine
+from sim.engine.command_log import CommandLog
+from sim.object.obstacle import Obstacle
+from sim.subscriptions import Subscription
 from fastapi.websockets import WebSocketDisconnect
 
-from configs.settings import TELEMETRY_TICK_RATE
+from configs.settings import TELEMETRY_TICK_RATE, WARP_TELEMETRY_RATE, LOG_LEVEL, LOG_FILE
+from configs.settings import SHM_EXPORT_NAME, COMMAND_LOG_PATH, COMMAND_LOG_SEED
+from utils.vector import Vector
 from utils.logger import get_logger
-from utils.visualizer import OvalVisualizer
 
-logger = get_logger(__name__)
+logger = get_logger(__name__, LOG_LEVEL, LOG_FILE)
 
 app = FastAPI()
 sim_engine = SimulationEngine()
 
 DT = 1.0 / TELEMETRY_TICK_RATE
+WARP_DT = 1.0 / WARP_TELEMETRY_RATE
+# longest a GET /state long-poll may hold a request open, in seconds
+MAX_STATE_WAIT = 30.0
 
 
 @app.on_event("startup")
@@ -23,35 +33,105 @@ async def startup_event():
     """Initializes the simulation engine on startup."""
     global sim_engine
     logger.info("Starting KINESIS simulation backend")
+    if COMMAND_LOG_PATH:
+        sim_engine.record_commands(CommandLog.create(COMMAND_LOG_PATH, COMMAND_LOG_SEED))
+        logger.info("Recording commands to %r with seed %d",
+                    COMMAND_LOG_PATH, sim_engine.command_log.seed)
     sim_engine.init_agents()
-    logger.info(f"Simulation engine initialized with {
-                len(sim_engine._objects)} agents")
+    logger.info("Simulation engine initialized with %d agents",
+                len(sim_engine._objects))
+    if SHM_EXPORT_NAME:
+        sim_engine.export_shared_memory(SHM_EXPORT_NAME)
+        logger.info("Publishing agent state to shared memory %r", SHM_EXPORT_NAME)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Removes the shared-memory export and finishes the command log."""
+    sim_engine.close_export()
+    sim_engine.stop_recording()
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """Streams simulation frames to the frontend."""
+    """
+    Streams simulation frames to the frontend.
+
+    Clients start on the full 'all' stream at TELEMETRY_TICK_RATE. Sending
+    {"op": "subscribe", "id": ..., "kind": ..., "tier": ...} (see sim.subscriptions)
+    replaces that with one or more narrower streams, each at its own rate tier;
+    {"op": "unsubscribe", "id": ...} drops one. Every frame carries its 'sub' id.
+    """
     await websocket.accept()
+    subscriptions = {'all': Subscription('all', 'all', TELEMETRY_TICK_RATE)}
+    errors: list[str] = []
+    receiver = asyncio.create_task(_receive_subscriptions(websocket, subscriptions, errors))
     try:
-        while True:
+        while not receiver.done():
+            for error in errors:
+                await websocket.send_json({'error': error})
+            errors.clear()
+
+            # Only send when the race has moved on; while warped, frames are decimated
+            # to WARP_TELEMETRY_RATE so fast-forwarding does not flood clients, and an
+            # overloaded engine lowers every tier to its degraded telemetry rate.
+            warped = sim_engine.time_scale > 1.0
+            min_period = max(WARP_DT if warped else 0.0, sim_engine.telemetry_period)
             if sim_engine.state == 'running':
-                snapshot = sim_engine.get_agent_state()
-                snapshot['leaderboard'] = sim_engine.get_leaderboard()
-                print(snapshot['leaderboard'])
-                await websocket.send_json(snapshot)
-            await asyncio.sleep(DT)
+                now = time.monotonic()
+                for subscription in list(subscriptions.values()):
+                    if subscription.due(now, sim_engine.tick):
+                        frame = subscription.frame(sim_engine, now, min_period)
+                        if logger.isEnabledFor(logging.DEBUG) and 'leaderboard' in frame:
+                            logger.debug("leaderboard %s", frame['leaderboard'])
+                        await websocket.send_json(frame)
+
+            period = min((s.period for s in subscriptions.values()), default=WARP_DT)
+            await asyncio.sleep(max(period, min_period))
     except WebSocketDisconnect:
-        logger.info("WebSocket disconnected")
+        pass
+    finally:
+        receiver.cancel()
+    logger.info("WebSocket disconnected")
+
+
+async def _receive_subscriptions(websocket: WebSocket, subscriptions: dict[str, Subscription],
+                                 errors: list[str]) -> None:
+    """Apply subscribe/unsubscribe messages from a client until it disconnects."""
+    explicit = False
+    try:
+        while True:
+            message = await websocket.receive_json()
+            op = message.get('op') if isinstance(message, dict) else None
+            if op == 'subscribe':
+                try:
+                    subscription = Subscription.from_message(message)
+                except (TypeError, ValueError) as e:
+                    errors.append(str(e))
+                    continue
+                if not explicit:
+                    # The first explicit subscription replaces the default full stream.
+                    subscriptions.clear()
+                    explicit = True
+                subscriptions[subscription.sub_id] = subscription
+            elif op == 'unsubscribe':
+                subscriptions.pop(str(message.get('id')), None)
+            else:
+                errors.append(f"Unknown op {op!r}; expected 'subscribe' or 'unsubscribe'")
+    except (WebSocketDisconnect, ValueError):
+        # ValueError: the client sent something that is not JSON.
+        return
 
 
 @app.post("/start")
 async def start_simulation():
     """Starts the simulation"""
     global sim_engine
-  #  if sim_engine.state != 'running':
-  #      sim_engine.state = 'running'
-  #      asyncio.create_task(sim_engine.run())
-    viz = OvalVisualizer()
-    viz.run(sim_engine._objects.values(), sim_engine.update)
+    # The matplotlib viewer runs standalone (python -m utils.visualizer) so it can
+    # never block the event loop serving clients.
+    if sim_engine.state != 'running':
+        sim_engine.state = 'running'
+        sim_engine.record_command('start')
+        asyncio.create_task(sim_engine.run())
     return {"status": "started"}
 
 
@@ -61,9 +141,91 @@ async def pause_simulation():
     global sim_engine
     if sim_engine.state == 'running':
         sim_engine.state = 'paused'
+        sim_engine.record_command('pause')
     return {"status": "paused"}
 
 
+@app.post("/warp")
+async def warp_simulation(scale: str = "1"):
+    """Runs the simulation at `scale` x real time, or as fast as possible with 'max'"""
+    global sim_engine
+    try:
+        sim_engine.set_time_scale(math.inf if scale == 'max' else float(scale))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "warped", "scale": scale}
+
+
+@app.post("/skip")
+async def skip_simulation(seconds: float):
+    """Skips `seconds` of race time ahead, then resumes at the current time scale"""
+    global sim_engine
+    try:
+        ticks = await sim_engine.fast_forward(seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "skipped", "ticks": ticks}
+
+
+@app.post("/obstacles")
+async def add_obstacle(x1: float, y1: float, x2: float, y2: float):
+    """Places an obstacle from (x1, y1) to (x2, y2)"""
+    global sim_engine
+    return {"status": "added", "id": sim_engine.add_obstacle(Vector(x1, y1), Vector(x2, y2))}
+
+
+@app.delete("/obstacles/{obj_id}")
+async def remove_obstacle(obj_id: int):
+    """Removes an obstacle"""
+    global sim_engine
+    try:
+        obstacle = sim_engine.get_object_by_id(obj_id)
+    except KeyError:
+        obstacle = None
+    if not isinstance(obstacle, Obstacle):
+        raise HTTPException(status_code=404, detail=f"No obstacle {obj_id}")
+    sim_engine.remove_object(obj_id)
+    return {"status": "removed", "id": obj_id}
+
+
+@app.get("/state")
+async def get_state(since: int | None = None, wait: float = 0.0,
+                    if_none_match: str | None = Header(default=None)):
+    """
+    Returns the current snapshot, tagged with this process's boot ID and its state
+    version as the ETag.
+
+    A request whose If-None-Match (or `since`) matches the current version gets
+    304 Not Modified; with `wait` > 0 it is first held for up to `wait` seconds
+    for the next change, so pollers can long-poll without busy looping.
+    """
+    global sim_engine
+    snapshot = sim_engine.snapshot()
+    current = if_none_match == snapshot.etag or since == snapshot.version
+    if current and wait > 0:
+        await sim_engine.wait_for_tick(snapshot.version, min(wait, MAX_STATE_WAIT))
+        snapshot = sim_engine.snapshot()
+        current = if_none_match == snapshot.etag or since == snapshot.version
+
+    if current:
+        return Response(status_code=304, headers={'ETag': snapshot.etag})
+    return Response(snapshot.body, media_type='application/json', headers={'ETag': snapshot.etag})
+
+
+@app.get("/analytics")
+async def get_analytics(top: int | None = None):
+    """Returns streaming race analytics, with only the `top` standings if given."""
+    global sim_engine
+    return {'tick': sim_engine.tick, **sim_engine.analytics.summary(top)}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Returns overload governor metrics: load, backlog and every degradation so far."""
+    global sim_engine
+    return {'tick': sim_engine.tick, 'overload': sim_engine.governor.metrics()}
+
+
 @app.get("/")
 def root():
     return {"status": "KINESIS simulation backend running"}
@@ -20,3 +20,10 @@ DEFAULT_ACTIONS: dict[str, Action] = {
     "overtake_left": Action(1.15, np.deg2rad(10.0)),
     "overtake_right": Action(1.15, -np.deg2rad(10.0)),
 }
+
+# Dense action indices used by batched controllers (see Controller.predict_batch).
+ACTION_NAMES: tuple[str, ...] = tuple(DEFAULT_ACTIONS)
+ACTION_LIST: tuple[Action, ...] = tuple(DEFAULT_ACTIONS.values())
+ACTION_INDEX: dict[Action, int] = {action: i for i, action in enumerate(ACTION_LIST)}
+ACTION_SPEED_FACTORS: np.ndarray = np.array([a.speed_factor for a in ACTION_LIST], dtype=float)
+ACTION_STEER_RADS: np.ndarray = np.array([a.steer_rad for a in ACTION_LIST], dtype=float)
@@ -1,10 +1,17 @@
-import random
+"""Arc-length agent pipeline: vectorized progress, fuel and zone effects over agent arrays."""
+from __future__ import annotations
+
 import json
-from configs.settings import NUM_AGENTS, MAX_SPEED, FUEL_USAGE, TRACK_LENGTH, LAP_LIMIT
+from dataclasses import dataclass
+
+import numpy as np
+
+from configs.settings import FUEL_USAGE, TRACK_LENGTH, TRACK_CONFIG_PATH
 
 # load zone data
 try:
-    track = json.load(open("config/track.json"))
+    with open(TRACK_CONFIG_PATH) as f:
+        track = json.load(f)
 except FileNotFoundError:
     track = {"zones": []}
 
@@ -13,25 +20,116 @@ BEHAVIORS = {
     "defensive": {"speed_mul": 0.8, "fuel_rate": 0.7},
     "adaptive": {"speed_mul": 1.0, "fuel_rate": 1.0}
 }
+BEHAVIOR_NAMES: tuple[str, ...] = tuple(BEHAVIORS)
+BEHAVIOR_SPEED_MUL = np.array([BEHAVIORS[b]["speed_mul"] for b in BEHAVIOR_NAMES])
+BEHAVIOR_FUEL_RATE = np.array([BEHAVIORS[b]["fuel_rate"] for b in BEHAVIOR_NAMES])
+
+STATUSES: tuple[str, ...] = ("running", "crashed", "out_of_fuel", "finished")
+RUNNING = STATUSES.index("running")
+
+
+class ZoneIndex:
+    """
+    Track zones compiled into a sorted arc-length -> speed factor table.
+
+    Zone boundaries split the track into intervals whose combined factor (the product
+    of every zone covering them) is precomputed, so a lookup is one binary search no
+    matter how many zones the track has. Zones are closed on both ends, as before, so
+    boundary points carry their own factor.
+    """
+
+    __slots__ = ('breakpoints', 'point_factors', 'interval_factors')
+
+    def __init__(self, zones: list[dict]):
+        starts = np.array([z["start"] for z in zones], dtype=float)
+        ends = np.array([z["end"] for z in zones], dtype=float)
+        factors = np.array([z["factor"] for z in zones], dtype=float)
+
+        self.breakpoints = np.unique(np.concatenate([starts, ends]))
+        midpoints = (self.breakpoints[:-1] + self.breakpoints[1:]) / 2.0
+        self.point_factors = self._combined(self.breakpoints, starts, ends, factors)
+        self.interval_factors = self._combined(midpoints, starts, ends, factors)
+
+    @staticmethod
+    def _combined(points: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                  factors: np.ndarray) -> np.ndarray:
+        covered = (starts[None, :] <= points[:, None]) & (points[:, None] <= ends[None, :])
+        return np.where(covered, factors[None, :], 1.0).prod(axis=1)
+
+    def factors(self, positions: np.ndarray) -> np.ndarray:
+        """Return the speed factor for every arc-length position."""
+        if not len(self.breakpoints):
+            return np.ones_like(positions, dtype=float)
+
+        idx = np.searchsorted(self.breakpoints, positions, side='left')
+        at_point = idx < len(self.breakpoints)
+        at_point[at_point] = self.breakpoints[idx[at_point]] == positions[at_point]
+
+        inside = (idx > 0) & (idx < len(self.breakpoints))
+        result = np.ones(positions.shape, dtype=float)
+        result[inside] = self.interval_factors[idx[inside] - 1]
+        result[at_point] = self.point_factors[idx[at_point]]
+        return result
+
+
+ZONES = ZoneIndex(track["zones"])
+
+
+@dataclass(slots=True)
+class AgentArrays:
+    """Structure-of-arrays state for the arc-length agent pipeline, one row per agent."""
+    ids: np.ndarray
+    pos: np.ndarray
+    speed: np.ndarray
+    fuel: np.ndarray
+    lap: np.ndarray
+    total_distance: np.ndarray
+    status: np.ndarray    # index into STATUSES
+    behavior: np.ndarray  # index into BEHAVIOR_NAMES
+
+    @classmethod
+    def from_dicts(cls, agents: list[dict]) -> AgentArrays:
+        return cls(
+            ids=np.array([a["id"] for a in agents]),
+            pos=np.array([a["pos"] for a in agents], dtype=float),
+            speed=np.array([a["speed"] for a in agents], dtype=float),
+            fuel=np.array([a["fuel"] for a in agents], dtype=float),
+            lap=np.array([a["lap"] for a in agents], dtype=np.int64),
+            total_distance=np.array([a.get("total_distance", 0) for a in agents], dtype=float),
+            status=np.array([STATUSES.index(a["status"]) for a in agents], dtype=np.int8),
+            behavior=np.array([BEHAVIOR_NAMES.index(a["behavior"]) for a in agents], dtype=np.int8),
+        )
+
+    def to_dicts(self) -> list[dict]:
+        return [
+            {
+                "id": self.ids[i].item(),
+                "pos": float(self.pos[i]),
+                "speed": float(self.speed[i]),
+                "fuel": float(self.fuel[i]),
+                "lap": int(self.lap[i]),
+                "total_distance": float(self.total_distance[i]),
+                "status": STATUSES[self.status[i]],
+                "behavior": BEHAVIOR_NAMES[self.behavior[i]],
+            }
+            for i in range(len(self.ids))
+        ]
+
 
+def update_agents(agents: AgentArrays, fuel_usage=FUEL_USAGE, track_length=TRACK_LENGTH) -> None:
+    """Advance every running agent with fuel by one step, in place."""
+    moving = (agents.fuel > 0) & (agents.status == RUNNING)
+    speed = np.where(moving, agents.speed, 0.0)
 
-def update_agent(agent, fuel_usage = FUEL_USAGE, track_length = TRACK_LENGTH):
-    if agent["fuel"] <= 0 or agent["status"] != "running":
-        return agent
-    agent["pos"] += agent["speed"]
-    b = agent["behavior"]
-    agent["fuel"] -= fuel_usage * agent["speed"] * BEHAVIORS[b]["fuel_rate"]
+    agents.pos += speed
+    agents.fuel -= fuel_usage * speed * BEHAVIOR_FUEL_RATE[agents.behavior]
 
-    if agent["pos"] >= track_length:
-        agent["pos"] = 0.0
-        agent["lap"] += 1
-    agent["total_distance"] = agent.get("total_distance", 0) + agent["speed"]
+    wrapped = moving & (agents.pos >= track_length)
+    agents.pos[wrapped] = 0.0
+    agents.lap[wrapped] += 1
+    agents.total_distance += speed
 
-    return agent 
 
-def apply_zone_effects(agent):
-    """Applies zone modifiers to agent speed."""
-    for z in track["zones"]:
-        if z["start"] <= agent["pos"] <= z["end"]:
-            agent["speed"] *= z["factor"]
-    return agent
+def apply_zone_effects(agents: AgentArrays, zones: ZoneIndex = ZONES) -> None:
+    """Applies zone modifiers to every agent's speed in one pass, in place."""
+    agents.speed *= zones.factors(agents.pos)
@@ -0,0 +1,305 @@
+"""Streaming race analytics: lap and sector times, gaps, fuel burn and near misses in bounded memory."""
+from __future__ import annotations
+
+import math
+from bisect import insort
+from collections import deque
+
+import numpy as np
+
+from sim.engine.world_arrays import WorldArrays
+from utils.track_geometry import arc_length, arc_distance
+
+from configs.settings import (
+    TRACK_LENGTH,
+    ANALYTICS_SECTORS,
+    ANALYTICS_WINDOW,
+    ANALYTICS_FUEL_EVERY,
+    NEAR_MISS_TTC,
+)
+
+# Smoothing factor for per-agent speed and fuel burn averages.
+EWMA_ALPHA = 0.1
+
+
+class RunningStats:
+    """Count, mean, variance (Welford), min and max of a stream."""
+
+    __slots__ = ('count', 'mean', '_m2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {'count': 0}
+        return {'count': self.count, 'mean': self.mean, 'std': self.std,
+                'min': self.min, 'max': self.max}
+
+
+class P2Quantile:
+    """
+    Streaming estimate of one quantile with the P-squared algorithm (Jain & Chlamtac):
+    five markers whose heights are adjusted by piecewise-parabolic interpolation, so
+    memory is constant however many values are added.
+    """
+
+    __slots__ = ('p', '_heights', '_positions', '_desired', '_increments')
+
+    def __init__(self, p: float):
+        if not 0.0 < p < 1.0:
+            raise ValueError(f"Quantile must be in (0, 1), got {p}")
+        self.p = p
+        self._heights: list[float] = []
+        self._positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self._desired = [1.0, 1.0 + 2.0 * p, 1.0 + 4.0 * p, 3.0 + 2.0 * p, 5.0]
+        self._increments = [0.0, p / 2.0, p, (1.0 + p) / 2.0, 1.0]
+
+    def add(self, x: float) -> None:
+        q = self._heights
+        if len(q) < 5:
+            insort(q, x)
+            return
+
+        n = self._positions
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+        for i in range(k + 1, 5):
+            n[i] += 1.0
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1.0 and n[i + 1] - n[i] > 1.0) or (d <= -1.0 and n[i - 1] - n[i] < -1.0):
+                step = 1.0 if d > 0 else -1.0
+                candidate = q[i] + step / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < candidate < q[i + 1]:
+                    j = i + int(step)
+                    candidate = q[i] + step * (q[j] - q[i]) / (n[j] - n[i])
+                q[i] = candidate
+                n[i] += step
+
+    def value(self) -> float | None:
+        q = self._heights
+        if not q:
+            return None
+        if len(q) < 5:
+            return q[min(len(q) - 1, int(round(self.p * (len(q) - 1))))]
+        return q[2]
+
+
+class _AgentStats:
+    """Per-agent streaming state; fixed size regardless of race length."""
+
+    __slots__ = ('arc', 'distance', 'reached', 'laps', 'sector', 'lap_start', 'sector_start', 'last_lap',
+                 'best_lap', 'splits', 'recent_laps', 'speed', 'fuel', 'fuel_burn',
+                 'near_misses', 'in_near_miss')
+
+    def __init__(self, arc: float, sectors: int, window: int):
+        self.arc = arc
+        # Unwrapped progress, and the furthest it has been: a line counts as crossed
+        # only when passed beyond `reached`, so backing over it and driving on again
+        # (e.g. after a bounce) does not count twice.
+        self.distance = arc
+        self.reached = arc
+        self.laps = 0
+        self.sector = int(arc * sectors // TRACK_LENGTH)
+        # Timing starts at the first line crossed; until then times are partial.
+        self.lap_start: float | None = None
+        self.sector_start: float | None = None
+        self.last_lap: float | None = None
+        self.best_lap: float | None = None
+        self.splits: list[float | None] = [None] * sectors
+        self.recent_laps: deque[float] = deque(maxlen=window)
+        self.speed = 0.0
+        self.fuel: float | None = None
+        self.fuel_burn = 0.0
+        self.near_misses = 0
+        self.in_near_miss = False
+
+
+class RaceAnalytics:
+    """
+    Lap and sector timing, gaps to the leader, fuel burn and near misses, fed once per
+    tick from the engine's WorldArrays.
+
+    Progress is measured in arc length along the centerline (utils.track_geometry); the
+    lap is split into `sectors` equal sectors. Timing uses per-agent scalars, a
+    `window`-sized deque of recent laps, and field-wide running stats and P-squared
+    quantile sketches, so memory grows with the number of agents but never with
+    race length. Near misses are episodes where a controller reports a TTC below
+    `near_miss_ttc`; one episode counts once however long it lasts.
+    """
+
+    __slots__ = ('dt', 'sectors', 'window', 'near_miss_ttc', 'fuel_every', '_agents',
+                 'lap_times', 'lap_p50', 'lap_p90', 'sector_times', 'best_sectors', 'near_misses')
+
+    def __init__(self, dt: float, sectors: int = ANALYTICS_SECTORS, window: int = ANALYTICS_WINDOW,
+                 near_miss_ttc: float = NEAR_MISS_TTC, fuel_every: int = ANALYTICS_FUEL_EVERY):
+        self.dt = dt
+        self.sectors = sectors
+        self.window = window
+        self.near_miss_ttc = near_miss_ttc
+        self.fuel_every = fuel_every
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything, e.g. after the world was replaced by a checkpoint."""
+        self._agents: dict[int, _AgentStats] = {}
+        self.lap_times = RunningStats()
+        self.lap_p50 = P2Quantile(0.5)
+        self.lap_p90 = P2Quantile(0.9)
+        self.sector_times = [RunningStats() for _ in range(self.sectors)]
+        self.best_sectors: list[float | None] = [None] * self.sectors
+        self.near_misses = 0
+
+    def forget(self, agent_id: int) -> None:
+        self._agents.pop(agent_id, None)
+
+    def observe(self, tick: int, arrays: WorldArrays) -> None:
+        """
+        Fold one tick into the statistics.
+
+        Args:
+            tick: Engine tick the arrays describe.
+            arrays: That tick's agent arrays; Agent objects are read only for fuel,
+                every `fuel_every` ticks.
+        """
+        now = tick * self.dt
+        ids, positions, speeds, active = arrays.ids, arrays.positions, arrays.speeds, arrays.active
+        arcs = arc_length(positions) if len(ids) else np.empty(0)
+        stats = self._agents
+        sector_length = TRACK_LENGTH / self.sectors
+
+        known = np.fromiter((i in stats for i in ids.tolist()), dtype=bool, count=len(ids))
+        for row in np.flatnonzero(~known).tolist():
+            stats[int(ids[row])] = _AgentStats(float(arcs[row]), self.sectors, self.window)
+
+        rows = np.flatnonzero(active & known)
+        row_stats = [stats[i] for i in ids[rows].tolist()]
+        previous = np.fromiter((agent.arc for agent in row_stats), dtype=float, count=len(rows))
+        distance = np.fromiter((agent.distance for agent in row_stats), dtype=float, count=len(rows))
+        reached = np.fromiter((agent.reached for agent in row_stats), dtype=float, count=len(rows))
+        distance += arc_distance(previous, arcs[rows])
+        # A lap line or sector boundary counts once, when first passed in the racing direction.
+        crossed = np.floor(distance / sector_length) > np.floor(reached / sector_length)
+        np.maximum(reached, distance, out=reached)
+        for agent, d, r in zip(row_stats, distance.tolist(), reached.tolist()):
+            agent.distance = d
+            agent.reached = r
+
+        for k in np.flatnonzero(crossed).tolist():
+            self._cross(row_stats[k], float(arcs[rows[k]]), now)
+
+        for agent_id, arc, speed in zip(ids.tolist(), arcs.tolist(), speeds.tolist()):
+            agent = stats[agent_id]
+            agent.arc = arc
+            agent.speed += EWMA_ALPHA * (speed - agent.speed)
+
+        if tick % self.fuel_every == 0:
+            interval = self.fuel_every * self.dt
+            for agent_id, obj in zip(ids.tolist(), arrays.agents):
+                agent = stats[agent_id]
+                if agent.fuel is not None:
+                    burn = max(0.0, agent.fuel - obj.fuel) / interval
+                    agent.fuel_burn += EWMA_ALPHA * (burn - agent.fuel_burn)
+                agent.fuel = obj.fuel
+
+    def _cross(self, agent: _AgentStats, arc: float, now: float) -> None:
+        sector = int(arc * self.sectors // TRACK_LENGTH)
+        if agent.sector_start is not None:
+            split = now - agent.sector_start
+            agent.splits[agent.sector] = split
+            self.sector_times[agent.sector].add(split)
+            best = self.best_sectors[agent.sector]
+            if best is None or split < best:
+                self.best_sectors[agent.sector] = split
+        agent.sector_start = now
+
+        if sector == 0:
+            if agent.lap_start is not None:
+                lap = now - agent.lap_start
+                agent.last_lap = lap
+                agent.best_lap = lap if agent.best_lap is None else min(agent.best_lap, lap)
+                agent.recent_laps.append(lap)
+                self.lap_times.add(lap)
+                self.lap_p50.add(lap)
+                self.lap_p90.add(lap)
+            agent.laps += 1
+            agent.lap_start = now
+        agent.sector = sector
+
+    def observe_ttc(self, agent_id: int, ttc: float) -> None:
+        """Record the smallest TTC a controller found for an agent this decision."""
+        agent = self._agents.get(agent_id)
+        if agent is None:
+            return
+        if ttc < self.near_miss_ttc:
+            if not agent.in_near_miss:
+                agent.in_near_miss = True
+                agent.near_misses += 1
+                self.near_misses += 1
+        else:
+            agent.in_near_miss = False
+
+    def standings(self, top_k: int | None = None) -> list[dict]:
+        """Per-agent timing ordered by race distance, with gaps to the leader; the first `top_k` only if given."""
+        if not self._agents:
+            return []
+        order = sorted(self._agents.items(),
+                       key=lambda item: item[1].laps * TRACK_LENGTH + item[1].arc, reverse=True)
+        leader = order[0][1].laps * TRACK_LENGTH + order[0][1].arc
+        out = []
+        for position, (agent_id, agent) in enumerate(order[:top_k], start=1):
+            gap = leader - (agent.laps * TRACK_LENGTH + agent.arc)
+            recent = list(agent.recent_laps)
+            out.append({
+                'id': agent_id,
+                'position': position,
+                'laps': agent.laps,
+                'gap_m': gap,
+                # Time to cover the gap at the agent's own recent pace.
+                'gap_s': gap / agent.speed if agent.speed > 1e-9 else None,
+                'last_lap': agent.last_lap,
+                'best_lap': agent.best_lap,
+                'recent_lap_mean': sum(recent) / len(recent) if recent else None,
+                'splits': list(agent.splits),
+                'fuel_burn': agent.fuel_burn,
+                'near_misses': agent.near_misses,
+            })
+        return out
+
+    def summary(self, top_k: int | None = None) -> dict:
+        """Field-wide aggregates plus standings (the first `top_k` if given), JSON-serializable."""
+        return {
+            'laps': {**self.lap_times.summary(), 'p50': self.lap_p50.value(), 'p90': self.lap_p90.value()},
+            'sectors': [{**stats.summary(), 'best': best}
+                        for stats, best in zip(self.sector_times, self.best_sectors)],
+            'near_misses': self.near_misses,
+            'standings': self.standings(top_k),
+        }
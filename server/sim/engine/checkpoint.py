@@ -0,0 +1,213 @@
+"""
+Binary checkpoints of the full simulation engine state.
+
+File layout:
+    8 bytes   magic b'KNSCKPT1'
+    8 bytes   little-endian uint64 header length
+    N bytes   JSON header: scalar engine state and, per array, dtype/shape/offset
+    ...       raw array data, each array aligned to ALIGNMENT bytes
+
+Arrays are read back as zero-copy views over a memory map of the file, so restoring
+costs little more than rebuilding the Python objects that reference them.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import random
+import struct
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from controllers.registry import CONTROLLER_REGISTRY, create_controller
+from sim.object.agent import Agent
+from sim.object.obstacle import Obstacle
+from utils.vector import Vector
+
+if TYPE_CHECKING:
+    from sim.engine.sim_engine import SimulationEngine
+
+MAGIC = b'KNSCKPT1'
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+
+AGENT_STATES: tuple[str, ...] = ('idle', 'moving', 'stopped', 'crashed', 'out_of_fuel')
+_STATE_CODES = {name: code for code, name in enumerate(AGENT_STATES)}
+
+
+def write_arrays(path: str, meta: dict, arrays: dict[str, np.ndarray]) -> None:
+    """Write `meta` and `arrays` to `path` in the checkpoint container format."""
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+
+    header = json.dumps({'meta': meta, 'arrays': layout}).encode('utf-8')
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]['offset'])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+
+
+def read_arrays(path: str) -> tuple[dict, dict[str, np.ndarray]]:
+    """Memory-map a checkpoint container and return (meta, read-only array views)."""
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a KINESIS checkpoint")
+    (header_len,) = struct.unpack_from('<Q', buffer, len(MAGIC))
+    header_start = len(MAGIC) + 8
+    header = json.loads(buffer[header_start:header_start + header_len])
+    data_start = -(-(header_start + header_len) // ALIGNMENT) * ALIGNMENT
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape'], dtype=np.int64))
+        arrays[name] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=data_start + spec['offset']
+        ).reshape(spec['shape'])
+    return header['meta'], arrays
+
+
+def capture(engine: SimulationEngine) -> tuple[dict, dict[str, np.ndarray]]:
+    """Collect the engine's complete state as (scalar meta, named arrays)."""
+    agents = [obj for obj in engine._objects.values() if isinstance(obj, Agent)]
+    obstacles = [obj for obj in engine._objects.values() if isinstance(obj, Obstacle)]
+    controller_names = {cls: name for name, cls in CONTROLLER_REGISTRY.items()}
+    names = sorted({controller_names[type(a.controller)] for a in agents})
+
+    version, mt_state, gauss_next = random.getstate()
+    arrays = {
+        # Insertion order of _objects drives update order, so it is stored explicitly.
+        'object_order': np.fromiter(engine._objects.keys(), dtype=np.int64),
+        'agent.ids': np.fromiter((a.obj_id for a in agents), dtype=np.int64),
+        'agent.positions': np.array([a.position._v for a in agents], dtype=float).reshape(-1, 2),
+        'agent.directions': np.array([a.direction._v for a in agents], dtype=float).reshape(-1, 2),
+        'agent.speeds': np.fromiter((a.speed for a in agents), dtype=float),
+        'agent.fuel': np.fromiter((a.fuel for a in agents), dtype=float),
+        'agent.laps': np.fromiter((a.lap for a in agents), dtype=np.int64),
+        'agent.states': np.fromiter((_STATE_CODES[a.state] for a in agents), dtype=np.int8),
+        'agent.controllers': np.fromiter(
+            (names.index(controller_names[type(a.controller)]) for a in agents), dtype=np.int16),
+        'obstacle.ids': np.fromiter((o.obj_id for o in obstacles), dtype=np.int64),
+        'obstacle.starts': np.array([o.position._v for o in obstacles], dtype=float).reshape(-1, 2),
+        'obstacle.ends': np.array([o.end._v for o in obstacles], dtype=float).reshape(-1, 2),
+        'rng.mt_state': np.array(mt_state, dtype=np.uint32),
+    }
+    for prefix, component in (('grid', engine._broad_phase),
+                              ('lod', engine._lod),
+                              ('decisions', engine._decisions),
+                              ('ids', engine._ids)):
+        for key, array in component.state_arrays().items():
+            arrays[f'{prefix}.{key}'] = array
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'tick': engine.tick,
+        'state': engine.state,
+        'max_speed': engine._max_speed,
+        'controller_names': names,
+        'broad_phase': engine.broad_phase_name,
+        'rng_version': version,
+        'rng_gauss_next': gauss_next,
+        'event_rng': engine._events.rng.bit_generator.state,
+        'safety_car_remaining': engine._events.safety_car_remaining,
+    }
+    return meta, arrays
+
+
+def restore(engine: SimulationEngine, meta: dict, arrays: dict[str, np.ndarray]) -> None:
+    """Replace the engine's state in place with a captured (meta, arrays) pair."""
+    if meta['format_version'] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format {meta['format_version']}")
+    # The broad phase's arrays are stored under 'grid.*' whichever structure it is.
+    if meta.get('broad_phase', 'grid') != engine.broad_phase_name:
+        raise ValueError(f"Checkpoint uses the {meta.get('broad_phase', 'grid')!r} broad phase, "
+                         f"engine uses {engine.broad_phase_name!r}")
+
+    objects = {}
+    names = meta['controller_names']
+    positions = arrays['agent.positions'].tolist()
+    directions = arrays['agent.directions'].tolist()
+    for i, obj_id in enumerate(arrays['agent.ids'].tolist()):
+        agent = Agent(Vector(*positions[i]), float(arrays['agent.speeds'][i]),
+                      Vector(*directions[i]), AGENT_STATES[arrays['agent.states'][i]], None)
+        # Agent() normalizes the heading; keep the stored one bit-for-bit.
+        agent.direction = Vector(*directions[i])
+        agent.obj_id = obj_id
+        agent.fuel = float(arrays['agent.fuel'][i])
+        agent.lap = int(arrays['agent.laps'][i])
+        agent.controller = create_controller(names[arrays['agent.controllers'][i]], agent, engine)
+        objects[obj_id] = agent
+
+    starts = arrays['obstacle.starts'].tolist()
+    ends = arrays['obstacle.ends'].tolist()
+    for i, obj_id in enumerate(arrays['obstacle.ids'].tolist()):
+        obstacle = Obstacle(Vector(*starts[i]), Vector(*ends[i]))
+        obstacle.obj_id = obj_id
+        objects[obj_id] = obstacle
+
+    engine._objects = {obj_id: objects[obj_id] for obj_id in arrays['object_order'].tolist()}
+    engine._ids.load_state_arrays(
+        {key[len('ids.'):]: array for key, array in arrays.items() if key.startswith('ids.')},
+        list(engine._objects.values()))
+    for prefix, component in (('grid', engine._broad_phase),
+                              ('lod', engine._lod),
+                              ('decisions', engine._decisions)):
+        component.load_state_arrays({key[len(prefix) + 1:]: array for key, array in arrays.items()
+                                     if key.startswith(prefix + '.')})
+
+    engine.tick = meta['tick']
+    engine.state = meta['state']
+    engine._max_speed = meta['max_speed']
+    engine._events.rng.bit_generator.state = meta['event_rng']
+    engine._events.safety_car_remaining = meta['safety_car_remaining']
+    engine.leaderboard_manager.update(
+        [obj for obj in engine._objects.values() if isinstance(obj, Agent)])
+
+    # Restored last so nothing above can advance it.
+    random.setstate((meta['rng_version'],
+                     tuple(arrays['rng.mt_state'].tolist()),
+                     meta['rng_gauss_next']))
+
+
+def digest(engine: SimulationEngine) -> str:
+    """
+    SHA-256 of the simulated state: every object, the RNGs and the safety car.
+
+    Scheduler and broad-phase bookkeeping is left out: it is derived from the rest, and
+    a restored broad phase may lay out the same contents in a different order.
+    """
+    meta, arrays = capture(engine)
+    h = hashlib.sha256()
+    h.update(json.dumps({key: meta[key] for key in ('tick', 'controller_names', 'rng_version',
+                                                    'rng_gauss_next', 'event_rng',
+                                                    'safety_car_remaining')},
+                        sort_keys=True).encode())
+    for name in sorted(arrays):
+        if name.startswith(('object_order', 'agent.', 'obstacle.', 'rng.')):
+            h.update(name.encode())
+            h.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return h.hexdigest()
+
+
+def save_checkpoint(engine: SimulationEngine, path: str) -> None:
+    meta, arrays = capture(engine)
+    write_arrays(path, meta, arrays)
+
+
+def load_checkpoint(engine: SimulationEngine, path: str) -> None:
+    meta, arrays = read_arrays(path)
+    restore(engine, meta, arrays)
@@ -0,0 +1,278 @@
+"""Collision detection over a single simulation tick: swept (continuous) and vectorized overlap tests."""
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+from controllers.heuristics.ttc import ttc_to_boundary
+from sim.object.agent import Agent
+from utils.track_sdf import get_track_sdf
+from utils.vector import Vector
+
+from configs.settings import AGENT_RADIUS
+
+# (agent, position at the start of the tick, velocity over the tick)
+Sweep = Tuple[Agent, Vector, Vector]
+
+
+def boundary_contacts(starts: np.ndarray, velocities: np.ndarray, swept: np.ndarray,
+                      dt: float) -> np.ndarray:
+    """
+    Time of impact with the track boundary within [0, dt] for every swept agent.
+
+    Only agents the SDF puts within reach of a wall pay for the exact boundary test.
+
+    Args:
+        starts: (N, 2) positions at the start of the tick.
+        velocities: (N, 2) velocities over the tick.
+        swept: (N,) True for agents that moved this tick.
+        dt: Tick length in seconds.
+
+    Returns:
+        (N,) time of impact, inf for rows without a contact.
+    """
+    toi = np.full(len(starts), np.inf)
+    sdf = get_track_sdf()
+    reach = np.sqrt(np.einsum('ij,ij->i', velocities, velocities)) * dt
+    # Allows for one cell of interpolation error, so it never skips a real hit.
+    near = swept & (np.abs(sdf.signed_distance(starts)) <= reach + sdf.resolution)
+    for row in np.flatnonzero(near).tolist():
+        t = ttc_to_boundary(Vector(*starts[row]), Vector(*velocities[row]))
+        if t <= dt:
+            toi[row] = t
+    return toi
+
+
+def sweep_contacts(starts: np.ndarray, velocities: np.ndarray, swept: np.ndarray,
+                   obstacle_starts: np.ndarray, obstacle_ends: np.ndarray, dt: float) -> np.ndarray:
+    """
+    Find the earliest time of impact within [0, dt] for every agent.
+
+    Agents move linearly inside a tick, so the swept tests are exact over the interval
+    and nothing can tunnel regardless of the tick rate. Agent pairs come from the cell
+    hash, widened by the distance both parties can travel during the tick; obstacles
+    are tested as capsules of AGENT_RADIUS around their segments.
+
+    Args:
+        starts: (N, 2) positions at the start of the tick.
+        velocities: (N, 2) velocities over the tick, zero for agents that did not move.
+        swept: (N,) True for agents that moved this tick.
+        obstacle_starts: (M, 2) obstacle segment start points.
+        obstacle_ends: (M, 2) obstacle segment end points.
+        dt: Tick length in seconds.
+
+    Returns:
+        (N,) time of impact, inf for rows without a contact. Both agents of a pair are
+        stamped, including one that did not move.
+    """
+    toi = boundary_contacts(starts, velocities, swept, dt)
+    if not swept.any():
+        return toi
+    speeds = np.sqrt(np.einsum('ij,ij->i', velocities, velocities))
+
+    i, j, _ = agent_overlaps(starts, AGENT_RADIUS + 2.0 * speeds.max() * dt)
+    keep = swept[i] | swept[j]
+    i, j = i[keep], j[keep]
+    t = _circle_toi(starts[i] - starts[j], velocities[i] - velocities[j], AGENT_RADIUS, dt)
+    hit = t <= dt
+    np.minimum.at(toi, i[hit], t[hit])
+    np.minimum.at(toi, j[hit], t[hit])
+
+    if len(obstacle_starts):
+        rows = np.flatnonzero(swept)
+        seg = obstacle_ends - obstacle_starts
+        seg_len_sq = np.maximum(np.einsum('mi,mi->m', seg, seg), 1e-12)
+        # Candidates: segments within reach of the start point, including ones the agent
+        # already touches, which the overlap pass handles instead.
+        rel = starts[rows, None, :] - obstacle_starts[None, :, :]
+        u = np.clip(np.einsum('kmi,mi->km', rel, seg) / seg_len_sq, 0.0, 1.0)
+        offset = rel - u[:, :, None] * seg[None, :, :]
+        limit = AGENT_RADIUS + speeds[rows] * dt
+        k, m = np.nonzero(np.einsum('kmi,kmi->km', offset, offset) <= (limit * limit)[:, None])
+        if len(k):
+            rows = rows[k]
+            t = _capsule_toi(starts[rows], velocities[rows], obstacle_starts[m], obstacle_ends[m],
+                             AGENT_RADIUS, dt)
+            hit = t <= dt
+            np.minimum.at(toi, rows[hit], t[hit])
+    return toi
+
+
+def _circle_toi(gaps: np.ndarray, velocities: np.ndarray, radius: float, dt: float) -> np.ndarray:
+    """
+    First time each relative position `gaps` moving at `velocities` comes within
+    `radius` of the origin; inf if it does not within [0, dt] or already is.
+    """
+    a = np.einsum('ij,ij->i', velocities, velocities)
+    b = 2.0 * np.einsum('ij,ij->i', gaps, velocities)
+    c = np.einsum('ij,ij->i', gaps, gaps) - radius * radius
+    disc = b * b - 4.0 * a * c
+    # Separated (c > 0) and closing (b < 0) pairs have both roots positive.
+    valid = (c > 0.0) & (b < 0.0) & (disc >= 0.0) & (a > 1e-12)
+    t = np.full(len(gaps), np.inf)
+    t[valid] = (-b[valid] - np.sqrt(disc[valid])) / (2.0 * a[valid])
+    t[t > dt] = np.inf
+    return t
+
+
+def _capsule_toi(positions: np.ndarray, velocities: np.ndarray, starts: np.ndarray,
+                 ends: np.ndarray, radius: float, dt: float) -> np.ndarray:
+    """
+    First time each moving point comes within `radius` of its segment, row by row;
+    inf if it does not within [0, dt] or already is.
+
+    The swept point meets the capsule either on one of its flat sides or on one of the
+    end caps, so the earliest of those three times is exact.
+    """
+    seg = ends - starts
+    length = np.maximum(np.sqrt(np.einsum('ij,ij->i', seg, seg)), 1e-12)
+    normal = np.stack([-seg[:, 1], seg[:, 0]], axis=1) / length[:, None]
+    rel = positions - starts
+    height = np.einsum('ij,ij->i', rel, normal)
+    closing = np.einsum('ij,ij->i', velocities, normal)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        side = (np.abs(height) - radius) / (-np.sign(height) * closing)
+    side_valid = (np.abs(height) > radius) & (height * closing < 0.0) & (side <= dt)
+    along = np.einsum('ij,ij->i', rel + velocities * np.where(side_valid, side, 0.0)[:, None],
+                      seg) / (length * length)
+    side_valid &= (along >= 0.0) & (along <= 1.0)
+
+    t = np.where(side_valid, side, np.inf)
+    t = np.minimum(t, _circle_toi(positions - starts, velocities, radius, dt))
+    t = np.minimum(t, _circle_toi(positions - ends, velocities, radius, dt))
+    # A point already inside the capsule is left to the overlap pass.
+    u = np.clip(np.einsum('ij,ij->i', rel, seg) / (length * length), 0.0, 1.0)
+    gap = rel - u[:, None] * seg
+    t[np.einsum('ij,ij->i', gap, gap) <= radius * radius] = np.inf
+    return t
+
+
+# Cell keys pack (cx, cy) as cx * _CELL_STRIDE + cy; track coordinates are far inside the range.
+_CELL_STRIDE = 1 << 32
+# Half of the 3x3 cell neighbourhood, so each pair of cells is visited once.
+_HALF_NEIGHBOURHOOD = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def agent_overlaps(positions: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    All pairs of points closer than `radius`, found with one sort and one distance test.
+
+    Points are hashed into cells of side `radius`, so only points in the same or an
+    adjacent cell are compared and the cost grows with N log N plus the number of
+    near pairs, not N^2.
+
+    Args:
+        positions: (N, 2) agent positions.
+        radius: Contact distance between agent centers.
+
+    Returns:
+        (i, j, distance) arrays with i < j for every overlapping pair.
+    """
+    count = len(positions)
+    if count < 2:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, np.empty(0)
+
+    keys = _cell_keys(positions, radius)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    pairs_i, pairs_j = [], []
+    for dx, dy in _HALF_NEIGHBOURHOOD:
+        target = keys + (dx * _CELL_STRIDE + dy)
+        lo = np.searchsorted(sorted_keys, target, side='left')
+        counts = np.searchsorted(sorted_keys, target, side='right') - lo
+        first = np.cumsum(counts) - counts
+        i = np.repeat(np.arange(count), counts)
+        j = order[np.arange(counts.sum()) + np.repeat(lo - first, counts)]
+        if dx == 0 and dy == 0:
+            keep = i < j
+            i, j = i[keep], j[keep]
+        pairs_i.append(i)
+        pairs_j.append(j)
+    i = np.concatenate(pairs_i)
+    j = np.concatenate(pairs_j)
+
+    gap = positions[i] - positions[j]
+    distance = np.sqrt(gap[:, 0] * gap[:, 0] + gap[:, 1] * gap[:, 1])
+    hit = distance <= radius
+    i, j = np.minimum(i[hit], j[hit]), np.maximum(i[hit], j[hit])
+    return i, j, distance[hit]
+
+
+def near_pairs(queries: np.ndarray, points: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Candidate pairs of a query and a point within `radius` of each other.
+
+    Uses the same cell hashing as agent_overlaps with cells of side `radius`, so the
+    cost grows with the number of candidates rather than queries x points. Pairs from
+    adjacent cells may be up to 2 * sqrt(2) * radius apart; callers apply their own
+    exact distance test.
+
+    Args:
+        queries: (K, 2) query positions.
+        points: (N, 2) positions searched.
+        radius: Largest distance of interest, > 0.
+
+    Returns:
+        (k, j) arrays of rows into `queries` and `points`, grouped by ascending k.
+    """
+    if not len(queries) or not len(points):
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+
+    keys = _cell_keys(points, radius)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    query_keys = _cell_keys(queries, radius)
+
+    pairs_k, pairs_j = [], []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            target = query_keys + (dx * _CELL_STRIDE + dy)
+            lo = np.searchsorted(sorted_keys, target, side='left')
+            counts = np.searchsorted(sorted_keys, target, side='right') - lo
+            first = np.cumsum(counts) - counts
+            pairs_k.append(np.repeat(np.arange(len(queries)), counts))
+            pairs_j.append(order[np.arange(counts.sum()) + np.repeat(lo - first, counts)])
+    k = np.concatenate(pairs_k)
+    j = np.concatenate(pairs_j)
+    grouped = np.argsort(k, kind='stable')
+    return k[grouped], j[grouped]
+
+
+def _cell_keys(positions: np.ndarray, size: float) -> np.ndarray:
+    cells = np.floor(positions / size).astype(np.int64)
+    return cells[:, 0] * _CELL_STRIDE + cells[:, 1]
+
+
+def segment_overlaps(positions: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                     radius: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Points closer than `radius` to any segment, tested against every segment at once.
+
+    Args:
+        positions: (N, 2) agent positions.
+        starts: (M, 2) segment start points.
+        ends: (M, 2) segment end points.
+        radius: Contact distance.
+
+    Returns:
+        (rows, closest) where `closest` (K, 2) is the nearest point on the nearest
+        touching segment for each touching row.
+    """
+    if not len(positions) or not len(starts):
+        return np.empty(0, dtype=np.intp), np.empty((0, 2))
+
+    seg = ends - starts
+    length_sq = np.maximum(np.einsum('ij,ij->i', seg, seg), 1e-12)
+    rel = positions[:, None, :] - starts[None, :, :]
+    t = np.clip(np.einsum('nmk,mk->nm', rel, seg) / length_sq, 0.0, 1.0)
+    closest = starts[None, :, :] + t[:, :, None] * seg[None, :, :]
+    gap = positions[:, None, :] - closest
+    distance_sq = np.einsum('nmk,nmk->nm', gap, gap)
+
+    nearest = np.argmin(distance_sq, axis=1)
+    rows = np.flatnonzero(distance_sq[np.arange(len(positions)), nearest] <= radius * radius)
+    return rows, closest[rows, nearest[rows]]
@@ -0,0 +1,102 @@
+"""
+Event-sourced race recording: a seed, a config hash and the external commands.
+
+The engine is deterministic given its RNG seeds, so a race can be reproduced by
+re-simulating it from the same seed and applying the same commands at the same ticks
+(see sim.engine.replay). A log is a JSON-lines file:
+
+    {"format": 1, "seed": ..., "config_hash": ..., "created": ...}     header
+    {"tick": 0, "t": ..., "op": "spawn_agents", "args": {...}}         one per command
+    {"tick": 100, "t": ..., "op": "digest", "args": {"sha256": ...}}   state checks
+
+Commands are stamped with the tick they were applied after, i.e. between update()
+`tick` and update() `tick + 1`, and with the wall clock for reference. Digests of the
+simulated state are interleaved every `digest_every` ticks so a replay can prove it
+matches the live run.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import secrets
+import time
+from typing import NamedTuple
+
+from configs.settings import cfg, COMMAND_LOG_DIGEST_EVERY
+
+FORMAT_VERSION = 1
+
+# Settings that do not change what is simulated, so a replay may differ in them.
+REPLAY_EXEMPT_KEYS = ('command_log_path', 'command_log_seed', 'log_level', 'log_file',
+                      'shm_export_name', 'agent_debug_sample_every')
+
+
+def config_hash(config: dict = cfg) -> str:
+    """SHA-256 of the settings that affect the simulation."""
+    relevant = {key: value for key, value in config.items() if key not in REPLAY_EXEMPT_KEYS}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class Command(NamedTuple):
+    tick: int
+    wall_time: float
+    op: str
+    args: dict
+
+
+class CommandLog:
+    """
+    Append-only command log, written through to its file as commands arrive.
+
+    Attributes:
+        seed: Seed of every RNG in the engine.
+        config_hash: config_hash() of the recording process.
+        commands: Commands and digests in the order they were applied.
+        digest_every: Ticks between state digests; 0 disables them.
+    """
+
+    __slots__ = ('seed', 'config_hash', 'commands', 'digest_every', '_file')
+
+    def __init__(self, seed: int, config_hash: str, commands: list[Command] | None = None,
+                 digest_every: int = COMMAND_LOG_DIGEST_EVERY):
+        self.seed = seed
+        self.config_hash = config_hash
+        self.commands: list[Command] = commands if commands is not None else []
+        self.digest_every = digest_every
+        self._file = None
+
+    @classmethod
+    def create(cls, path: str, seed: int | None = None,
+               digest_every: int = COMMAND_LOG_DIGEST_EVERY) -> CommandLog:
+        """Start a new log at `path`, drawing a fresh seed unless one is given."""
+        log = cls(secrets.randbits(63) if seed is None else seed, config_hash(),
+                  digest_every=digest_every)
+        log._file = open(path, 'w', buffering=1)
+        log._write({'format': FORMAT_VERSION, 'seed': log.seed, 'config_hash': log.config_hash,
+                    'digest_every': digest_every, 'created': time.time()})
+        return log
+
+    @classmethod
+    def load(cls, path: str) -> CommandLog:
+        with open(path) as f:
+            header = json.loads(f.readline())
+            if header.get('format') != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} command log")
+            entries = [json.loads(line) for line in f if line.strip()]
+        commands = [Command(entry['tick'], entry['t'], entry['op'], entry['args']) for entry in entries]
+        return cls(header['seed'], header['config_hash'], commands, header['digest_every'])
+
+    def append(self, tick: int, op: str, args: dict | None = None) -> None:
+        command = Command(tick, time.time(), op, args or {})
+        self.commands.append(command)
+        if self._file is not None:
+            self._write({'tick': command.tick, 't': command.wall_time,
+                         'op': command.op, 'args': command.args})
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, entry: dict) -> None:
+        self._file.write(json.dumps(entry) + '\n')
@@ -0,0 +1,186 @@
+"""Staggered controller scheduling at a decision rate below the physics rate."""
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+
+from sim.action import Action, ACTION_LIST, ACTION_INDEX
+from sim.engine.collision import agent_overlaps
+from sim.engine.world_arrays import WorldArrays
+from sim.object.agent import Agent
+
+from configs.settings import AGENT_RADIUS, DEFAULT_SEARCH_RADIUS
+
+EPS = sys.float_info.epsilon
+# Pair keys pack (lower ID, higher ID) as lower * _PAIR_STRIDE + higher.
+_PAIR_STRIDE = 1 << 32
+
+
+class DecisionScheduler:
+    """
+    Runs each agent's controller once every `stagger` physics ticks.
+
+    Agents are dealt into `stagger` groups as they are first seen, always into the
+    smallest group, and one group decides per tick, so the controller cost per tick
+    stays flat. Between its decisions an agent keeps its last action, applied as an
+    even per-tick slice (speed factor ** (1 / stagger), steering / stagger) so a
+    decision period changes speed and heading by the same amount a single decision does.
+
+    An agent re-plans early when a neighbor that was not within DEFAULT_SEARCH_RADIUS on
+    the previous tick appears with a TTC at or below `replan_ttc`. scan() finds those
+    once per tick for the whole field from array pairs, so the per-tick cost outside an
+    agent's slot is a set lookup.
+    """
+
+    __slots__ = ('stagger', 'replan_ttc', '_groups', '_group_sizes', '_held', '_slices',
+                 '_agent_pairs', '_obstacle_pairs', '_alerted')
+
+    def __init__(self, stagger: int, replan_ttc: float):
+        self.stagger = max(1, stagger)
+        self.replan_ttc = replan_ttc
+        self._groups: dict[int, int] = {}
+        self._group_sizes: list[int] = [0] * self.stagger
+        self._held: dict[int, Action] = {}
+        self._slices: dict[Action, Action] = {}
+        # Sorted pair keys within DEFAULT_SEARCH_RADIUS on the last scan.
+        self._agent_pairs = np.empty(0, dtype=np.int64)
+        self._obstacle_pairs = np.empty(0, dtype=np.int64)
+        self._alerted: set[int] = set()
+
+    def scan(self, arrays: WorldArrays) -> None:
+        """
+        Find the agents a newcomer threatens this tick; call once per tick before due().
+
+        Agent pairs come from one cell-hashed pass over the field (agent_overlaps), and
+        obstacles are matched by their start point, so TTCs are only computed for pairs
+        that were not within DEFAULT_SEARCH_RADIUS on the previous scan.
+        """
+        if self.stagger == 1:
+            return
+        ids, positions, velocities = arrays.ids, arrays.positions, arrays.velocities
+        i, j, _ = agent_overlaps(positions, DEFAULT_SEARCH_RADIUS)
+        keys = np.minimum(ids[i], ids[j]) * _PAIR_STRIDE + np.maximum(ids[i], ids[j])
+        new = ~np.isin(keys, self._agent_pairs, assume_unique=True)
+        self._agent_pairs = np.sort(keys)
+        i, j = i[new], j[new]
+        threat = _ttc_to_agent(velocities[i] - velocities[j], positions[i] - positions[j]) <= self.replan_ttc
+        alerted = set(ids[i[threat]].tolist()) | set(ids[j[threat]].tolist())
+
+        if len(arrays.obstacle_ids):
+            gap = positions[:, None, :] - arrays.obstacle_starts[None, :, :]
+            rows, m = np.nonzero(np.einsum('nmk,nmk->nm', gap, gap)
+                                 <= DEFAULT_SEARCH_RADIUS * DEFAULT_SEARCH_RADIUS)
+            keys = ids[rows] * _PAIR_STRIDE + arrays.obstacle_ids[m]
+            new = ~np.isin(keys, self._obstacle_pairs, assume_unique=True)
+            self._obstacle_pairs = np.sort(keys)
+            rows, m = rows[new], m[new]
+            ttc = _ttc_to_object(velocities[rows], positions[rows],
+                                 arrays.obstacle_starts[m], arrays.obstacle_ends[m])
+            alerted.update(ids[rows[ttc <= self.replan_ttc]].tolist())
+        else:
+            self._obstacle_pairs = np.empty(0, dtype=np.int64)
+        self._alerted = alerted
+
+    def due(self, agent: Agent, tick: int) -> bool:
+        """Return True if the agent must run its controller this tick."""
+        agent_id = agent.obj_id
+        if self.stagger == 1:
+            return True
+        group = self._groups.get(agent_id)
+        if group is None:
+            group = min(range(self.stagger), key=self._group_sizes.__getitem__)
+            self._groups[agent_id] = group
+            self._group_sizes[group] += 1
+        if agent_id not in self._held:
+            return True
+        if tick % self.stagger == group % self.stagger:
+            return True
+        return agent_id in self._alerted
+
+    def set_stagger(self, stagger: int) -> None:
+        """Change the decision period; agents keep their groups modulo the new period."""
+        stagger = max(1, stagger)
+        if stagger != self.stagger:
+            self.stagger = stagger
+            self._slices.clear()
+            self._count_groups()
+
+    def hold(self, agent_id: int, action: Action) -> None:
+        """Record a fresh decision for the agent."""
+        self._held[agent_id] = action
+
+    def held(self, agent_id: int) -> Action:
+        """Return the per-tick slice of the agent's last decision."""
+        return self._slice(self._held[agent_id])
+
+    def forget(self, agent_id: int) -> None:
+        """Drop the agent's held action and group; it decides again on its next update."""
+        self._held.pop(agent_id, None)
+        group = self._groups.pop(agent_id, None)
+        if group is not None:
+            self._group_sizes[group % self.stagger] -= 1
+
+    def _count_groups(self) -> None:
+        self._group_sizes = [0] * self.stagger
+        for group in self._groups.values():
+            self._group_sizes[group % self.stagger] += 1
+
+    def _slice(self, action: Action) -> Action:
+        if self.stagger == 1:
+            return action
+        sliced = self._slices.get(action)
+        if sliced is None:
+            sliced = Action(action.speed_factor ** (1.0 / self.stagger),
+                            action.steer_rad / self.stagger)
+            self._slices[action] = sliced
+        return sliced
+
+    def state_arrays(self) -> dict[str, np.ndarray]:
+        return {
+            'group_ids': np.fromiter(self._groups.keys(), dtype=np.int64),
+            'groups': np.fromiter(self._groups.values(), dtype=np.int64),
+            'held_ids': np.fromiter(self._held.keys(), dtype=np.int64),
+            'held_actions': np.fromiter(
+                (ACTION_INDEX[action] for action in self._held.values()), dtype=np.int64),
+            'agent_pairs': self._agent_pairs,
+            'obstacle_pairs': self._obstacle_pairs,
+        }
+
+    def load_state_arrays(self, arrays: dict[str, np.ndarray]) -> None:
+        self._groups = dict(zip(arrays['group_ids'].tolist(), arrays['groups'].tolist()))
+        self._count_groups()
+        self._held = {agent_id: ACTION_LIST[index] for agent_id, index
+                      in zip(arrays['held_ids'].tolist(), arrays['held_actions'].tolist())}
+        self._agent_pairs = np.array(arrays['agent_pairs'], dtype=np.int64)
+        self._obstacle_pairs = np.array(arrays['obstacle_pairs'], dtype=np.int64)
+        self._alerted = set()
+
+
+def _ttc_to_agent(velocities: np.ndarray, gaps: np.ndarray, radius: float = AGENT_RADIUS) -> np.ndarray:
+    """controllers.heuristics.ttc.ttc_to_agent over rows of relative velocity and position."""
+    a = np.einsum('ij,ij->i', velocities, velocities)
+    b = 2.0 * np.einsum('ij,ij->i', velocities, gaps)
+    c = np.einsum('ij,ij->i', gaps, gaps) - radius * radius
+    disc = b * b - 4.0 * a * c
+    valid = (a > EPS) & (disc >= 0.0)
+    root = np.sqrt(np.where(valid, disc, 0.0))
+    denominator = np.where(valid, 2.0 * a, 1.0)
+    t1 = (-b - root) / denominator
+    t2 = (-b + root) / denominator
+    t = np.where(t1 >= 0.0, t1, np.where(t2 >= 0.0, t2, np.inf))
+    return np.where(valid, t, np.inf)
+
+
+def _ttc_to_object(velocities: np.ndarray, positions: np.ndarray, starts: np.ndarray,
+                   ends: np.ndarray) -> np.ndarray:
+    """controllers.heuristics.ttc.ttc_to_object, row by row."""
+    seg = ends - starts
+    seg_len_sq = np.einsum('ij,ij->i', seg, seg)
+    v_dot_seg = np.einsum('ij,ij->i', velocities, seg)
+    valid = (seg_len_sq > EPS) & (np.abs(v_dot_seg) > EPS)
+    t = np.einsum('ij,ij->i', positions - starts, seg) / np.where(valid, v_dot_seg, 1.0)
+    hit = positions + velocities * t[:, None] - starts
+    proj = np.einsum('ij,ij->i', hit, seg) / np.where(valid, seg_len_sq, 1.0)
+    valid &= (t >= 0.0) & (proj >= -EPS) & (proj <= 1.0 + EPS)
+    return np.where(valid, t, np.inf)
@@ -0,0 +1,163 @@
+"""Overload governor: trades simulation detail for liveness when ticks fall behind."""
+from __future__ import annotations
+
+from utils.logger import get_logger
+
+from configs.settings import LOG_LEVEL, LOG_FILE
+from configs.settings import OVERLOAD_WINDOW, OVERLOAD_HIGH_LOAD, OVERLOAD_LOW_LOAD
+from configs.settings import OVERLOAD_BACKLOG_TICKS, OVERLOAD_ESCALATE_AFTER, OVERLOAD_RECOVER_AFTER
+
+logger = get_logger(__name__, LOG_LEVEL, LOG_FILE)
+
+# Degradation levels, mildest first. Each level keeps every degradation below it.
+LEVELS = ('normal', 'telemetry', 'decisions', 'lod', 'catch_up')
+
+
+class OverloadGovernor:
+    """
+    Watches how much wall time the simulation loop spends ticking and how far it lags.
+
+    The run loop reports every frame's busy time, ticks run and the ticks it owed on
+    entry. Once per `window` seconds of wall time those are folded into a load (share
+    of wall time spent in update()) and a backlog (most ticks owed by any frame).
+    Staying overloaded (load above `high_load` or backlog above `backlog_ticks`) for
+    `escalate_after` seconds steps down one level; staying calm (load below `low_load`
+    and backlog below half of `backlog_ticks`) for `recover_after` seconds steps back
+    up one. The gaps between the thresholds keep the level from flapping.
+
+    What each level means is up to the engine; the governor only decides and counts.
+
+    Attributes:
+        level: Current index into LEVELS.
+        load: Share of wall time spent ticking over the last window.
+        tick_ms: Mean wall time of one update() over the last window.
+        backlog: Most ticks a frame owed on entry during the last window.
+        degradations: Times each level has been entered from the one above.
+        recoveries: Times each level has been left for the one above.
+        dropped_ticks: Backlog discarded by the catch-up cap.
+    """
+
+    __slots__ = ('window', 'high_load', 'low_load', 'backlog_ticks', 'escalate_after',
+                 'recover_after', 'level', 'load', 'tick_ms', 'backlog', 'degradations',
+                 'recoveries', 'dropped_ticks', '_window_start', '_busy', '_ticks', '_backlog',
+                 '_pressure_since', '_calm_since')
+
+    def __init__(self, window: float = OVERLOAD_WINDOW, high_load: float = OVERLOAD_HIGH_LOAD,
+                 low_load: float = OVERLOAD_LOW_LOAD, backlog_ticks: float = OVERLOAD_BACKLOG_TICKS,
+                 escalate_after: float = OVERLOAD_ESCALATE_AFTER,
+                 recover_after: float = OVERLOAD_RECOVER_AFTER):
+        if not 0 <= low_load < high_load:
+            raise ValueError(f"Overload thresholds need 0 <= low_load < high_load, "
+                             f"got {low_load} and {high_load}")
+        self.window = window
+        self.high_load = high_load
+        self.low_load = low_load
+        self.backlog_ticks = backlog_ticks
+        self.escalate_after = escalate_after
+        self.recover_after = recover_after
+        self.level: int = 0
+        self.load: float = 0.0
+        self.tick_ms: float = 0.0
+        self.backlog: float = 0.0
+        self.degradations: list[int] = [0] * len(LEVELS)
+        self.recoveries: list[int] = [0] * len(LEVELS)
+        self.dropped_ticks: int = 0
+        self._window_start: float | None = None
+        self._busy: float = 0.0
+        self._ticks: int = 0
+        self._backlog: float = 0.0
+        self._pressure_since: float | None = None
+        self._calm_since: float | None = None
+
+    @property
+    def level_name(self) -> str:
+        return LEVELS[self.level]
+
+    def degraded(self, level: str) -> bool:
+        """Return True if the named degradation is currently in force."""
+        return self.level >= LEVELS.index(level)
+
+    def reset(self) -> None:
+        """Forget the current measurement window, e.g. after the loop was paused."""
+        self._window_start = None
+        self._busy = 0.0
+        self._ticks = 0
+        self._backlog = 0.0
+        self._pressure_since = None
+        self._calm_since = None
+
+    def observe(self, now: float, busy: float, ticks: int, backlog: float) -> int | None:
+        """
+        Record one frame of the run loop.
+
+        Args:
+            now: Wall clock at the end of the frame, in seconds.
+            busy: Wall time the frame spent in update().
+            ticks: update() calls made in the frame.
+            backlog: Ticks of simulated time owed when the frame started.
+
+        Returns:
+            The new level if it changed, else None.
+        """
+        if self._window_start is None:
+            self._window_start = now
+        self._busy += busy
+        self._ticks += ticks
+        self._backlog = max(self._backlog, backlog)
+        elapsed = now - self._window_start
+        if elapsed < self.window:
+            return None
+
+        self.load = self._busy / elapsed
+        if self._ticks:
+            self.tick_ms = 1000.0 * self._busy / self._ticks
+        self.backlog = self._backlog
+        self._window_start = now
+        self._busy = 0.0
+        self._ticks = 0
+        self._backlog = 0.0
+
+        if self.load > self.high_load or self.backlog > self.backlog_ticks:
+            self._calm_since = None
+            if self._pressure_since is None:
+                self._pressure_since = now
+            elif now - self._pressure_since >= self.escalate_after and self.level < len(LEVELS) - 1:
+                self._pressure_since = now
+                return self._set_level(self.level + 1)
+        elif self.load < self.low_load and self.backlog < self.backlog_ticks / 2:
+            self._pressure_since = None
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since >= self.recover_after and self.level > 0:
+                self._calm_since = now
+                return self._set_level(self.level - 1)
+        else:
+            self._pressure_since = None
+            self._calm_since = None
+        return None
+
+    def _set_level(self, level: int) -> int:
+        if level > self.level:
+            self.degradations[level] += 1
+            logger.warning("overload: degrading %s", LEVELS[level],
+                           extra={'level': level, 'load': self.load, 'tick_ms': self.tick_ms,
+                                  'backlog': self.backlog})
+        else:
+            self.recoveries[self.level] += 1
+            logger.info("overload: recovered %s", LEVELS[self.level],
+                        extra={'level': level, 'load': self.load, 'tick_ms': self.tick_ms,
+                               'backlog': self.backlog})
+        self.level = level
+        return level
+
+    def metrics(self) -> dict:
+        return {
+            'level': self.level,
+            'level_name': self.level_name,
+            'load': self.load,
+            'tick_ms': self.tick_ms,
+            'backlog_ticks': self.backlog,
+            'dropped_ticks': self.dropped_ticks,
+            'degradations': dict(zip(LEVELS[1:], self.degradations[1:])),
+            'recoveries': dict(zip(LEVELS[1:], self.recoveries[1:])),
+        }
@@ -0,0 +1,77 @@
+"""Level-of-detail scheduling: isolated agents coast instead of running their controller."""
+from __future__ import annotations
+
+import numpy as np
+
+from controllers.heuristics.ttc import ttc_to_boundary
+from sim.action import DEFAULT_ACTIONS
+from sim.engine.world_view import WorldView
+from sim.object.agent import Agent
+from utils.track_sdf import get_track_sdf
+
+from configs.settings import DEFAULT_SEARCH_RADIUS, DEFAULT_TIME_HORIZON_UPPER
+
+# Fastest any controller can grow its speed in one tick.
+MAX_SPEED_GROWTH = max(action.speed_factor for action in DEFAULT_ACTIONS.values())
+
+
+class LevelOfDetailScheduler:
+    """
+    Tracks which agents are provably safe to coast for the next few ticks.
+
+    After a full controller evaluation, an agent is granted `safe_ticks` ticks of
+    constant-velocity coasting when, over that window:
+        - its boundary TTC stays above DEFAULT_TIME_HORIZON_UPPER, and
+        - nothing can reach its controller search radius, even if the fastest agent
+          accelerates every tick straight towards it.
+    Under those conditions the controller would only ever cruise, so it is skipped.
+    Coasting agents do not take the controller's random soft accelerations.
+    """
+
+    __slots__ = ('safe_ticks', '_safe_until')
+
+    def __init__(self, safe_ticks: int):
+        self.safe_ticks = safe_ticks
+        self._safe_until: dict[int, int] = {}
+
+    def is_coasting(self, agent_id: int, tick: int) -> bool:
+        return tick < self._safe_until.get(agent_id, 0)
+
+    def reassess(self, agent: Agent, world_view: WorldView, tick: int,
+                 max_speed: float, dt: float) -> None:
+        """Grant the agent a coasting window if it is isolated for the next `safe_ticks`."""
+        if self.safe_ticks <= 0 or agent.state in ('crashed', 'out_of_fuel'):
+            return
+
+        window = self.safe_ticks * dt
+        position = agent.position
+        if not get_track_sdf().clear_of_walls(position.x, position.y,
+                                              agent.speed * (window + DEFAULT_TIME_HORIZON_UPPER)):
+            bound_ttc = ttc_to_boundary(position, agent.direction * agent.speed)
+            if bound_ttc - window <= DEFAULT_TIME_HORIZON_UPPER:
+                return
+
+        closing_speed = agent.speed + max_speed * MAX_SPEED_GROWTH ** self.safe_ticks
+        envelope = DEFAULT_SEARCH_RADIUS + closing_speed * window
+        for neighbor_id in world_view.get_neighbors(agent.position, envelope):
+            if neighbor_id != agent.obj_id:
+                return
+
+        self._safe_until[agent.obj_id] = tick + 1 + self.safe_ticks
+
+    def promote(self, agent_id: int) -> None:
+        """Return an agent to full evaluation from the next tick."""
+        self._safe_until.pop(agent_id, None)
+
+    def promote_all(self) -> None:
+        """Invalidate every coasting window, e.g. after objects are added to the world."""
+        self._safe_until.clear()
+
+    def state_arrays(self) -> dict[str, np.ndarray]:
+        return {
+            'ids': np.fromiter(self._safe_until.keys(), dtype=np.int64),
+            'safe_until': np.fromiter(self._safe_until.values(), dtype=np.int64),
+        }
+
+    def load_state_arrays(self, arrays: dict[str, np.ndarray]) -> None:
+        self._safe_until = dict(zip(arrays['ids'].tolist(), arrays['safe_until'].tolist()))
@@ -0,0 +1,209 @@
+"""
+Deterministic replay of a command log (see sim.engine.command_log).
+
+A Replay re-simulates the race from the log's seed, applying each command after the
+tick it was recorded at. It keeps an in-memory checkpoint every `checkpoint_every`
+ticks it passes, so seeking to a tick only re-simulates from the nearest checkpoint
+at or before it.
+
+    python -m sim.engine.replay verify race.jsonl
+    python -m sim.engine.replay frame race.jsonl --tick 6000
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import sys
+from typing import Callable
+
+from sim.engine import checkpoint
+from sim.engine.command_log import Command, CommandLog, config_hash
+from sim.engine.sim_engine import SimulationEngine
+from sim.engine.snapshot import Snapshot
+from utils.vector import Vector
+
+from configs.settings import REPLAY_CHECKPOINT_EVERY
+
+
+def _add_obstacle(engine: SimulationEngine, start: list[float], end: list[float]) -> None:
+    engine.add_obstacle(Vector(*start), Vector(*end))
+
+
+def _set_overload_level(engine: SimulationEngine, level: int) -> None:
+    engine.governor.level = level
+    engine._apply_overload_level()
+
+
+# How each recorded op is re-applied. Ops missing here (start, pause) only mark the
+# wall clock and do not change what is simulated.
+APPLY: dict[str, Callable[..., None]] = {
+    'spawn_agents': SimulationEngine.init_agents,
+    'spawn_obstacles': SimulationEngine.init_obstacles,
+    'add_obstacle': _add_obstacle,
+    'remove_object': SimulationEngine.remove_object,
+    'load_checkpoint': SimulationEngine.load_checkpoint,
+    'overload': _set_overload_level,
+}
+
+
+class ReplayMismatch(Exception):
+    """The replayed state differs from the digest recorded by the live run."""
+
+    def __init__(self, tick: int, expected: str, actual: str):
+        super().__init__(f"Replay diverged at tick {tick}: recorded {expected[:12]}, "
+                         f"replayed {actual[:12]}")
+        self.tick = tick
+        self.expected = expected
+        self.actual = actual
+
+
+class Replay:
+    """
+    Re-simulates a recorded race on demand.
+
+    Attributes:
+        log: The command log being replayed.
+        engine: Engine holding the replayed state; seek() moves it.
+        checkpoint_every: Ticks between the checkpoints kept for seeking.
+        check_digests: Compare recorded digests while re-simulating.
+    """
+
+    __slots__ = ('log', 'engine', 'checkpoint_every', 'check_digests', '_checkpoints',
+                 '_checkpoint_ticks', '_next')
+
+    def __init__(self, log: CommandLog, checkpoint_every: int = REPLAY_CHECKPOINT_EVERY,
+                 check_digests: bool = True, strict_config: bool = True):
+        if strict_config and log.config_hash != config_hash():
+            raise ValueError("The log was recorded with different settings "
+                             f"({log.config_hash[:12]}, here {config_hash()[:12]})")
+        self.log = log
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.check_digests = check_digests
+        self.engine = SimulationEngine()
+        self.engine.seed(log.seed)
+        # tick -> (checkpoint meta, arrays, overload level, index of the next command)
+        self._checkpoints: dict[int, tuple[dict, dict, int, int]] = {}
+        self._checkpoint_ticks: list[int] = []
+        self._next = 0
+        self._save_checkpoint()
+
+    @property
+    def tick(self) -> int:
+        return self.engine.tick
+
+    @property
+    def last_tick(self) -> int:
+        """Tick of the last recorded command or digest."""
+        return self.log.commands[-1].tick if self.log.commands else 0
+
+    def seek(self, tick: int) -> SimulationEngine:
+        """
+        Move the engine to `tick`, with every command recorded at or before it applied.
+
+        Returns:
+            The replay engine; it stays owned by the replay and moves on the next seek.
+        """
+        if tick < 0:
+            raise ValueError(f"Cannot seek to negative tick {tick}")
+        # Commands before the current tick are always applied, so the engine can simply
+        # run on unless the target is behind it or a checkpoint is closer.
+        nearest = self._nearest_checkpoint(tick)
+        if tick < self.engine.tick or nearest > self.engine.tick:
+            self._restore(nearest)
+
+        commands = self.log.commands
+        while self._next < len(commands) and commands[self._next].tick <= tick:
+            command = commands[self._next]
+            self._advance(command.tick)
+            self._apply(command)
+            self._next += 1
+        self._advance(tick)
+        return self.engine
+
+    def frame(self, tick: int) -> Snapshot:
+        """The telemetry snapshot the live run had at `tick`."""
+        return self.seek(tick).snapshot()
+
+    def verify(self) -> int:
+        """
+        Replay the whole log from the start, checking every recorded digest.
+
+        Returns:
+            Number of digests that matched.
+
+        Raises:
+            ReplayMismatch: at the first digest that differs.
+        """
+        self._restore(0)
+        checked = self.check_digests
+        self.check_digests = True
+        try:
+            self.seek(self.last_tick)
+        finally:
+            self.check_digests = checked
+        return sum(1 for command in self.log.commands if command.op == 'digest')
+
+    def _advance(self, tick: int) -> None:
+        engine = self.engine
+        while engine.tick < tick:
+            engine.update()
+            if engine.tick % self.checkpoint_every == 0 and engine.tick not in self._checkpoints:
+                self._save_checkpoint()
+
+    def _apply(self, command: Command) -> None:
+        if command.op == 'digest':
+            if self.check_digests:
+                actual = checkpoint.digest(self.engine)
+                if actual != command.args['sha256']:
+                    raise ReplayMismatch(command.tick, command.args['sha256'], actual)
+            return
+        apply = APPLY.get(command.op)
+        if apply is not None:
+            apply(self.engine, **command.args)
+
+    def _nearest_checkpoint(self, tick: int) -> int:
+        return self._checkpoint_ticks[bisect.bisect_right(self._checkpoint_ticks, tick) - 1]
+
+    def _save_checkpoint(self) -> None:
+        engine = self.engine
+        meta, arrays = checkpoint.capture(engine)
+        self._checkpoints[engine.tick] = (meta, arrays, engine.governor.level, self._next)
+        bisect.insort(self._checkpoint_ticks, engine.tick)
+
+    def _restore(self, tick: int) -> None:
+        meta, arrays, level, index = self._checkpoints[tick]
+        engine = self.engine
+        checkpoint.restore(engine, meta, arrays)
+        engine.governor.level = level
+        engine._apply_overload_level()
+        engine.analytics.reset()
+        engine._invalidate()
+        self._next = index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay or verify a KINESIS command log")
+    parser.add_argument("action", choices=("verify", "frame"))
+    parser.add_argument("log", help="command log written with command_log_path set")
+    parser.add_argument("--tick", type=int, help="tick to reproduce (frame; default: last)")
+    parser.add_argument("--ignore-config", action="store_true",
+                        help="replay even if the settings differ from the recording")
+    args = parser.parse_args()
+
+    replay = Replay(CommandLog.load(args.log), strict_config=not args.ignore_config)
+    if args.action == 'verify':
+        try:
+            count = replay.verify()
+        except ReplayMismatch as e:
+            print(e)
+            sys.exit(1)
+        print(f"Replay matches the recording: {count} digests through tick {replay.last_tick}")
+        return
+
+    tick = replay.last_tick if args.tick is None else args.tick
+    print(json.dumps(json.loads(replay.frame(tick).body)))
+
+
+if __name__ == "__main__":
+    main()
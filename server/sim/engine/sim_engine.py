@@ -1,96 +1,648 @@
 from utils.vector import Vector
-from utils.init_utils import create_initial_position, random_j_vector
+from utils.init_utils import create_initial_position, random_j_vector, grid_slots
 from controllers.heuristics.spatial_hash_grid import SpatialHashGrid
-from controllers.heuristics.heuristics_controller import HeuristicController
+from controllers.heuristics.sweep_and_prune import SweepAndPrune
+from controllers.heuristics import heuristics_controller  # noqa: F401  registers 'heuristic'
+from controllers.heuristics import lookahead_controller  # noqa: F401  registers 'lookahead'
+from controllers.registry import create_controller, assign_controllers
+from controllers.controller import Controller
 from sim.object.sim_object import Object
 from sim.object.agent import Agent
 from sim.object.obstacle import Obstacle
+from sim.object.id_registry import IdRegistry
 from sim.engine.world_view import WorldView
+from sim.engine.collision import sweep_contacts, boundary_contacts, agent_overlaps, segment_overlaps, Sweep
+from sim.engine.lod import LevelOfDetailScheduler
+from sim.engine.decision_scheduler import DecisionScheduler
+from sim.engine.governor import OverloadGovernor
+from sim.engine.command_log import CommandLog
+from sim.engine.world_arrays import WorldArrays
+from sim.engine.world_fork import WorldFork
+from sim.engine.snapshot import Snapshot
+from sim.engine import checkpoint
+from sim.events import Event, EventBus, RandomEventEngine
+from sim.analytics import RaceAnalytics
+from sim.action import ACTION_LIST
+from telemetry.shm_ring import RingWriter
+from utils.track_geometry import lateral_frame
+from utils.track_sdf import get_track_sdf
 
 from configs.settings import DEFAULT_SEARCH_RADIUS, NUM_AGENTS, MAX_SPEED
-from configs.settings import DEFAULT_CONTROLLER, SIM_TICK_RATE, NUM_OBSTACLES
+from configs.settings import CONTROLLER_MIX, SIM_TICK_RATE, NUM_OBSTACLES
+from configs.settings import LOG_LEVEL, LOG_FILE, CCD_ENABLED, LOD_SAFE_TICKS, BROAD_PHASE
+from configs.settings import SHM_EXPORT_CAPACITY, SHM_EXPORT_SLOTS
+from configs.settings import AGENT_RADIUS, COLLISION_RESPONSE, RESTITUTION
+from configs.settings import DECISION_TICK_RATE, REPLAN_TTC_THRESHOLD, WARP_CHUNK_TICKS, MAX_SKIP_SECONDS
+from configs.settings import DEGRADED_TELEMETRY_RATE, DEGRADED_DECISION_SLOWDOWN
+from configs.settings import DEGRADED_LOD_SLOWDOWN, MAX_CATCH_UP_TICKS, SPAWN_SPACING
 from sim.engine.leaderboard import LeaderboardManager
+from utils.logger import get_logger
 
+from collections import defaultdict
+from typing import Iterable
+import logging
+import math
 import random
 import time
 import asyncio
 
+import numpy as np
+
 DT = 1.0 / SIM_TICK_RATE
 
+# Interchangeable neighbor-search structures, selected by the `broad_phase` setting.
+BROAD_PHASES = {
+    'grid': lambda: SpatialHashGrid(cell_size=5.0),
+    'sweep_and_prune': SweepAndPrune,
+}
+
+# What happens to an agent that makes contact: it crashes, or it is pushed apart and
+# rebounds with RESTITUTION of its approach speed.
+COLLISION_RESPONSES = ('crash', 'bounce')
+
+logger = get_logger(__name__, LOG_LEVEL, LOG_FILE)
+
 
 class SimulationEngine(WorldView):
     """Core simulation engine managing agents and obstacles."""
 
-    __slots__ = ('_objects', '_spatial_hash_grid', 'state', 'leaderboard_manager')
+    __slots__ = ('_objects', '_ids', 'broad_phase_name', '_broad_phase', 'state',
+                 'leaderboard_manager', 'tick', 'version', '_lod', '_decisions', '_max_speed', '_arrays_cache',
+                 '_snapshot_cache', '_tick_event', 'event_bus', '_events', 'time_scale',
+                 '_fast_forwards', '_exporter', 'analytics', 'collision_response', 'governor',
+                 'command_log')
 
-    def __init__(self):
+    def __init__(self, broad_phase: str = BROAD_PHASE, collision_response: str = COLLISION_RESPONSE):
+        if broad_phase not in BROAD_PHASES:
+            raise ValueError(f"Unknown broad phase {broad_phase!r}; expected one of {tuple(BROAD_PHASES)}")
+        if collision_response not in COLLISION_RESPONSES:
+            raise ValueError(f"Unknown collision response {collision_response!r}; "
+                             f"expected one of {COLLISION_RESPONSES}")
         self._objects: dict[int, Object] = {}
-        self._spatial_hash_grid = SpatialHashGrid(cell_size=5.0)
+        self._ids = IdRegistry()
+        self.broad_phase_name = broad_phase
+        self._broad_phase: SpatialHashGrid | SweepAndPrune = BROAD_PHASES[broad_phase]()
         self.state: str = 'initialized'
         self.leaderboard_manager = LeaderboardManager()
+        self.tick: int = 0
+        # Bumped on every change to what snapshot() returns, within a tick or across one.
+        self.version: int = 0
+        self._lod = LevelOfDetailScheduler(LOD_SAFE_TICKS)
+        self._decisions = DecisionScheduler(
+            round(SIM_TICK_RATE / DECISION_TICK_RATE), REPLAN_TTC_THRESHOLD)
+        self._max_speed: float = 0.0
+        self._arrays_cache: WorldArrays | None = None
+        self._snapshot_cache: Snapshot | None = None
+        self._tick_event = asyncio.Event()
+        self.event_bus = EventBus()
+        self._events = RandomEventEngine(DT)
+        self.time_scale: float = 1.0
+        # fast_forward() calls in progress; several may overlap.
+        self._fast_forwards: int = 0
+        self._exporter: RingWriter | None = None
+        self.analytics = RaceAnalytics(DT)
+        self.collision_response = collision_response
+        self.governor = OverloadGovernor()
+        self.command_log: CommandLog | None = None
 
     async def run(self):
         accumulator = 0.0
         prev_time = time.perf_counter()
+        self.governor.reset()
         while self.state == 'running':
             now = time.perf_counter()
             frame_time = now - prev_time
             prev_time = now
-            accumulator += frame_time
 
-            while accumulator >= DT:
-                self.update()
-                accumulator -= DT
+            if self._fast_forwards:
+                # fast_forward() owns the clock; don't bank the wall time it spends.
+                accumulator = 0.0
+            elif math.isinf(self.time_scale):
+                for _ in range(WARP_CHUNK_TICKS):
+                    self.update()
+            else:
+                accumulator += frame_time * self.time_scale
+                owed = accumulator / DT
+                ticks = 0
+                if accumulator >= DT:
+                    # Capped catch-up is the last resort: owed ticks beyond the cap are
+                    # dropped, so the race slows down against the wall clock instead.
+                    cap = MAX_CATCH_UP_TICKS if self.governor.degraded('catch_up') else math.inf
+                    while accumulator >= DT and ticks < cap:
+                        self.update()
+                        accumulator -= DT
+                        ticks += 1
+                    if accumulator >= DT:
+                        dropped = int(accumulator / DT)
+                        self.governor.dropped_ticks += dropped
+                        accumulator -= dropped * DT
+                end = time.perf_counter()
+                level = self.governor.observe(end, end - now, ticks, owed)
+                if level is not None:
+                    self._apply_overload_level()
 
             await asyncio.sleep(0)
 
-    def init_agents(self, num_agents: int = NUM_AGENTS, max_speed: int = MAX_SPEED) -> None:
-        for i in range(num_agents):
-            controller = HeuristicController(
-                agent=None, world_view=self) if DEFAULT_CONTROLLER == 'heuristic' else None
-            agent = Agent(
-                position=create_initial_position(),
-                speed=random.uniform(50, max_speed),
-                direction=Vector(-1, 0),
-                state='idle',
-                controller=controller
-            )
-            if isinstance(controller, HeuristicController):
-                controller.agent = agent
-            self._objects[agent.obj_id] = agent
-            self._spatial_hash_grid.insert(
-                agent.obj_id, agent.position.x, agent.position.y)
+    def _apply_overload_level(self) -> None:
+        """Set decision and LOD rates for the governor's level; telemetry reads it directly."""
+        stagger = round(SIM_TICK_RATE / DECISION_TICK_RATE)
+        if self.governor.degraded('decisions'):
+            stagger *= DEGRADED_DECISION_SLOWDOWN
+        self._decisions.set_stagger(stagger)
+        self._lod.safe_ticks = LOD_SAFE_TICKS * (DEGRADED_LOD_SLOWDOWN if self.governor.degraded('lod') else 1)
+        self.record_command('overload', level=self.governor.level)
+
+    @property
+    def telemetry_period(self) -> float:
+        """Shortest interval between frames of one subscription; 0 when not degraded."""
+        return 1.0 / DEGRADED_TELEMETRY_RATE if self.governor.degraded('telemetry') else 0.0
+
+    def _changed(self) -> None:
+        """Move to a new version and wake everything waiting in wait_for_tick()."""
+        self.version += 1
+        self._tick_event.set()
+        self._tick_event = asyncio.Event()
+
+    async def wait_for_tick(self, version: int, timeout: float) -> bool:
+        """
+        Wait until the version differs from `version`, for at most `timeout` seconds.
+
+        Waiters only run when the loop yields, so a frame of several ticks wakes them once.
+
+        Returns:
+            True if the version changed.
+        """
+        if self.version != version:
+            return True
+        try:
+            await asyncio.wait_for(self._tick_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.version != version
+
+    def set_time_scale(self, scale: float) -> None:
+        """Run at `scale` x real time; math.inf runs as fast as possible."""
+        if not scale > 0:
+            raise ValueError(f"Time scale must be positive, got {scale}")
+        self.time_scale = scale
+        self._snapshot_cache = None
+        self._changed()
+
+    async def fast_forward(self, seconds: float) -> int:
+        """
+        Simulate `seconds` of race time as fast as possible, then carry on at the
+        current time scale without trying to catch up on the wall time spent.
+        Yields to the event loop every WARP_CHUNK_TICKS ticks so telemetry keeps flowing.
+
+        Returns:
+            Number of ticks simulated.
+
+        Raises:
+            ValueError: if `seconds` is not in (0, MAX_SKIP_SECONDS].
+        """
+        if not 0 < seconds <= MAX_SKIP_SECONDS:
+            raise ValueError(f"Skip must be more than 0 and at most {MAX_SKIP_SECONDS} seconds, got {seconds}")
+        ticks = round(seconds / DT)
+        done = 0
+        self._fast_forwards += 1
+        try:
+            while done < ticks:
+                for _ in range(min(WARP_CHUNK_TICKS, ticks - done)):
+                    self.update()
+                    done += 1
+                await asyncio.sleep(0)
+        finally:
+            self._fast_forwards -= 1
+        return done
+
+    def seed(self, seed: int) -> None:
+        """Seed every RNG the simulation draws from, for a reproducible race."""
+        random.seed(seed)
+        self._events.rng = np.random.Generator(np.random.PCG64(seed))
+
+    def record_commands(self, log: CommandLog) -> None:
+        """
+        Seed the engine from `log` and append every external command to it from now on.
+
+        Recording has to start from an empty world, before anything has drawn from the
+        RNGs, so replaying the log from its seed reproduces the race.
+        """
+        if self._objects or self.tick:
+            raise ValueError("Command recording must start before any object is spawned")
+        self.seed(log.seed)
+        self.command_log = log
+
+    def stop_recording(self) -> None:
+        """Write a final digest so the whole recording can be verified, and close the log."""
+        if self.command_log is not None:
+            self.command_log.append(self.tick, 'digest', {'sha256': checkpoint.digest(self)})
+            self.command_log.close()
+            self.command_log = None
+
+    def record_command(self, op: str, **args) -> None:
+        """Append a command applied after this tick to the command log, if recording."""
+        if self.command_log is not None:
+            self.command_log.append(self.tick, op, args)
+
+    def init_agents(self, num_agents: int = NUM_AGENTS, max_speed: int = MAX_SPEED,
+                    controller_mix: dict[str, float] = CONTROLLER_MIX) -> None:
+        self.record_command('spawn_agents', num_agents=num_agents, max_speed=max_speed,
+                            controller_mix=controller_mix)
+        controller_names = assign_controllers(controller_mix, num_agents)
+        positions, headings = self._starting_slots(num_agents)
+        speeds = np.random.default_rng(random.getrandbits(64)).uniform(50, max_speed, num_agents).tolist()
+        agents = [Agent(Vector(x, y), speed, Vector(hx, hy), 'idle', None)
+                  for (x, y), (hx, hy), speed in zip(positions.tolist(), headings.tolist(), speeds)]
+        ids = self._ids.allocate_many(agents)
+        for agent, obj_id, name in zip(agents, ids, controller_names):
+            agent.obj_id = obj_id
+            agent.controller = create_controller(name, agent, self)
+        self._objects.update(zip(ids, agents))
+        self._broad_phase.insert_many(ids, positions)
+        self._max_speed = max([self._max_speed, *speeds])
+        self._lod.promote_all()
+        self._invalidate()
+
+    def _starting_slots(self, count: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The first `count` free starting-grid slots: on the track, clear of the walls and
+        of every agent and obstacle already in the world.
+
+        Returns:
+            (positions, headings), both (count, 2).
+        """
+        positions, headings = grid_slots()
+        free = get_track_sdf().on_track(positions, AGENT_RADIUS)
+        agents = [obj for obj in self._objects.values() if isinstance(obj, Agent)]
+        if agents:
+            occupied = np.array([agent.position._v for agent in agents], dtype=float)
+            i, j, _ = agent_overlaps(np.concatenate([occupied, positions]), 2.0 * AGENT_RADIUS)
+            # Pairs come out with i < j, so a slot touching an agent is always j.
+            free[j[i < len(occupied)] - len(occupied)] = False
+        obstacles = [obj for obj in self._objects.values() if isinstance(obj, Obstacle)]
+        if obstacles:
+            rows, _ = segment_overlaps(
+                positions, np.array([o.position._v for o in obstacles], dtype=float),
+                np.array([o.end._v for o in obstacles], dtype=float), AGENT_RADIUS)
+            free[rows] = False
+        rows = np.flatnonzero(free)[:count]
+        if len(rows) < count:
+            raise ValueError(f"The starting grid has room for {len(rows)} more agents at "
+                             f"{SPAWN_SPACING} m spacing, {count} requested")
+        return positions[rows], headings[rows]
 
     def init_obstacles(self, num_obstacles: int = NUM_OBSTACLES) -> None:
+        self.record_command('spawn_obstacles', num_obstacles=num_obstacles)
         for i in range(num_obstacles):
             obstacle = Obstacle(create_initial_position(), random_j_vector())
-            self._objects[obstacle.obj_id] = obstacle
-            self._spatial_hash_grid.insert(
-                obstacle.obj_id, obstacle.position.x, obstacle.position.y)
+            self._register(obstacle)
+        self._lod.promote_all()
+        self._invalidate()
 
     def update(self) -> None:
-        print(self.get_agent_state());
-        for obj in self._objects.values():
-            if isinstance(obj, Agent):
-                if (obj.state in ('crashed', 'out_of_fuel')):
-                    continue
-                obj.update_agent_state(DT)
-                self._spatial_hash_grid.move(
-                    obj.obj_id, obj.position.x, obj.position.y)
-        self.leaderboard_manager.update(self._objects.values())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("tick", extra={'agents': self.get_agent_state()})
+        world_arrays = self.world_arrays()
+        if self._events.step(world_arrays.agents, world_arrays.active, world_arrays.crashed,
+                             world_arrays.speeds, self.tick + 1, self.event_bus):
+            self._arrays_cache = None
+            world_arrays = self.world_arrays()
 
-    def get_object_by_id(self, obj_id: int) -> Object:
-        if obj_id in self._objects:
-            return self._objects[obj_id]
+        agents = world_arrays.agents
+        self._decisions.scan(world_arrays)
+        active: list[Agent] = []
+        deciding: list[int] = []
+        for row, obj in enumerate(agents):
+            if (obj.state in ('crashed', 'out_of_fuel')):
+                continue
+            active.append(obj)
+            if self._lod.is_coasting(obj.obj_id, self.tick):
+                self._decisions.forget(obj.obj_id)
+            elif self._decisions.due(obj, self.tick):
+                deciding.append(row)
+
+        if deciding:
+            self._decide(deciding)
+
+        sweeps: list[Sweep] = []
+        max_speed = 0.0
+        for obj in active:
+            start = obj.position
+            if self._lod.is_coasting(obj.obj_id, self.tick):
+                obj.coast(DT)
+            else:
+                obj.update_agent_state(DT, self._decisions.held(obj.obj_id))
+            max_speed = max(max_speed, obj.speed)
+            if obj.position is not start:
+                sweeps.append((obj, start, (obj.position - start) * (1.0 / DT)))
+            self._broad_phase.move(
+                obj.obj_id, obj.position.x, obj.position.y)
+        for row in deciding:
+            self._lod.reassess(agents[row], self, self.tick, max_speed, DT)
+        self._collide(sweeps)
+        self._max_speed = max_speed
+        self.tick += 1
+        self._invalidate()
+        # These read the arrays the next update() starts from, so none adds a snapshot.
+        world_arrays = self.world_arrays()
+        self.leaderboard_manager.update(world_arrays.agents)
+        self.analytics.observe(self.tick, world_arrays)
+        if self._exporter is not None:
+            self._publish()
+        if self.command_log is not None and self.command_log.digest_every \
+                and self.tick % self.command_log.digest_every == 0:
+            self.command_log.append(self.tick, 'digest', {'sha256': checkpoint.digest(self)})
+
+    def _decide(self, deciding: list[int]) -> None:
+        """Run predict_batch once per controller type over one shared snapshot."""
+        world_arrays = self.world_arrays()
+        agents = world_arrays.agents
+        groups: dict[type[Controller], list[int]] = defaultdict(list)
+        for row in deciding:
+            groups[type(agents[row].controller)].append(row)
+
+        for controller_cls, rows in groups.items():
+            action_indices = controller_cls.predict_batch(np.asarray(rows), world_arrays)
+            for row, action_index in zip(rows, action_indices):
+                self._decisions.hold(agents[row].obj_id, ACTION_LIST[action_index])
 
-        raise KeyError(f"Object ID {obj_id} not found in simulation.")
+    def _collide(self, sweeps: list[Sweep]) -> None:
+        """
+        Collision phase, run once after integration: find every contact made this tick
+        and apply the configured response to the agents involved.
+
+        Swept tests (CCD, or a discrete boundary crossing test without it) move each
+        contacting agent back to where its contact happened. One vectorized overlap test
+        then covers agent pairs and obstacles at the resulting positions.
+        """
+        # The arrays were built before integration, which only moved the swept agents.
+        arrays = self.world_arrays()
+        agents = arrays.agents
+        starts = np.array(arrays.positions)
+        sweep_velocities = np.zeros_like(starts)
+        swept = np.zeros(len(agents), dtype=bool)
+        if sweeps:
+            order = np.argsort(arrays.ids)
+            sweep_rows = order[np.searchsorted(arrays.ids, np.fromiter(
+                (agent.obj_id for agent, _, _ in sweeps), dtype=np.int64, count=len(sweeps)), sorter=order)]
+            starts[sweep_rows] = [start._v for _, start, _ in sweeps]
+            sweep_velocities[sweep_rows] = [velocity._v for _, _, velocity in sweeps]
+            swept[sweep_rows] = True
+        if CCD_ENABLED:
+            toi = sweep_contacts(starts, sweep_velocities, swept, arrays.obstacle_starts,
+                                 arrays.obstacle_ends, DT)
+        else:
+            toi = boundary_contacts(starts, sweep_velocities, swept, DT)
+        hit = np.isfinite(toi)
+        for row in np.flatnonzero(hit & swept).tolist():
+            # Sub-step only the colliding agent back to where the contact happened.
+            agents[row].position = Vector(*(starts[row] + sweep_velocities[row] * toi[row]))
+
+        live = np.fromiter((a.state not in ('crashed', 'out_of_fuel') for a in agents),
+                           dtype=bool, count=len(agents))
+        positions = np.array([a.position._v for a in agents], dtype=float).reshape(-1, 2)
+        velocities = np.array([(a.direction * a.speed)._v for a in agents], dtype=float).reshape(-1, 2)
+        # Swept contacts end exactly at the contact distance; allow for rounding.
+        reach = AGENT_RADIUS * (1.0 + 1e-9)
+
+        # Contact normals per row, pointing away from what was hit.
+        normals = np.zeros_like(positions)
+        push = np.zeros_like(positions)
+
+        # Touching counts as a contact only while closing, so agents resting against each
+        # other or separating after a bounce are not hit again every tick.
+        i, j, distance = agent_overlaps(positions, reach)
+        gap = positions[i] - positions[j]
+        away = gap / np.maximum(distance, 1e-12)[:, None]
+        closing = np.einsum('ij,ij->i', velocities[i] - velocities[j], away) < 0.0
+        involved = (live[i] | live[j]) & closing
+        i, j, distance, away = i[involved], j[involved], distance[involved], away[involved]
+        if len(i):
+            # Each live agent takes its share of the penetration; all of it against a wreck.
+            depth = (AGENT_RADIUS - distance) / np.where(live[i] & live[j], 2.0, 1.0)
+            np.add.at(normals, i, away)
+            np.add.at(normals, j, -away)
+            np.add.at(push, i, away * depth[:, None])
+            np.add.at(push, j, -away * depth[:, None])
+            hit[i] = True
+            hit[j] = True
+
+        if len(arrays.obstacle_starts):
+            rows, closest = segment_overlaps(positions, arrays.obstacle_starts, arrays.obstacle_ends, reach)
+            gap = positions[rows] - closest
+            distance = np.sqrt(np.einsum('ij,ij->i', gap, gap))
+            away = gap / np.maximum(distance, 1e-12)[:, None]
+            involved = live[rows] & (np.einsum('ij,ij->i', velocities[rows], away) < 0.0)
+            rows, distance, away = rows[involved], distance[involved], away[involved]
+            np.add.at(normals, rows, away)
+            np.add.at(push, rows, away * (AGENT_RADIUS - distance)[:, None])
+            hit[rows] = True
+
+        colliding = np.flatnonzero(hit & live)
+        if not len(colliding):
+            return
+        if self.collision_response == 'bounce':
+            self._bounce(agents, colliding, positions, normals, push)
+        else:
+            for row in colliding.tolist():
+                agent = agents[row]
+                agent.state = 'crashed'
+                agent.speed = 0.0
+                agent.direction = Vector(0, 0)
+        for row in colliding.tolist():
+            agent = agents[row]
+            self._broad_phase.move(agent.obj_id, agent.position.x, agent.position.y)
+            self.event_bus.publish(Event(self.tick + 1, 'collision', agent.obj_id))
+
+    def _bounce(self, agents: tuple[Agent, ...], rows: np.ndarray, positions: np.ndarray,
+                normals: np.ndarray, push: np.ndarray) -> None:
+        """Separate colliding agents and reflect their velocity off the contact normal."""
+        length = np.sqrt(np.einsum('ij,ij->i', normals[rows], normals[rows]))
+        wall = length <= 1e-12
+        if wall.any():
+            # Nothing else was touched, so the contact was a track boundary. The SDF gives
+            # the wall's real normal, sampled a little back along the approach because the
+            # gradient vanishes on the wall itself. Its sign is turned towards the
+            # centerline, and where it still vanishes the centerline normal is used.
+            wall_rows = rows[wall]
+            sdf = get_track_sdf()
+            directions = np.array([agents[row].direction._v for row in wall_rows.tolist()],
+                                  dtype=float).reshape(-1, 2)
+            _, wall_normals = sdf.sample(positions[wall_rows] - directions * (2.0 * sdf.resolution))
+            lateral, outward = lateral_frame(positions[wall_rows])
+            inward = np.where((lateral > 0)[:, None], -outward, outward)
+            facing = np.einsum('ij,ij->i', wall_normals, inward)
+            wall_normals = np.where((facing < 0.0)[:, None], -wall_normals, wall_normals)
+            normals[wall_rows] = np.where((facing == 0.0)[:, None], inward, wall_normals)
+            length[wall] = 1.0
+        n = normals[rows] / length[:, None]
+
+        for k, row in enumerate(rows.tolist()):
+            agent = agents[row]
+            nx, ny = n[k]
+            vx = agent.direction.x * agent.speed
+            vy = agent.direction.y * agent.speed
+            approach = vx * nx + vy * ny
+            if approach < 0.0:
+                vx -= (1.0 + RESTITUTION) * approach * nx
+                vy -= (1.0 + RESTITUTION) * approach * ny
+            speed = math.hypot(vx, vy)
+            if speed > 0.0:
+                agent.direction = Vector(vx / speed, vy / speed)
+            agent.speed = speed
+            px, py = push[row]
+            if px or py:
+                agent.position = agent.position + Vector(px, py)
+
+    def world_arrays(self) -> WorldArrays:
+        """Return the read-only array snapshot of all agents and obstacles, built at most once per tick."""
+        if self._arrays_cache is None:
+            self._arrays_cache = WorldArrays.from_agents(
+                [obj for obj in self._objects.values() if isinstance(obj, Agent)],
+                [obj for obj in self._objects.values() if isinstance(obj, Obstacle)])
+        return self._arrays_cache
+
+    def snapshot(self) -> Snapshot:
+        """Return the immutable telemetry snapshot of the current version, built at most once."""
+        if self._snapshot_cache is None:
+            self._snapshot_cache = Snapshot(
+                self.version,
+                self.tick,
+                self.time_scale if math.isfinite(self.time_scale) else None,
+                tuple(self.get_agent_state()),
+                tuple(self.get_live_leaderboard()),
+            )
+        return self._snapshot_cache
+
+    def _invalidate(self) -> None:
+        """Drop per-tick caches after the world changes."""
+        self._arrays_cache = None
+        self._snapshot_cache = None
+        self._changed()
+
+    def fork(self, position: Vector | None = None, radius: float = DEFAULT_SEARCH_RADIUS) -> WorldFork:
+        """
+        Clone the world for lookahead without copying any Agent or Vector objects.
+
+        The fork shares this tick's snapshot arrays and copies them only when stepped.
+        With `position`, only agents the broad phase returns within `radius` of it and
+        obstacles whose segment passes within `radius` are included, which keeps
+        per-decision forks small.
+        """
+        arrays = self.world_arrays()
+        starts, ends = arrays.obstacle_starts, arrays.obstacle_ends
+        if position is None:
+            rows = slice(None)
+        else:
+            nearby = self.get_neighbors(position, radius)
+            rows = np.flatnonzero(np.isin(arrays.ids, np.fromiter(nearby, dtype=np.int64)))
+            # An obstacle is only registered at its start point, so long ones are kept
+            # by the distance from `position` to their whole segment.
+            point = position._v
+            seg = ends - starts
+            t = np.clip(np.einsum('ij,ij->i', point - starts, seg)
+                        / np.maximum(np.einsum('ij,ij->i', seg, seg), 1e-12), 0.0, 1.0)
+            gap = starts + t[:, None] * seg - point
+            keep = np.einsum('ij,ij->i', gap, gap) <= radius * radius
+            starts, ends = starts[keep], ends[keep]
+
+        return WorldFork(
+            ids=arrays.ids[rows],
+            positions=arrays.positions[rows],
+            directions=arrays.directions[rows],
+            speeds=arrays.speeds[rows],
+            moving=arrays.active[rows],
+            obstacle_starts=starts,
+            obstacle_ends=ends,
+            dt=DT,
+            stagger=self._decisions.stagger,
+        )
+
+    def export_shared_memory(self, name: str, capacity: int = SHM_EXPORT_CAPACITY,
+                             slots: int = SHM_EXPORT_SLOTS) -> None:
+        """Publish every tick's agent arrays to the shared-memory ring `name` from now on."""
+        self.close_export()
+        self._exporter = RingWriter(name, capacity, slots)
+        self._publish()
+
+    def close_export(self) -> None:
+        """Stop publishing and remove the shared-memory ring."""
+        if self._exporter is not None:
+            self._exporter.close()
+            self._exporter = None
+
+    def _publish(self) -> None:
+        # The arrays built here are the ones the next update() starts from, so the
+        # export costs one copy into the ring and no extra snapshot.
+        arrays = self.world_arrays()
+        self._exporter.publish(self.tick, arrays.ids, arrays.positions, arrays.directions,
+                               arrays.speeds, arrays.active, arrays.crashed)
+
+    def save_checkpoint(self, path: str) -> None:
+        """Write the complete engine state, including RNG state, to a binary checkpoint."""
+        checkpoint.save_checkpoint(self, path)
+
+    def load_checkpoint(self, path: str) -> None:
+        """Replace this engine's state with one saved by save_checkpoint()."""
+        checkpoint.load_checkpoint(self, path)
+        # Replays read the same file, so it has to stay where it is.
+        self.record_command('load_checkpoint', path=path)
+        self.analytics.reset()
+        self._invalidate()
+
+    def _register(self, obj: Object) -> None:
+        """Give `obj` a dense ID and add it to the world and the broad phase."""
+        obj.obj_id = self._ids.allocate(obj)
+        self._objects[obj.obj_id] = obj
+        self._broad_phase.insert(obj.obj_id, obj.position.x, obj.position.y)
+
+    def add_obstacle(self, start: Vector, end: Vector) -> int:
+        """Place an obstacle from `start` to `end` and return its ID."""
+        self.record_command('add_obstacle', start=[start.x, start.y], end=[end.x, end.y])
+        obstacle = Obstacle(start, end)
+        self._register(obstacle)
+        self._lod.promote_all()
+        self._invalidate()
+        return obstacle.obj_id
+
+    def remove_object(self, obj_id: int) -> None:
+        """Remove an object from the world and free its ID slot for reuse."""
+        self._ids.release(obj_id)
+        del self._objects[obj_id]
+        self._broad_phase.remove(obj_id)
+        self._lod.promote(obj_id)
+        self._decisions.forget(obj_id)
+        self.analytics.forget(obj_id)
+        self._invalidate()
+        self.record_command('remove_object', obj_id=obj_id)
+
+    def get_object_by_id(self, obj_id: int) -> Object:
+        return self._ids.get(obj_id)
 
     def get_neighbors(self, position: Vector, radius: float = DEFAULT_SEARCH_RADIUS):
-        return self._spatial_hash_grid.query_radius(position.x, position.y, radius)
+        return self._broad_phase.query_radius(position.x, position.y, radius)
+
+    def report_ttc(self, agent_id: int, ttc: float) -> None:
+        self.analytics.observe_ttc(agent_id, ttc)
+
+    def agents_in_rect(self, x_min: float, y_min: float, x_max: float, y_max: float) -> list[int]:
+        """IDs of agents whose centers lie inside the rectangle, in update order."""
+        hits = set()
+        for obj_id in self._broad_phase.query_rect(x_min, y_min, x_max, y_max):
+            obj = self._objects[obj_id]
+            if (isinstance(obj, Agent) and x_min <= obj.position.x <= x_max
+                    and y_min <= obj.position.y <= y_max):
+                hits.add(obj_id)
+        return [obj_id for obj_id in self._objects if obj_id in hits]
 
-    def get_agent_state(self) -> dict:
+    def get_agent_state(self, agent_ids: Iterable[int] | None = None) -> list[dict]:
+        """Per-agent telemetry for every agent, or only for `agent_ids` still in the world."""
+        if agent_ids is None:
+            objects = self._objects.values()
+        else:
+            objects = (self._objects[i] for i in agent_ids if i in self._objects)
         state = []
-        for obj in self._objects.values():
+        for obj in objects:
             if isinstance(obj, Agent):
                 state.append({
                     'id': obj.obj_id,
@@ -0,0 +1,50 @@
+"""Immutable per-tick telemetry snapshots with their encoded bytes cached alongside."""
+from __future__ import annotations
+
+import json
+import secrets
+
+# Versions restart at 0 with every process, so tags carry a per-boot nonce as well;
+# a client holding a tag from before a restart never gets a false 304.
+BOOT_ID = secrets.token_hex(4)
+
+
+class Snapshot:
+    """
+    Agent telemetry and leaderboard for one version of the engine's state.
+
+    The version changes on every tick and on every change between ticks (obstacles
+    added, time scale set, a checkpoint loaded), so it, not the tick, identifies the
+    body. The engine builds at most one Snapshot per version and hands the same instance
+    to every reader, so readers must treat `agents` and `leaderboard` as read-only. The JSON body
+    is encoded on first use and reused for every later request of the same version.
+    """
+
+    __slots__ = ('version', 'tick', 'time_scale', 'agents', 'leaderboard', '_body')
+
+    def __init__(self, version: int, tick: int, time_scale: float | None,
+                 agents: tuple[dict, ...], leaderboard: tuple[dict, ...]):
+        self.version = version
+        self.tick = tick
+        self.time_scale = time_scale
+        self.agents = agents
+        self.leaderboard = leaderboard
+        self._body: bytes | None = None
+
+    @property
+    def etag(self) -> str:
+        return f'"{BOOT_ID}-{self.version}"'
+
+    @property
+    def body(self) -> bytes:
+        """UTF-8 JSON of the snapshot, encoded once."""
+        if self._body is None:
+            self._body = json.dumps({
+                'boot': BOOT_ID,
+                'version': self.version,
+                'tick': self.tick,
+                'time_scale': self.time_scale,
+                'agents': self.agents,
+                'leaderboard': self.leaderboard,
+            }, separators=(',', ':')).encode('utf-8')
+        return self._body
@@ -0,0 +1,74 @@
+"""Read-only array view of the agents and obstacles in the world, built once per tick for batched controllers."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from sim.object.agent import Agent
+from sim.object.obstacle import Obstacle
+
+
+@dataclass(frozen=True, slots=True)
+class WorldArrays:
+    """
+    Structure-of-arrays snapshot of agents, row-aligned with `agents`, and of obstacles.
+
+    Attributes:
+        agents: The Agent objects, row i describes agents[i].
+        ids: (N,) object IDs.
+        rows: Object ID -> row, for callers that start from one agent.
+        positions: (N, 2) positions.
+        directions: (N, 2) unit headings.
+        speeds: (N,) speeds.
+        active: (N,) True for agents that move this tick (not crashed or out of fuel).
+        crashed: (N,) True for crashed agents.
+        obstacle_ids: (M,) obstacle object IDs.
+        obstacle_starts: (M, 2) obstacle segment start points.
+        obstacle_ends: (M, 2) obstacle segment end points.
+    """
+    agents: tuple[Agent, ...]
+    ids: np.ndarray
+    rows: dict[int, int]
+    positions: np.ndarray
+    directions: np.ndarray
+    speeds: np.ndarray
+    active: np.ndarray
+    crashed: np.ndarray
+    obstacle_ids: np.ndarray
+    obstacle_starts: np.ndarray
+    obstacle_ends: np.ndarray
+
+    @classmethod
+    def from_agents(cls, agents: list[Agent], obstacles: Sequence[Obstacle] = ()) -> WorldArrays:
+        count = len(agents)
+        positions = np.empty((count, 2), dtype=float)
+        directions = np.empty((count, 2), dtype=float)
+        for i, agent in enumerate(agents):
+            positions[i] = agent.position._v
+            directions[i] = agent.direction._v
+        snapshot = cls(
+            agents=tuple(agents),
+            ids=np.fromiter((a.obj_id for a in agents), dtype=np.int64, count=count),
+            rows={a.obj_id: row for row, a in enumerate(agents)},
+            positions=positions,
+            directions=directions,
+            speeds=np.fromiter((a.speed for a in agents), dtype=float, count=count),
+            active=np.fromiter((a.state not in ('crashed', 'out_of_fuel') for a in agents),
+                               dtype=bool, count=count),
+            crashed=np.fromiter((a.state == 'crashed' for a in agents), dtype=bool, count=count),
+            obstacle_ids=np.fromiter((o.obj_id for o in obstacles), dtype=np.int64, count=len(obstacles)),
+            obstacle_starts=np.array([o.position._v for o in obstacles], dtype=float).reshape(-1, 2),
+            obstacle_ends=np.array([o.end._v for o in obstacles], dtype=float).reshape(-1, 2),
+        )
+        # Snapshots are shared by forks and batched controllers; nobody may write to them.
+        for array in (snapshot.ids, snapshot.positions, snapshot.directions,
+                      snapshot.speeds, snapshot.active, snapshot.crashed,
+                      snapshot.obstacle_ids, snapshot.obstacle_starts, snapshot.obstacle_ends):
+            array.setflags(write=False)
+        return snapshot
+
+    @property
+    def velocities(self) -> np.ndarray:
+        return self.directions * self.speeds[:, None]
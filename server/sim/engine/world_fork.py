@@ -0,0 +1,159 @@
+"""Copy-on-write world clones for multi-step lookahead."""
+from __future__ import annotations
+
+import numpy as np
+
+from sim.action import ACTION_NAMES, ACTION_SPEED_FACTORS, ACTION_STEER_RADS
+from utils.track_sdf import get_track_sdf
+
+from configs.settings import AGENT_RADIUS
+
+MAINTAIN = ACTION_NAMES.index('maintain')
+
+_STATE_FIELDS = ('positions', 'directions', 'speeds', 'crashed')
+
+
+class WorldFork:
+    """
+    Disposable clone of the world that can be stepped under chosen actions.
+
+    A fork starts out sharing its arrays with its parent and copies an array only the
+    first time it writes to it, so creating forks is O(1) in the number of agents and
+    unstepped forks cost nothing. Forking a fork makes both sides copy-on-write again.
+    Agents without an explicit action keep moving at constant velocity ('maintain').
+
+    Stepping follows the engine's kinematics: each tick applies the per-tick slice of
+    an action that DecisionScheduler holds for `stagger` ticks (speed factor ** (1 /
+    stagger), steering / stagger), scaling speed, rotating heading, then moving. An
+    agent crashes when it comes within AGENT_RADIUS of another agent or of an obstacle
+    segment, or leaves the racing surface, having not already been in that contact;
+    crashed agents stop.
+    """
+
+    __slots__ = ('ids', 'dt', 'stagger', 'elapsed', 'obstacle_starts', 'obstacle_ends',
+                 '_arrays', '_owned', '_rows', '_moving')
+
+    def __init__(self, ids: np.ndarray, positions: np.ndarray, directions: np.ndarray,
+                 speeds: np.ndarray, moving: np.ndarray, obstacle_starts: np.ndarray,
+                 obstacle_ends: np.ndarray, dt: float, stagger: int = 1):
+        self.ids = ids
+        self.dt = dt
+        self.stagger = max(1, stagger)
+        self.elapsed = 0.0
+        self.obstacle_starts = obstacle_starts
+        self.obstacle_ends = obstacle_ends
+        self._arrays = {
+            'positions': positions,
+            'directions': directions,
+            'speeds': speeds,
+            'crashed': np.zeros(len(ids), dtype=bool),
+        }
+        self._owned: set[str] = set()
+        self._rows: dict[int, int] | None = None
+        self._moving = moving
+
+    # Read-only views
+    @property
+    def positions(self) -> np.ndarray:
+        return self._arrays['positions']
+
+    @property
+    def directions(self) -> np.ndarray:
+        return self._arrays['directions']
+
+    @property
+    def speeds(self) -> np.ndarray:
+        return self._arrays['speeds']
+
+    @property
+    def crashed(self) -> np.ndarray:
+        return self._arrays['crashed']
+
+    def row_of(self, obj_id: int) -> int:
+        if self._rows is None:
+            self._rows = {obj_id: row for row, obj_id in enumerate(self.ids.tolist())}
+        return self._rows[obj_id]
+
+    def fork(self) -> WorldFork:
+        """Clone this fork; both share arrays until either one writes."""
+        child = WorldFork.__new__(WorldFork)
+        child.ids = self.ids
+        child.dt = self.dt
+        child.stagger = self.stagger
+        child.elapsed = self.elapsed
+        child.obstacle_starts = self.obstacle_starts
+        child.obstacle_ends = self.obstacle_ends
+        child._arrays = dict(self._arrays)
+        child._owned = set()
+        child._rows = self._rows
+        child._moving = self._moving
+        self._owned.clear()
+        return child
+
+    def _writable(self, name: str) -> np.ndarray:
+        if name not in self._owned:
+            self._arrays[name] = self._arrays[name].copy()
+            self._owned.add(name)
+        return self._arrays[name]
+
+    def step(self, actions: dict[int, int] | None = None, ticks: int = 1) -> np.ndarray:
+        """
+        Advance the fork.
+
+        Args:
+            actions: obj_id -> index into sim.action.ACTION_LIST, held for every tick;
+                one decision period of `stagger` ticks applies the action once in full.
+            ticks: Number of ticks to advance.
+
+        Returns:
+            Boolean mask of agents that crashed during these ticks.
+        """
+        action_rows = np.full(len(self.ids), MAINTAIN, dtype=np.intp)
+        for obj_id, action_index in (actions or {}).items():
+            action_rows[self.row_of(obj_id)] = action_index
+        factors = ACTION_SPEED_FACTORS[action_rows] ** (1.0 / self.stagger)
+        cos_steer = np.cos(ACTION_STEER_RADS[action_rows] / self.stagger)
+        sin_steer = np.sin(ACTION_STEER_RADS[action_rows] / self.stagger)
+
+        positions, directions, speeds, crashed = (self._writable(name) for name in _STATE_FIELDS)
+        crashed_before = crashed.copy()
+        contacts = self._contacts(positions)
+        off_track = self._wall_contacts(positions)
+        for _ in range(ticks):
+            moving = self._moving & ~crashed
+            speeds[moving] *= factors[moving]
+            dx, dy = directions[:, 0].copy(), directions[:, 1].copy()
+            directions[moving, 0] = (dx * cos_steer - dy * sin_steer)[moving]
+            directions[moving, 1] = (dx * sin_steer + dy * cos_steer)[moving]
+            positions[moving] += directions[moving] * speeds[moving, None] * self.dt
+
+            touching = self._contacts(positions)
+            outside = self._wall_contacts(positions)
+            crashed |= (touching & ~contacts).any(axis=1) | (outside & ~off_track)
+            contacts = touching
+            off_track = outside
+            speeds[crashed] = 0.0
+            self.elapsed += self.dt
+        return crashed & ~crashed_before
+
+    @staticmethod
+    def _wall_contacts(positions: np.ndarray) -> np.ndarray:
+        """(N,) True for agents whose center is on or past a track wall."""
+        return get_track_sdf().signed_distance(positions) <= 0.0
+
+    def _contacts(self, positions: np.ndarray) -> np.ndarray:
+        """(N, N + M) mask of agent-agent and agent-obstacle contacts."""
+        gap = positions[:, None, :] - positions[None, :, :]
+        agent_hits = np.einsum('ijk,ijk->ij', gap, gap) <= AGENT_RADIUS * AGENT_RADIUS
+        np.fill_diagonal(agent_hits, False)
+        if not len(self.obstacle_starts):
+            return agent_hits
+
+        seg = self.obstacle_ends - self.obstacle_starts
+        seg_len_sq = np.maximum(np.einsum('ij,ij->i', seg, seg), 1e-12)
+        rel = positions[:, None, :] - self.obstacle_starts[None, :, :]
+        proj = np.clip(np.einsum('ijk,jk->ij', rel, seg) / seg_len_sq, 0.0, 1.0)
+        closest = self.obstacle_starts[None, :, :] + proj[..., None] * seg[None, :, :]
+        diff = positions[:, None, :] - closest
+        obstacle_hits = np.einsum('ijk,ijk->ij', diff, diff) <= AGENT_RADIUS * AGENT_RADIUS
+        return np.concatenate([agent_hits, obstacle_hits], axis=1)
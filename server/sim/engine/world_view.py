@@ -1,8 +1,12 @@
 """Module defining the abstract base class for a world view."""
+from __future__ import annotations
+
 
 from abc import ABC, abstractmethod
 from utils.vector import Vector
 
+from configs.settings import DEFAULT_SEARCH_RADIUS
+
 
 class WorldView(ABC):
     """Abstract base class representing a world view."""
@@ -16,3 +20,14 @@ class WorldView(ABC):
     def get_neighbors(self, position: Vector, radius: float):
         """Retrieve neighboring objects within a certain radius."""
         pass
+
+    @abstractmethod
+    def fork(self, position: Vector | None = None, radius: float = DEFAULT_SEARCH_RADIUS):
+        """
+        Return a cheap copy-on-write clone of the world for lookahead, optionally
+        restricted to objects within `radius` of `position`.
+        """
+        pass
+
+    def report_ttc(self, agent_id: int, ttc: float) -> None:
+        """Receive the smallest time-to-collision a controller found for `agent_id`."""
@@ -1,28 +1,154 @@
-import random
-
-def check_random_events(agents):
-    global global_event
-    events = []
-
-     # occasionally trigger global slowdown
-    if global_event["type"] is None and random.random() < 0.02:
-        global_event = {"type": "safety_car", "timer": 5}
-        events.append({"type": "safety_car", "duration": 5})
-
-    # decrement timer
-    if global_event["type"] == "safety_car":
-        for a in agents:
-            a["speed"] *= 0.6
-        global_event["timer"] -= 1
-        if global_event["timer"] <= 0:
-            global_event = {"type": None, "timer": 0}
-
-
-    for a in agents:
-        if random.random() < 0.05 and a["status"] == "running":
-            a["status"] = "crashed"
-            events.append({"type" : "crash", "agent": a["id"]})
-        elif a["status"] == "crashed" and random.random() < 0.3:
-            a["status"] = "running"
-            events.append({"type" : "recovered", "agent" : a["id"]})
-    return agents, events
\ No newline at end of file
+"""Random race events (crashes, recoveries, safety car) and the in-process event bus."""
+from __future__ import annotations
+
+import math
+from collections import defaultdict, deque
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+from sim.object.agent import Agent
+from utils.vector import Vector
+
+from configs.settings import (
+    EVENT_SEED,
+    CRASH_RATE,
+    RECOVERY_RATE,
+    RECOVERY_SPEED,
+    SAFETY_CAR_RATE,
+    SAFETY_CAR_DURATION,
+    SAFETY_CAR_SPEED,
+)
+
+EVENT_TYPES: tuple[str, ...] = ('crash', 'recovered', 'safety_car', 'safety_car_end', 'collision')
+
+
+class Event(NamedTuple):
+    """
+    Compact event record; agent_id is -1 for race-wide events.
+
+    `tick` is the tick the update raising the event completes, i.e. the engine's tick
+    once that update returns, so everything seen at engine tick T has tick <= T.
+    """
+    tick: int
+    type: str
+    agent_id: int = -1
+
+    def compact(self) -> list:
+        return [self.tick, EVENT_TYPES.index(self.type), self.agent_id]
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for simulation events.
+
+    Subscribers are called synchronously on publish. The most recent events are kept
+    in a bounded buffer so telemetry can pick up everything since the last frame.
+    """
+
+    __slots__ = ('_subscribers', '_recent')
+
+    def __init__(self, history: int = 1024):
+        self._subscribers: dict[str | None, list[Callable[[Event], None]]] = defaultdict(list)
+        self._recent: deque[Event] = deque(maxlen=history)
+
+    def subscribe(self, callback: Callable[[Event], None], event_type: str | None = None) -> None:
+        """Call `callback` for every event of `event_type`, or for all events if None."""
+        self._subscribers[event_type].append(callback)
+
+    def publish(self, event: Event) -> None:
+        self._recent.append(event)
+        for callback in self._subscribers.get(event.type, ()):
+            callback(event)
+        for callback in self._subscribers.get(None, ()):
+            callback(event)
+
+    def since(self, tick: int) -> list[list]:
+        """Compact [tick, type index, agent_id] records for events after `tick`."""
+        out = []
+        for event in reversed(self._recent):
+            if event.tick <= tick:
+                break
+            out.append(event.compact())
+        out.reverse()
+        return out
+
+
+def _per_tick(rate: float, dt: float) -> float:
+    """Probability that a Poisson process with `rate` per second fires within `dt`."""
+    return 1.0 - math.exp(-rate * dt)
+
+
+class RandomEventEngine:
+    """
+    Draws crash, recovery and safety-car events for the whole field in one batch.
+
+    Each tick takes a single uniform draw per agent: moving agents crash with
+    probability p_crash and crashed agents recover with probability p_recover (the
+    two sets are disjoint, so one draw serves both). Rates are per second and
+    converted to per-tick probabilities, so behavior does not depend on the tick rate.
+    While the safety car is out every agent's speed is capped at SAFETY_CAR_SPEED.
+    Only the agents an event actually touches are visited in Python.
+    """
+
+    __slots__ = ('rng', 'p_crash', 'p_recover', 'p_safety_car',
+                 'safety_car_ticks', 'safety_car_remaining')
+
+    def __init__(self, dt: float, seed: int | None = EVENT_SEED):
+        self.rng = np.random.Generator(np.random.PCG64(seed))
+        self.p_crash = _per_tick(CRASH_RATE, dt)
+        self.p_recover = _per_tick(RECOVERY_RATE, dt)
+        self.p_safety_car = _per_tick(SAFETY_CAR_RATE, dt)
+        self.safety_car_ticks = max(1, round(SAFETY_CAR_DURATION / dt))
+        self.safety_car_remaining = 0
+
+    def step(self, agents: tuple[Agent, ...], active: np.ndarray, crashed: np.ndarray,
+             speeds: np.ndarray, tick: int, bus: EventBus) -> bool:
+        """
+        Draw and apply this tick's events.
+
+        Args:
+            agents: Agent objects, row-aligned with the arrays.
+            active: (N,) agents that are moving.
+            crashed: (N,) agents that are crashed.
+            speeds: (N,) current speeds.
+            tick: Tick this update completes, stamped on published events.
+            bus: Where events are published.
+
+        Returns:
+            True if any agent was modified.
+        """
+        changed = False
+        draws = self.rng.random(len(agents) + 1)
+        crashing = active & (draws[:-1] < self.p_crash)
+
+        for row in np.flatnonzero(crashing).tolist():
+            agent = agents[row]
+            agent.state = 'crashed'
+            agent.speed = 0.0
+            bus.publish(Event(tick, 'crash', agent.obj_id))
+            changed = True
+
+        for row in np.flatnonzero(crashed & (draws[:-1] < self.p_recover)).tolist():
+            agent = agents[row]
+            if agent.direction.magnitude() == 0.0:
+                # Collision crashes zero the heading; restart facing the spawn direction.
+                agent.direction = Vector(-1, 0)
+            agent.state = 'idle'
+            agent.speed = RECOVERY_SPEED
+            bus.publish(Event(tick, 'recovered', agent.obj_id))
+            changed = True
+
+        if self.safety_car_remaining == 0 and draws[-1] < self.p_safety_car:
+            self.safety_car_remaining = self.safety_car_ticks
+            bus.publish(Event(tick, 'safety_car'))
+
+        if self.safety_car_remaining > 0:
+            for row in np.flatnonzero(active & ~crashing & (speeds > SAFETY_CAR_SPEED)).tolist():
+                agents[row].speed = SAFETY_CAR_SPEED
+                changed = True
+            self.safety_car_remaining -= 1
+            if self.safety_car_remaining == 0:
+                bus.publish(Event(tick, 'safety_car_end'))
+
+        return changed
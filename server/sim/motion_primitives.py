@@ -0,0 +1,83 @@
+"""Precomputed motion primitives: multi-step action sequences as trajectory tables."""
+from __future__ import annotations
+
+import math
+from itertools import product
+
+import numpy as np
+
+from sim.action import ACTION_NAMES, ACTION_SPEED_FACTORS, ACTION_STEER_RADS
+
+from configs.settings import SIM_TICK_RATE, DECISION_TICK_RATE, PRIMITIVE_DEPTH, PRIMITIVE_HORIZON
+
+MAINTAIN = ACTION_NAMES.index('maintain')
+
+
+class MotionPrimitives:
+    """
+    Library of short trajectories, one per sequence of actions.
+
+    A primitive chooses an action for each of the first `depth` decision periods and
+    maintains for the rest of the horizon. Each period is `ticks_per_step` physics ticks
+    applying the engine's per-tick slice of the action (see DecisionScheduler), so the
+    tables reproduce what the engine integrates.
+
+    Trajectories are stored in the agent's heading frame, per unit of initial speed:
+    speed and heading changes are multiplicative and additive, so one table serves
+    every agent and turning it into world positions is a rotation, a scale and a
+    translation, with no trigonometry per evaluation.
+
+    Attributes:
+        sequences: (P, depth) action indices chosen for the first `depth` periods.
+        first_actions: (P,) action index to return when primitive p is chosen.
+        offsets: (P, T, 2) position after each tick, heading frame, unit initial speed.
+        speed_scales: (P, T) speed after each tick as a multiple of the initial speed.
+        dt: Physics tick length in seconds.
+    """
+
+    __slots__ = ('sequences', 'first_actions', 'offsets', 'speed_scales', 'dt')
+
+    def __init__(self, depth: int = PRIMITIVE_DEPTH, horizon: float = PRIMITIVE_HORIZON,
+                 sim_rate: float = SIM_TICK_RATE, decision_rate: float = DECISION_TICK_RATE):
+        ticks_per_step = max(1, round(sim_rate / decision_rate))
+        steps = max(depth, math.ceil(horizon * decision_rate))
+        self.dt = 1.0 / sim_rate
+
+        self.sequences = np.array(list(product(range(len(ACTION_NAMES)), repeat=depth)), dtype=np.intp)
+        self.first_actions = self.sequences[:, 0].copy()
+        step_actions = np.full((len(self.sequences), steps), MAINTAIN, dtype=np.intp)
+        step_actions[:, :depth] = self.sequences
+        tick_actions = np.repeat(step_actions, ticks_per_step, axis=1)
+
+        # Per tick: scale speed, turn, then move, as Agent._apply_action does.
+        self.speed_scales = np.cumprod(ACTION_SPEED_FACTORS[tick_actions] ** (1.0 / ticks_per_step), axis=1)
+        angles = np.cumsum(ACTION_STEER_RADS[tick_actions] / ticks_per_step, axis=1)
+        step = self.speed_scales * self.dt
+        self.offsets = np.stack([np.cumsum(step * np.cos(angles), axis=1),
+                                 np.cumsum(step * np.sin(angles), axis=1)], axis=-1)
+
+    @property
+    def ticks(self) -> int:
+        return self.offsets.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.sequences)
+
+    def trajectories(self, positions: np.ndarray, directions: np.ndarray, speeds: np.ndarray) -> np.ndarray:
+        """
+        World positions of every primitive for every agent.
+
+        Args:
+            positions: (K, 2) current positions.
+            directions: (K, 2) unit headings.
+            speeds: (K,) current speeds.
+
+        Returns:
+            (K, P, T, 2) position after each tick of each primitive.
+        """
+        ox = self.offsets[None, :, :, 0]
+        oy = self.offsets[None, :, :, 1]
+        hx = (directions[:, 0] * speeds)[:, None, None]
+        hy = (directions[:, 1] * speeds)[:, None, None]
+        return np.stack([positions[:, 0, None, None] + ox * hx - oy * hy,
+                         positions[:, 1, None, None] + ox * hy + oy * hx], axis=-1)
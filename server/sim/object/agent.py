@@ -1,4 +1,6 @@
 """Module defining the Agent class."""
+from __future__ import annotations
+
 from sim.object.sim_object import Object
 from utils.vector import Vector
 from sim.action import Action
@@ -26,13 +28,27 @@ class Agent(Object):
         self.lap = 0
         self.controller = controller
 
-    def update_agent_state(self, dt: float) -> None:
-        """Update the agent's state based on controller prediction."""
+    def update_agent_state(self, dt: float, action: Action | None = None) -> None:
+        """
+        Update the agent's state based on controller prediction, or on `action`
+        when the caller has already decided it.
+        """
         if(self.state == 'crashed' or self.state == 'out_of_fuel'):
             return
         self.fuel -= self.speed * dt
-        action: Action = self.controller.predict()
+        if action is None:
+            action = self.controller.predict()
+        self._apply_action(action, dt)
 
+    def coast(self, dt: float) -> None:
+        """Advance at constant speed and heading without consulting the controller."""
+        if(self.state == 'crashed' or self.state == 'out_of_fuel'):
+            return
+        self.fuel -= self.speed * dt
+        self.position += self.direction * self.speed * dt
+        self._refresh_state()
+
+    def _apply_action(self, action: Action, dt: float) -> None:
         if self.state in ('crashed', 'out_of_fuel'):
             # Ensure we don't move after crash/out_of_fuel
             self.speed = 0.0
@@ -46,6 +62,9 @@ class Agent(Object):
                            self.direction.y * cos(angle))
         self.direction = Vector(new_direction_x, new_direction_y).normalized()
         self.position += self.direction * self.speed * dt
+        self._refresh_state()
+
+    def _refresh_state(self) -> None:
         if self.speed > 0 and self.fuel > 0:
             self.state = 'moving'
         elif self.fuel == 0:
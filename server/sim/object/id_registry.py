@@ -0,0 +1,88 @@
+"""Dense object ID allocation with generation counters and slot reuse."""
+from __future__ import annotations
+
+import heapq
+
+import numpy as np
+
+# Low bits of an ID are the slot, high bits the slot's generation.
+SLOT_BITS = 24
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+
+class IdRegistry:
+    """
+    Hands out object IDs that map directly to dense slot indices.
+
+    An ID is `generation << SLOT_BITS | slot`. Released slots go on a free list and
+    are reused lowest-first with their generation bumped, so slots stay packed near
+    zero while stale IDs never resolve to the slot's new occupant. Lookup is a list
+    index plus a generation compare.
+    """
+
+    __slots__ = ('_generations', '_objects', '_free')
+
+    def __init__(self):
+        self._generations: list[int] = []
+        self._objects: list[object | None] = []
+        self._free: list[int] = []
+
+    def allocate(self, obj: object) -> int:
+        """Reserve a slot for `obj` and return its ID."""
+        if self._free:
+            slot = heapq.heappop(self._free)
+            self._objects[slot] = obj
+        else:
+            slot = len(self._objects)
+            if slot > SLOT_MASK:
+                raise OverflowError(f"Object registry is full ({SLOT_MASK + 1} slots)")
+            self._generations.append(0)
+            self._objects.append(obj)
+        return (self._generations[slot] << SLOT_BITS) | slot
+
+    def allocate_many(self, objs: list) -> list[int]:
+        """Reserve slots for `objs` in order; the same IDs allocate() would give one by one."""
+        reused = [self.allocate(obj) for obj in objs[:len(self._free)]]
+        start = len(self._objects)
+        fresh = objs[len(reused):]
+        if start + len(fresh) > SLOT_MASK + 1:
+            raise OverflowError(f"Object registry is full ({SLOT_MASK + 1} slots)")
+        # Fresh slots start at generation 0, so their IDs are the slot indices.
+        self._generations.extend([0] * len(fresh))
+        self._objects.extend(fresh)
+        return reused + list(range(start, start + len(fresh)))
+
+    def release(self, obj_id: int) -> None:
+        """Free the object's slot; its ID will no longer resolve."""
+        slot = obj_id & SLOT_MASK
+        self.get(obj_id)
+        self._objects[slot] = None
+        self._generations[slot] += 1
+        heapq.heappush(self._free, slot)
+
+    def get(self, obj_id: int) -> object:
+        slot = obj_id & SLOT_MASK
+        if (slot < len(self._objects) and self._objects[slot] is not None
+                and self._generations[slot] == obj_id >> SLOT_BITS):
+            return self._objects[slot]
+        raise KeyError(f"Object ID {obj_id} not found in simulation.")
+
+    def __contains__(self, obj_id: int) -> bool:
+        slot = obj_id & SLOT_MASK
+        return (slot < len(self._objects) and self._objects[slot] is not None
+                and self._generations[slot] == obj_id >> SLOT_BITS)
+
+    def state_arrays(self) -> dict[str, np.ndarray]:
+        return {
+            'generations': np.array(self._generations, dtype=np.int64),
+            'free': np.array(self._free, dtype=np.int64),
+        }
+
+    def load_state_arrays(self, arrays: dict[str, np.ndarray], objects: list) -> None:
+        """Restore generations and free list, then bind `objects` to the slots of their IDs."""
+        self._generations = arrays['generations'].tolist()
+        self._free = arrays['free'].tolist()
+        heapq.heapify(self._free)
+        self._objects = [None] * len(self._generations)
+        for obj in objects:
+            self._objects[obj.obj_id & SLOT_MASK] = obj
@@ -2,7 +2,8 @@
 from utils.vector import Vector
 from abc import ABC
 
-import random
+# obj_id of an object that has not been registered with a simulation yet.
+UNREGISTERED_ID = -1
 
 
 class Object(ABC):
@@ -10,7 +11,8 @@ class Object(ABC):
     __slots__ = ('obj_id', 'position')
 
     def __init__(self, position: Vector):
-        self.obj_id = random.randint(1000, 9999)
+        # Assigned by the owning engine's IdRegistry when the object is added.
+        self.obj_id = UNREGISTERED_ID
         self.position = position
 
     def display(self):
@@ -0,0 +1,131 @@
+"""Interest management: what each telemetry client subscribes to, and how often it is sent."""
+from __future__ import annotations
+
+import math
+import time
+from typing import TYPE_CHECKING
+
+from configs.settings import TELEMETRY_TIERS
+
+if TYPE_CHECKING:
+    from sim.engine.sim_engine import SimulationEngine
+
+SUBSCRIPTION_KINDS: tuple[str, ...] = ('all', 'viewport', 'follow', 'leaderboard', 'analytics')
+DEFAULT_TOP_K = 10
+
+
+class Subscription:
+    """
+    One stream of frames for a client: the agents it covers and the rate tier it runs at.
+
+    Kinds:
+        all:         every agent plus the full leaderboard (the legacy /ws frame).
+        viewport:    agents whose centers lie in `rect` = [x_min, y_min, x_max, y_max],
+                     picked through the engine's spatial index.
+        follow:      the agents listed in `agent_ids`.
+        leaderboard: the top `top_k` leaderboard entries only, no agent telemetry.
+        analytics:   race analytics (lap, sector, gap, fuel and near-miss statistics)
+                     with the top `top_k` standings.
+
+    A subscription is due once its tier period has passed since its last frame and the
+    race has moved on since then, so a paused race or a slow tier sends nothing.
+    """
+
+    __slots__ = ('sub_id', 'kind', 'period', 'rect', 'agent_ids', 'top_k',
+                 'last_tick', '_next_due')
+
+    def __init__(self, sub_id: str, kind: str = 'all', rate: float = TELEMETRY_TIERS['high'],
+                 rect: tuple[float, float, float, float] | None = None,
+                 agent_ids: tuple[int, ...] = (), top_k: int = DEFAULT_TOP_K):
+        if kind not in SUBSCRIPTION_KINDS:
+            raise ValueError(f"Unknown subscription kind {kind!r}; expected one of {SUBSCRIPTION_KINDS}")
+        if not rate > 0:
+            raise ValueError(f"Subscription rate must be positive, got {rate}")
+        if kind == 'viewport':
+            if rect is None or len(rect) != 4:
+                raise ValueError("A viewport subscription needs rect = [x_min, y_min, x_max, y_max]")
+            x_min, y_min, x_max, y_max = map(float, rect)
+            rect = (min(x_min, x_max), min(y_min, y_max), max(x_min, x_max), max(y_min, y_max))
+        if kind == 'follow' and not agent_ids:
+            raise ValueError("A follow subscription needs at least one agent id")
+
+        self.sub_id = sub_id
+        self.kind = kind
+        self.period = 1.0 / rate
+        self.rect = rect
+        self.agent_ids = tuple(int(i) for i in agent_ids)
+        self.top_k = int(top_k)
+        self.last_tick = -1
+        self._next_due = -math.inf
+
+    @classmethod
+    def from_message(cls, message: dict) -> Subscription:
+        """
+        Build a subscription from a client's subscribe message, e.g.
+        {"op": "subscribe", "id": "map", "kind": "viewport", "tier": "high", "rect": [0, 0, 100, 50]}.
+
+        Raises:
+            ValueError: If the message names an unknown kind or tier or lacks its parameters.
+        """
+        tier = message.get('tier', 'high')
+        if tier not in TELEMETRY_TIERS:
+            raise ValueError(f"Unknown rate tier {tier!r}; expected one of {tuple(TELEMETRY_TIERS)}")
+        return cls(
+            str(message.get('id', message.get('kind', 'all'))),
+            message.get('kind', 'all'),
+            TELEMETRY_TIERS[tier],
+            rect=message.get('rect'),
+            agent_ids=tuple(message.get('agent_ids', ())),
+            top_k=message.get('top_k', DEFAULT_TOP_K),
+        )
+
+    def due(self, now: float, tick: int) -> bool:
+        return now >= self._next_due and tick != self.last_tick
+
+    def frame(self, engine: SimulationEngine, now: float, min_period: float = 0.0) -> dict:
+        """
+        Build this subscription's frame for the engine's current tick and mark it sent.
+
+        Args:
+            engine: Simulation to read.
+            now: Monotonic clock reading.
+            min_period: Lower bound on the time to the next frame, e.g. while warped.
+        """
+        tick = engine.tick
+        frame = {
+            'sub': self.sub_id,
+            'tick': tick,
+            'time_scale': engine.time_scale if math.isfinite(engine.time_scale) else None,
+            # wall-clock send time, so clients on the same host can measure delivery latency
+            'sent': time.time(),
+        }
+        # Events are stamped with the tick their update completes, so those after the
+        # tick of the previous frame are exactly the ones this client has not seen.
+        events = engine.event_bus.since(self.last_tick)
+
+        if self.kind == 'all':
+            # Shared, per-tick snapshot: every 'all' client reuses the same state.
+            snapshot = engine.snapshot()
+            frame['agents'] = snapshot.agents
+            frame['leaderboard'] = snapshot.leaderboard
+        elif self.kind == 'leaderboard':
+            frame['leaderboard'] = engine.snapshot().leaderboard[:self.top_k]
+        elif self.kind == 'analytics':
+            frame['analytics'] = engine.analytics.summary(self.top_k)
+        else:
+            ids = engine.agents_in_rect(*self.rect) if self.kind == 'viewport' else self.agent_ids
+            frame['agents'] = engine.get_agent_state(ids)
+            # Race-wide events (agent_id -1) plus those about the agents in view.
+            visible = {agent['id'] for agent in frame['agents']}
+            events = [e for e in events if e[2] == -1 or e[2] in visible]
+
+        # [tick, index into sim.events.EVENT_TYPES, agent_id]
+        frame['events'] = events
+        self.last_tick = tick
+        # Step from the previous deadline so the tier rate holds on average, but never
+        # let a stalled client bank a burst of back-to-back frames.
+        period = max(self.period, min_period)
+        self._next_due += period
+        if self._next_due < now:
+            self._next_due = now + period
+        return frame
@@ -0,0 +1,278 @@
+"""
+Load test for the /ws telemetry path.
+
+Starts the backend on a free localhost port (or targets --url), starts the race, then
+for each client count opens that many /ws clients for --duration seconds and reports:
+
+    latency_ms      frame delivery latency percentiles (server send stamp -> client receive)
+    dropped         frames the subscription rate promised but the client never got
+    cpu_ms_per_s    server CPU per client per wall second (only for a server we started)
+    tick_jitter_ms  how far the race clock strays from wall time between probe frames
+
+A fixed share of clients is slow (sleeps after every frame) or stalled (never reads), and
+which client is which depends only on its index, so runs with the same arguments are
+comparable. Results are printed as a table and optionally written as JSON with --out.
+
+    python -m telemetry.loadtest --clients 100,500,1000 --duration 10 --out load.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+from websockets.asyncio.client import connect
+from websockets.exceptions import WebSocketException
+
+from configs.settings import SIM_TICK_RATE, TELEMETRY_TICK_RATE, TELEMETRY_TIERS
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONNECT_BATCH = 100
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class ClientStats:
+    """What one simulated spectator saw."""
+
+    __slots__ = ('kind', 'latencies', 'frames', 'connected_at', 'closed_at', 'failed')
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.latencies: list[float] = []
+        self.frames = 0
+        self.connected_at = 0.0
+        self.closed_at = 0.0
+        self.failed = False
+
+
+def client_kind(index: int, slow_fraction: float, stalled_fraction: float) -> str:
+    """Deterministic client role: spread slow and stalled clients evenly over the indices."""
+    position = (index * 0.6180339887) % 1.0
+    if position < stalled_fraction:
+        return 'stalled'
+    if position < stalled_fraction + slow_fraction:
+        return 'slow'
+    return 'normal'
+
+
+async def run_client(url: str, stats: ClientStats, subscribe: dict | None, measure_from: float,
+                     deadline: float, slow_delay: float, probe: list | None = None) -> None:
+    """Hold one /ws connection open until `deadline`, recording frames received after `measure_from`."""
+    try:
+        # A stalled client keeps a one-frame receive queue and never drains it, so the
+        # server sees real TCP back-pressure rather than a client-side buffer.
+        async with connect(url, max_queue=1 if stats.kind == 'stalled' else 16,
+                           open_timeout=30) as ws:
+            stats.connected_at = time.time()
+            if subscribe is not None:
+                await ws.send(json.dumps(subscribe))
+            if stats.kind == 'stalled':
+                await asyncio.sleep(max(0.0, deadline - time.time()))
+                return
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    message = await asyncio.wait_for(ws.recv(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                received = time.time()
+                frame = json.loads(message)
+                if 'sent' not in frame or received < measure_from:
+                    continue
+                stats.frames += 1
+                stats.latencies.append(received - frame['sent'])
+                if probe is not None:
+                    probe.append((frame['sent'], frame['tick']))
+                if stats.kind == 'slow':
+                    await asyncio.sleep(slow_delay)
+    except (OSError, asyncio.TimeoutError, WebSocketException) as e:
+        # Refused handshakes and dropped connections count against this client only,
+        # rather than aborting the gather over the whole step.
+        stats.failed = True
+        print(f"client failed: {e!r}", file=sys.stderr)
+    finally:
+        stats.closed_at = time.time()
+
+
+def percentiles(values, scale: float = 1.0) -> dict:
+    if not len(values):
+        return {str(p): None for p in PERCENTILES}
+    result = np.percentile(np.asarray(values) * scale, PERCENTILES)
+    return {str(p): round(float(v), 3) for p, v in zip(PERCENTILES, result)}
+
+
+def tick_jitter(probe: list[tuple[float, int]]) -> dict:
+    """Per-interval error between race time advanced and wall time elapsed, in ms."""
+    if len(probe) < 3:
+        return percentiles([])
+    sent, ticks = np.array(probe, dtype=float).T
+    error = np.abs(np.diff(ticks) / SIM_TICK_RATE - np.diff(sent))
+    return percentiles(error, 1000.0)
+
+
+def server_cpu_seconds(pid: int | None) -> float | None:
+    """User + system CPU time of a local process, from /proc (Linux only)."""
+    if pid is None:
+        return None
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+async def run_step(url: str, clients: int, args: argparse.Namespace, subscribe: dict | None,
+                   rate: float, pid: int | None) -> dict:
+    measure_from = time.time() + args.warmup
+    deadline = measure_from + args.duration
+    stats = [ClientStats(client_kind(i, args.slow_fraction, args.stalled_fraction))
+             for i in range(clients)]
+    probe_stats = ClientStats('probe')
+    probe: list[tuple[float, int]] = []
+
+    tasks = [asyncio.create_task(
+        run_client(url, probe_stats, subscribe, measure_from, deadline, 0.0, probe))]
+    for start in range(0, clients, CONNECT_BATCH):
+        tasks += [asyncio.create_task(
+                      run_client(url, s, subscribe, measure_from, deadline, args.slow_delay))
+                  for s in stats[start:start + CONNECT_BATCH]]
+        await asyncio.sleep(0.05)
+
+    # Measure after warmup, once every client is connected and the server has settled.
+    await asyncio.sleep(max(0.0, measure_from - time.time()))
+    cpu_start, wall_start = server_cpu_seconds(pid), time.time()
+    await asyncio.gather(*tasks)
+    cpu_end, wall = server_cpu_seconds(pid), time.time() - wall_start
+
+    result = {'clients': clients, 'failed': sum(s.failed for s in stats)}
+    for kind in ('normal', 'slow', 'stalled'):
+        group = [s for s in stats if s.kind == kind and not s.failed]
+        if not group:
+            continue
+        expected = sum(max(0.0, s.closed_at - max(s.connected_at, measure_from)) * rate
+                       for s in group)
+        received = sum(s.frames for s in group)
+        result[kind] = {
+            'count': len(group),
+            'latency_ms': percentiles([x for s in group for x in s.latencies], 1000.0),
+            'frames': received,
+            'dropped': max(0, round(expected - received)),
+        }
+    if cpu_start is not None and cpu_end is not None:
+        result['cpu_ms_per_s'] = round((cpu_end - cpu_start) / wall / max(clients, 1) * 1000.0, 4)
+        result['server_cpu_share'] = round((cpu_end - cpu_start) / wall, 3)
+    result['tick_jitter_ms'] = tick_jitter(probe)
+    return result
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def http_post(base: str, path: str) -> None:
+    urllib.request.urlopen(urllib.request.Request(base + path, method='POST'), timeout=10).read()
+
+
+def start_server(port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1',
+         '--port', str(port), '--log-level', 'warning'],
+        cwd=SERVER_DIR,
+    )
+    for _ in range(300):
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=1).read()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("Backend exited during startup")
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("Backend did not come up within 30 s")
+
+
+def print_table(results: list[dict]) -> None:
+    print(f"{'clients':>8} {'kind':>8} {'p50 ms':>9} {'p99 ms':>9} {'dropped':>8} "
+          f"{'cpu ms/s':>9} {'jitter p99':>11}")
+    for r in results:
+        for kind in ('normal', 'slow', 'stalled'):
+            if kind not in r:
+                continue
+            lat = r[kind]['latency_ms']
+            print(f"{r['clients']:>8} {kind:>8} {lat['50'] or '-':>9} {lat['99'] or '-':>9} "
+                  f"{r[kind]['dropped']:>8} {r.get('cpu_ms_per_s', '-'):>9} "
+                  f"{r['tick_jitter_ms']['99'] or '-':>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the KINESIS /ws telemetry path")
+    parser.add_argument("--url", help="existing backend base URL, e.g. http://127.0.0.1:8000; "
+                                      "by default a backend is started on a free local port")
+    parser.add_argument("--clients", default="10,100,500", help="comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds per step")
+    parser.add_argument("--slow-fraction", type=float, default=0.1)
+    parser.add_argument("--stalled-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-delay", type=float, default=0.1,
+                        help="seconds a slow client sleeps after each frame")
+    parser.add_argument("--kind", default="all", choices=("all", "leaderboard", "viewport"),
+                        help="subscription each client makes (see sim.subscriptions)")
+    parser.add_argument("--tier", default="high", choices=tuple(TELEMETRY_TIERS))
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+
+    server = None
+    base = args.url
+    if base is None:
+        port = free_port()
+        server = start_server(port)
+        base = f'http://127.0.0.1:{port}'
+    url = base.replace('http', 'ws', 1) + '/ws'
+
+    if args.kind == 'all':
+        subscribe, rate = None, TELEMETRY_TICK_RATE
+    else:
+        subscribe = {'op': 'subscribe', 'id': 'load', 'kind': args.kind, 'tier': args.tier,
+                     'rect': [-300, -200, 0, 200], 'top_k': 10}
+        rate = TELEMETRY_TIERS[args.tier]
+
+    results = []
+    try:
+        http_post(base, '/start')
+        for clients in (int(c) for c in args.clients.split(',')):
+            results.append(asyncio.run(run_step(url, clients, args, subscribe, rate,
+                                                server.pid if server else None)))
+            print_table(results[-1:])
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        'config': {key: value for key, value in vars(args).items() if key != 'out'},
+        'rate': rate,
+        'host': {'platform': platform.platform(), 'python': platform.python_version(),
+                 'cpus': os.cpu_count()},
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
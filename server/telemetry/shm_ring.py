@@ -0,0 +1,313 @@
+"""
+Shared-memory ring buffer of per-tick agent state for co-located consumers.
+
+The engine publishes each tick's arrays into a named `multiprocessing.shared_memory`
+segment; analytics or broadcast-graphics processes on the same host attach with
+RingReader and read the latest frames as numpy views, without copies, sockets or JSON.
+This module depends only on numpy so consumers can vendor it.
+
+Segment layout (little-endian, every block 64-byte aligned):
+
+    header   magic b'KNSRING1', u32 version, u32 slots, u32 capacity, u32 slot_bytes,
+             u32 writer pid, u64 frames published so far
+    slot i   u64 seqlock, i64 tick, u64 count, u64 frame number, then arrays of
+             `capacity` rows: ids i64, positions f8[2], directions f8[2], speeds f8,
+             flags u8 (FLAG_ACTIVE | FLAG_CRASHED)
+
+Frame n goes to slot n % slots. The writer makes the slot's seqlock odd, writes, then
+makes it even again and only then bumps the published counter, so a reader that sees
+the same even seqlock before and after reading knows the data was not torn. Readers
+never block the writer; a reader that is more than `slots` frames behind loses frames
+(visible as a gap in Frame.frame) rather than slowing the race down.
+
+    with RingReader('kinesis') as reader:
+        frame = reader.wait()
+        centroid = frame.positions.mean(axis=0)
+        if frame.consistent():
+            ...
+"""
+from __future__ import annotations
+
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+MAGIC = b'KNSRING1'
+VERSION = 1
+ALIGNMENT = 64
+_HEADER = struct.Struct('<8sIIII')
+_PID = struct.Struct('<I')
+_PID_OFFSET = _HEADER.size
+_COUNTER_OFFSET = 32
+_SLOT_HEADER_BYTES = 64
+
+# Segments created by RingWriters in this process; see _untrack().
+_WRITER_NAMES: set[str] = set()
+
+FLAG_ACTIVE = 1
+FLAG_CRASHED = 2
+
+# (name, per-row shape, dtype) of each slot's arrays, in layout order.
+FIELDS: tuple[tuple[str, tuple[int, ...], str], ...] = (
+    ('ids', (), '<i8'),
+    ('positions', (2,), '<f8'),
+    ('directions', (2,), '<f8'),
+    ('speeds', (), '<f8'),
+    ('flags', (), 'u1'),
+)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _slot_layout(capacity: int) -> tuple[dict[str, int], int]:
+    offsets = {}
+    offset = _SLOT_HEADER_BYTES
+    for name, shape, dtype in FIELDS:
+        offset = _align(offset)
+        offsets[name] = offset
+        offset += capacity * int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+    return offsets, _align(offset)
+
+
+class _Ring:
+    """Views shared by writer and reader over one mapped segment."""
+
+    __slots__ = ('shm', 'slots', 'capacity', 'counter', 'slot_headers', 'arrays')
+
+    def _map(self, shm: shared_memory.SharedMemory, slots: int, capacity: int) -> None:
+        self.shm = shm
+        self.slots = slots
+        self.capacity = capacity
+        offsets, slot_bytes = _slot_layout(capacity)
+        buf = shm.buf
+        self.counter = np.ndarray((1,), dtype='<u8', buffer=buf, offset=_COUNTER_OFFSET)
+        self.slot_headers = []
+        self.arrays = []
+        for slot in range(slots):
+            base = ALIGNMENT + slot * slot_bytes
+            # [seqlock, tick, count, frame number]
+            self.slot_headers.append(np.ndarray((4,), dtype='<i8', buffer=buf, offset=base))
+            self.arrays.append({
+                name: np.ndarray((capacity,) + shape, dtype=dtype, buffer=buf, offset=base + offsets[name])
+                for name, shape, dtype in FIELDS
+            })
+
+    def _unmap(self) -> None:
+        # Views must go before the mapping can be closed.
+        self.counter = None
+        self.slot_headers = []
+        self.arrays = []
+        self.shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _unlink_stale(name: str) -> None:
+    """
+    Remove a ring segment left behind by a writer that did not shut down cleanly.
+
+    Raises:
+        FileExistsError: If the segment is not a ring, or its writer is still alive;
+            replacing it would silently cut that writer's readers off.
+    """
+    existing = shared_memory.SharedMemory(name=name)
+    try:
+        if existing.size < ALIGNMENT or bytes(existing.buf[:len(MAGIC)]) != MAGIC:
+            raise FileExistsError(f"Shared memory {name!r} exists and is not a KINESIS ring")
+        pid, = _PID.unpack_from(existing.buf, _PID_OFFSET)
+        if pid and _pid_alive(pid):
+            raise FileExistsError(f"Shared memory ring {name!r} is in use by writer pid {pid}")
+    finally:
+        existing.close()
+    existing.unlink()
+
+
+class RingWriter(_Ring):
+    """
+    Creates the segment and publishes frames into it; the engine side.
+
+    A segment of the same name is replaced only if the writer that created it is
+    gone; if it is still running, FileExistsError is raised instead.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, name: str, capacity: int, slots: int = 8):
+        if slots < 2:
+            raise ValueError("A ring needs at least 2 slots so readers can finish one while the next is written")
+        _, slot_bytes = _slot_layout(capacity)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=ALIGNMENT + slots * slot_bytes)
+        except FileExistsError:
+            _unlink_stale(name)
+            shm = shared_memory.SharedMemory(name=name, create=True, size=ALIGNMENT + slots * slot_bytes)
+        _HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, slots, capacity, slot_bytes)
+        _PID.pack_into(shm.buf, _PID_OFFSET, os.getpid())
+        _WRITER_NAMES.add(shm.name)
+        self._map(shm, slots, capacity)
+        self.counter[0] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def publish(self, tick: int, ids: np.ndarray, positions: np.ndarray, directions: np.ndarray,
+                speeds: np.ndarray, active: np.ndarray, crashed: np.ndarray) -> int:
+        """
+        Write one frame and return its frame number.
+
+        Raises:
+            ValueError: If there are more rows than the ring's capacity.
+        """
+        count = len(ids)
+        if count > self.capacity:
+            raise ValueError(f"{count} agents exceed the shared-memory ring capacity of {self.capacity}")
+
+        frame = int(self.counter[0]) + 1
+        slot = frame % self.slots
+        header = self.slot_headers[slot]
+        arrays = self.arrays[slot]
+
+        header[0] += 1  # odd: write in progress
+        arrays['ids'][:count] = ids
+        arrays['positions'][:count] = positions
+        arrays['directions'][:count] = directions
+        arrays['speeds'][:count] = speeds
+        flags = arrays['flags'][:count]
+        np.multiply(active, FLAG_ACTIVE, out=flags, casting='unsafe')
+        flags |= np.asarray(crashed, dtype=np.uint8) * FLAG_CRASHED
+        header[1] = tick
+        header[2] = count
+        header[3] = frame
+        header[0] += 1  # even: stable
+        self.counter[0] = frame
+        return frame
+
+    def close(self) -> None:
+        self._unmap()
+        self.shm.unlink()
+        _WRITER_NAMES.discard(self.shm.name)
+
+
+class Frame:
+    """
+    One published frame as views into the ring. The views stay valid until the writer
+    wraps around to this slot again; call consistent() after reading to confirm that
+    did not happen, or copy() to take a private, verified copy.
+    """
+
+    __slots__ = ('frame', 'tick', 'count', 'ids', 'positions', 'directions', 'speeds',
+                 'flags', '_header', '_seq')
+
+    @property
+    def active(self) -> np.ndarray:
+        return (self.flags & FLAG_ACTIVE) != 0
+
+    @property
+    def crashed(self) -> np.ndarray:
+        return (self.flags & FLAG_CRASHED) != 0
+
+    def consistent(self) -> bool:
+        """True if the slot has not been rewritten since this frame was taken."""
+        return int(self._header[0]) == self._seq
+
+    def copy(self) -> Frame | None:
+        """A private copy of the frame, or None if it was overwritten while copying."""
+        out = Frame.__new__(Frame)
+        out.frame, out.tick, out.count = self.frame, self.tick, self.count
+        for name, _, _ in FIELDS:
+            setattr(out, name, getattr(self, name).copy())
+        if not self.consistent():
+            return None
+        out._header = np.array([self._seq], dtype='<i8')
+        out._seq = self._seq
+        return out
+
+
+class RingReader(_Ring):
+    """Attaches to a writer's segment read-only in spirit; never modifies it."""
+
+    __slots__ = ()
+
+    def __init__(self, name: str):
+        # track=False: the reader must not unlink the writer's segment on exit.
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # Python < 3.13 has no `track`
+            shm = shared_memory.SharedMemory(name=name)
+            _untrack(shm)
+        magic, version, slots, capacity, _ = _HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            shm.close()
+            raise ValueError(f"Shared memory {name!r} is not a version {VERSION} KINESIS ring")
+        self._map(shm, slots, capacity)
+
+    @property
+    def frames_published(self) -> int:
+        return int(self.counter[0])
+
+    def latest(self, retries: int = 8) -> Frame | None:
+        """The most recent complete frame, or None if nothing has been published yet."""
+        for _ in range(retries):
+            number = int(self.counter[0])
+            if number == 0:
+                return None
+            header = self.slot_headers[number % self.slots]
+            seq = int(header[0])
+            if seq & 1:
+                continue
+            frame = Frame.__new__(Frame)
+            frame.frame = int(header[3])
+            frame.tick = int(header[1])
+            frame.count = count = int(header[2])
+            arrays = self.arrays[number % self.slots]
+            for name, _, _ in FIELDS:
+                setattr(frame, name, arrays[name][:count])
+            frame._header = header
+            frame._seq = seq
+            if int(header[0]) == seq:
+                return frame
+        return None
+
+    def wait(self, after: int = 0, timeout: float | None = None, poll: float = 0.001) -> Frame | None:
+        """Block until a frame newer than frame number `after` exists, then return the latest."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.frames_published <= after:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+        return self.latest()
+
+    def close(self) -> None:
+        self._unmap()
+
+
+def _untrack(shm: shared_memory.SharedMemory) -> None:
+    """Stop the resource tracker from unlinking a segment this process only attached to."""
+    if shm.name in _WRITER_NAMES:
+        # Same process as the writer: the registration is the writer's, keep it.
+        return
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except (ImportError, AttributeError, KeyError):
+        pass
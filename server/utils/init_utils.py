@@ -1,7 +1,13 @@
+import math
 import random
+
+import numpy as np
+
 from utils.vector import Vector
+from utils.track_geometry import MID_RADIUS, STRAIGHT_LENGTH, HALF_LAP, position_at, heading_at
 
-from configs.settings import LEFT_RECT_HALF, TRACK_INNER_RADIUS, TRACK_OUTER_RADIUS
+from configs.settings import LEFT_RECT_HALF, TRACK_INNER_RADIUS, TRACK_OUTER_RADIUS, TRACK_LENGTH
+from configs.settings import SPAWN_SPACING, SPAWN_FRONT_ARC
 
 
 def create_initial_position() -> Vector:
@@ -13,3 +19,42 @@ def create_initial_position() -> Vector:
 def random_j_vector() -> Vector:
     y = random.uniform(0, (TRACK_OUTER_RADIUS - TRACK_INNER_RADIUS)/3)
     return Vector(0, y)
+
+
+def grid_slots(spacing: float = SPAWN_SPACING, front: float = SPAWN_FRONT_ARC) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Every slot of a starting grid, ordered from the front row backwards.
+
+    Lanes run parallel to the centerline `spacing` apart, and each lane holds slots
+    `spacing` apart measured along that lane, so lanes on the inside of a bend hold
+    fewer slots instead of packing them closer. The field starts at progress `front`
+    and extends backwards round the track until the grid meets itself.
+
+    Args:
+        spacing: Distance between neighboring slots, at least two agent radii.
+        front: Arc length of the front row.
+
+    Returns:
+        (positions, headings), both (K, 2), in grid order.
+    """
+    half_width = (TRACK_OUTER_RADIUS - TRACK_INNER_RADIUS) / 2.0 - spacing / 2.0
+    lanes = int(2.0 * half_width // spacing) + 1
+    offsets = (np.arange(lanes) - (lanes - 1) / 2.0) * spacing
+
+    arcs, laterals = [], []
+    s_breaks = np.array([0.0, STRAIGHT_LENGTH, HALF_LAP, HALF_LAP + STRAIGHT_LENGTH, TRACK_LENGTH])
+    for lateral in offsets.tolist():
+        # Distance along this lane is the centerline arc length with bends rescaled to
+        # the lane's radius; the map is linear on each straight and bend.
+        bend = math.pi * (MID_RADIUS + lateral)
+        d_breaks = np.array([0.0, STRAIGHT_LENGTH, STRAIGHT_LENGTH + bend,
+                             2.0 * STRAIGHT_LENGTH + bend, 2.0 * (STRAIGHT_LENGTH + bend)])
+        d = np.interp(front % TRACK_LENGTH, s_breaks, d_breaks) - spacing * np.arange(int(d_breaks[-1] // spacing))
+        arcs.append(np.interp(np.mod(d, d_breaks[-1]), d_breaks, s_breaks))
+        laterals.append(np.full(len(d), lateral))
+    arcs = np.concatenate(arcs)
+    laterals = np.concatenate(laterals)
+
+    # Front to back, then inside to outside within a row.
+    order = np.lexsort((laterals, np.mod(front - arcs, TRACK_LENGTH)))
+    return position_at(arcs[order], laterals[order]), heading_at(arcs[order])
@@ -1,20 +1,102 @@
+import atexit
+import copy
+import json
 import logging
-import os 
-from typing import Optional 
+import os
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from configs.settings import LOG_STRUCTURED
+
+# Attributes every LogRecord carries; anything else was passed through `extra=`.
+_RESERVED_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+# One background listener per sink (console or file path), shared by all loggers.
+_listeners: Dict[str, QueueListener] = {}
+_queue_handlers: Dict[str, QueueHandler] = {}
+
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the sink.
+
+    The stdlib prepare() formats the record on the calling thread and clears exc_info,
+    which would both put formatting back on the hot path and hide exceptions from
+    StructuredFormatter. Here only the message arguments are merged; the queue is
+    in-process, so the exception can travel with the record.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def _start_sink(sink: str, target: logging.Handler) -> None:
+    """
+    Start a listener thread writing to `target` and register the queue handler feeding it.
+    Records are enqueued by the caller and formatted/written on the listener thread.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, target, respect_handler_level=True)
+    listener.start()
+
+    _listeners[sink] = listener
+    _queue_handlers[sink] = _RecordQueueHandler(log_queue)
+
+
+def shutdown_logging() -> None:
+    """Flush and stop all background log listeners."""
+    for listener in _listeners.values():
+        listener.stop()
+    _listeners.clear()
+    _queue_handlers.clear()
+
+
+atexit.register(shutdown_logging)
+
 
 def get_logger(
         name: str, log_level : str= 'INFO',
         log_file : Optional[str] = None)-> logging.Logger:
-    
+    """
+    Return a logger whose handlers write on background threads.
+
+    Calling this repeatedly for the same name does not attach duplicate handlers.
+    File sinks receive JSON lines when the `log_structured` setting is on, and text
+    otherwise; the format is per deployment so every logger sharing a file agrees.
+    """
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
     logger.propagate = False
-    
-    console_handler = logging.StreamHandler()
-    console_format = logging.Formatter("{name} - {levelname} - {message}", style = '{')
 
-    console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
+    if 'console' not in _queue_handlers:
+        console_handler = logging.StreamHandler()
+        console_format = logging.Formatter("{name} - {levelname} - {message}", style = '{')
+        console_handler.setFormatter(console_format)
+        _start_sink('console', console_handler)
+    sinks = [_queue_handlers['console']]
 
     base_log_dir = os.path.join(os.path.dirname(__file__), "..", "logs" )
     base_log_dir = os.path.abspath(base_log_dir)
@@ -22,13 +104,59 @@ def get_logger(
     if log_file:
 
         log_file = os.path.join(base_log_dir, log_file)
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        if log_file not in _queue_handlers:
+            os.makedirs(os.path.dirname(log_file), exist_ok=True)
 
-        file_handler = logging.FileHandler(log_file, mode = 'a' , encoding = 'utf-8')
-        file_format = logging.Formatter("{asctime} - {levelname} - {name}:{funcName}:L{lineno}:{message}", style="{")
+            file_handler = logging.FileHandler(log_file, mode = 'a' , encoding = 'utf-8')
+            if LOG_STRUCTURED:
+                file_format = StructuredFormatter()
+            else:
+                file_format = logging.Formatter("{asctime} - {levelname} - {name}:{funcName}:L{lineno}:{message}", style="{")
+            file_handler.setFormatter(file_format)
+            _start_sink(log_file, file_handler)
+        sinks.append(_queue_handlers[log_file])
 
-        file_handler.setFormatter(file_format)
-        logger.addHandler(file_handler)
+    for handler in sinks:
+        if handler not in logger.handlers:
+            logger.addHandler(handler)
 
     return logger
 
+
+class SampledLogger:
+    """
+    Per-key sampled and rate-limited debug logging for per-agent hot paths.
+
+    A record for a given key is emitted on every `sample_every`-th call, and at most
+    once per `min_interval` seconds. The level check happens first, so a disabled
+    logger costs a single cached `isEnabledFor` call.
+    """
+
+    __slots__ = ('logger', 'sample_every', 'min_interval', '_counts', '_last_emit')
+
+    def __init__(self, logger: logging.Logger, sample_every: int = 1, min_interval: float = 0.0):
+        self.logger = logger
+        self.sample_every = max(1, int(sample_every))
+        self.min_interval = min_interval
+        self._counts: Dict[object, int] = {}
+        self._last_emit: Dict[object, float] = {}
+
+    def enabled(self) -> bool:
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def debug(self, key: object, msg: str, *args, **kwargs) -> None:
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        if count % self.sample_every:
+            return
+
+        if self.min_interval > 0.0:
+            now = time.monotonic()
+            if now - self._last_emit.get(key, float('-inf')) < self.min_interval:
+                return
+            self._last_emit[key] = now
+
+        self.logger.debug(msg, *args, stacklevel=2, **kwargs)
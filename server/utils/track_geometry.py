@@ -0,0 +1,128 @@
+"""
+Arc-length coordinates on the stadium-shaped oval.
+
+The centerline runs midway between the inner and outer boundaries: two straights of
+length 2 * LEFT_RECT_HALF at y = +/-MID_RADIUS joined by semicircles centered on
+(+/-LEFT_RECT_HALF, 0). Arc length is 0 at the right-hand end of the top straight and
+grows in the racing direction (right to left along the top, counter-clockwise), reaching
+TRACK_LENGTH back at the start/finish line. Points off the centerline are projected onto
+it, so every position on the track surface has a well-defined progress value.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from configs.settings import LEFT_RECT_HALF, TRACK_INNER_RADIUS, TRACK_OUTER_RADIUS, TRACK_LENGTH
+
+MID_RADIUS = (TRACK_INNER_RADIUS + TRACK_OUTER_RADIUS) / 2.0
+STRAIGHT_LENGTH = 2.0 * LEFT_RECT_HALF
+HALF_LAP = STRAIGHT_LENGTH + math.pi * MID_RADIUS
+
+# Largest ratio of centerline arc length to straight-line distance between two points
+# on the track surface: on the inner edge of a bend an angle covers TRACK_INNER_RADIUS
+# of travel per radian but MID_RADIUS of centerline.
+MAX_ARC_STRETCH = MID_RADIUS / TRACK_INNER_RADIUS
+
+
+def arc_length_xy(x: float, y: float) -> float:
+    """Progress along the centerline for one point, in [0, TRACK_LENGTH)."""
+    rh = LEFT_RECT_HALF
+    if x < -rh:
+        # Left bend: angle from the top of the bend, counter-clockwise.
+        theta = math.atan2(y, x + rh) % (2.0 * math.pi)
+        s = STRAIGHT_LENGTH + MID_RADIUS * min(max(theta - math.pi / 2.0, 0.0), math.pi)
+    elif x > rh:
+        theta = math.atan2(y, x - rh)
+        s = HALF_LAP + STRAIGHT_LENGTH + MID_RADIUS * (theta + math.pi / 2.0)
+    elif y >= 0.0:
+        s = rh - x
+    else:
+        s = HALF_LAP + x + rh
+    return s % TRACK_LENGTH
+
+
+def arc_length(positions: np.ndarray) -> np.ndarray:
+    """Vectorized arc_length_xy over (N, 2) positions."""
+    x = positions[:, 0]
+    y = positions[:, 1]
+    rh = LEFT_RECT_HALF
+
+    left_theta = np.mod(np.arctan2(y, x + rh), 2.0 * np.pi)
+    right_theta = np.arctan2(y, x - rh)
+    s = np.select(
+        [x < -rh, x > rh, y >= 0.0],
+        [STRAIGHT_LENGTH + MID_RADIUS * np.clip(left_theta - np.pi / 2.0, 0.0, np.pi),
+         HALF_LAP + STRAIGHT_LENGTH + MID_RADIUS * (right_theta + np.pi / 2.0),
+         rh - x],
+        default=HALF_LAP + x + rh,
+    )
+    return np.mod(s, TRACK_LENGTH)
+
+
+def arc_distance(a: np.ndarray | float, b: np.ndarray | float) -> np.ndarray | float:
+    """Shortest signed progress from a to b around the loop, in [-L/2, L/2)."""
+    return (b - a + TRACK_LENGTH / 2.0) % TRACK_LENGTH - TRACK_LENGTH / 2.0
+
+
+def position_at(s: np.ndarray, lateral: np.ndarray | float = 0.0) -> np.ndarray:
+    """
+    Inverse of arc_length: (N, 2) positions at progress `s`, offset `lateral` outward
+    from the centerline (positive towards the outer boundary).
+    """
+    s = np.mod(np.asarray(s, dtype=float), TRACK_LENGTH)
+    radius = MID_RADIUS + np.broadcast_to(lateral, s.shape)
+    rh = LEFT_RECT_HALF
+
+    top = s < STRAIGHT_LENGTH
+    left = ~top & (s < HALF_LAP)
+    bottom = ~top & ~left & (s < HALF_LAP + STRAIGHT_LENGTH)
+    right = ~(top | left | bottom)
+
+    out = np.empty(s.shape + (2,))
+    out[top] = np.column_stack([rh - s[top], radius[top]])
+    out[bottom] = np.column_stack([s[bottom] - HALF_LAP - rh, -radius[bottom]])
+    for bend, center_x, start_angle, start_s in ((left, -rh, np.pi / 2.0, STRAIGHT_LENGTH),
+                                                  (right, rh, -np.pi / 2.0, HALF_LAP + STRAIGHT_LENGTH)):
+        theta = start_angle + (s[bend] - start_s) / MID_RADIUS
+        out[bend] = np.column_stack([center_x + radius[bend] * np.cos(theta),
+                                     radius[bend] * np.sin(theta)])
+    return out
+
+
+def heading_at(s: np.ndarray) -> np.ndarray:
+    """(N, 2) unit tangents of the centerline at progress `s`, in the racing direction."""
+    s = np.mod(np.asarray(s, dtype=float), TRACK_LENGTH)
+    out = np.empty(s.shape + (2,))
+    top = s < STRAIGHT_LENGTH
+    left = ~top & (s < HALF_LAP)
+    bottom = ~top & ~left & (s < HALF_LAP + STRAIGHT_LENGTH)
+    right = ~(top | left | bottom)
+
+    out[top] = (-1.0, 0.0)
+    out[bottom] = (1.0, 0.0)
+    for bend, start_angle, start_s in ((left, np.pi / 2.0, STRAIGHT_LENGTH),
+                                       (right, -np.pi / 2.0, HALF_LAP + STRAIGHT_LENGTH)):
+        theta = start_angle + (s[bend] - start_s) / MID_RADIUS
+        out[bend] = np.column_stack([-np.sin(theta), np.cos(theta)])
+    return out
+
+
+def lateral_frame(positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Signed distance from the centerline (positive towards the outer boundary) and the
+    outward unit normal for (N, 2) positions. Uses only arithmetic and sqrt, so results
+    are bit-identical however the positions are batched.
+    """
+    x = positions[:, 0]
+    y = positions[:, 1]
+    rh = LEFT_RECT_HALF
+
+    # Offset from the nearest point of the segment joining the two bend centers.
+    dx = np.where(x < -rh, x + rh, np.where(x > rh, x - rh, 0.0))
+    dist = np.sqrt(dx * dx + y * y)
+    safe = np.where(dist > 0.0, dist, 1.0)
+    normals = np.column_stack([np.where(dist > 0.0, dx / safe, 0.0),
+                               np.where(dist > 0.0, y / safe, 1.0)])
+    return dist - MID_RADIUS, normals
@@ -0,0 +1,274 @@
+"""
+Signed distance field of the track walls, rasterized once and sampled in O(1).
+
+The walls are the ones ttc_to_boundary intersects (straights, slants, the right-hand
+vertical and the four semicircles), compiled here into segment and arc primitives. The
+raster stores the exact distance to the nearest wall at every grid node, and its
+gradient, which points away from that wall. Between nodes values are interpolated
+bilinearly, which is accurate to within one cell because distance is 1-Lipschitz.
+Signed samples are positive on the racing surface between the inner and outer radii
+(see utils.track_geometry) and negative off it; the sign is evaluated exactly rather
+than rasterized, because those legacy walls do not all lie on the surface edge.
+
+Building the raster takes a moment, so it is cached on disk under a name derived from a
+hash of the wall primitives and the resolution: changing either rebuilds it, anything
+else reuses it.
+
+    sdf = get_track_sdf()
+    distance, normals = sdf.sample(positions)   # signed, vectorized over agents
+    if sdf.clear_of_walls(x, y, speed * horizon):
+        bound_ttc = np.inf                       # no wall within reach, skip the exact test
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import os
+
+import numpy as np
+
+from utils.track_geometry import lateral_frame
+
+from configs.settings import (
+    LEFT_RECT_HALF,
+    TRACK_INNER_RADIUS,
+    TRACK_OUTER_RADIUS,
+    RSU1_LENGTH_Y,
+    RS1_LENGTH_X,
+    RU_BOUND_LENGTH_X,
+    RLI_BOUND1_LENGTH_Y,
+    RLO_BOUND1_LENGTH_Y,
+    RL_BOUND1_LENGTH_X,
+    RLI_BOUND2_LENGTH_Y,
+    RLO_BOUND2_LENGTH_Y,
+    RLS2_LENGTH_X,
+    RL_BOUND2_LENGTH_X,
+    RUI_BOUND_LENGTH_Y,
+    RUO_BOUND_LENGTH_Y,
+    TRACK_SDF_RESOLUTION,
+    TRACK_SDF_CACHE_DIR,
+)
+
+# Bump when the raster format or the way it is computed changes.
+SDF_FORMAT = 2
+# Distance the raster extends beyond the outermost wall.
+SDF_PADDING = 20.0
+HALF_WIDTH = (TRACK_OUTER_RADIUS - TRACK_INNER_RADIUS) / 2.0
+
+
+def _slant(m: float, b: float, x0: float, x1: float) -> tuple[float, float, float, float]:
+    """Segment of y = m * x + b between x0 and x1."""
+    return (x0, m * x0 + b, x1, m * x1 + b)
+
+
+def compile_walls() -> tuple[np.ndarray, np.ndarray]:
+    """
+    Wall primitives matching ttc_to_boundary, wall for wall.
+
+    Returns:
+        (segments, arcs): segments (K, 4) as x0, y0, x1, y1; arcs (M, 4) as center x,
+        center y, radius, side, where side -1 keeps the half with x <= center x and +1
+        the half with x >= center x.
+    """
+    rh = LEFT_RECT_HALF
+    ri, ro = TRACK_INNER_RADIUS, TRACK_OUTER_RADIUS
+    lower1_end = RS1_LENGTH_X + RL_BOUND1_LENGTH_X
+    lower2_start = lower1_end + RLS2_LENGTH_X
+    right_x = RS1_LENGTH_X + RU_BOUND_LENGTH_X
+
+    segments = [(-rh, y, 0.0, y) for y in (-ri, ri, -ro, ro)]
+    segments += [
+        (RS1_LENGTH_X, RUI_BOUND_LENGTH_Y, RS1_LENGTH_X + RU_BOUND_LENGTH_X, RUI_BOUND_LENGTH_Y),
+        (RS1_LENGTH_X, RUO_BOUND_LENGTH_Y, RS1_LENGTH_X + RU_BOUND_LENGTH_X + 20, RUO_BOUND_LENGTH_Y),
+        (RS1_LENGTH_X, -RLI_BOUND1_LENGTH_Y, lower1_end, -RLI_BOUND1_LENGTH_Y),
+        (RS1_LENGTH_X, -RLO_BOUND1_LENGTH_Y, lower1_end, -RLO_BOUND1_LENGTH_Y),
+        (lower2_start, -RLI_BOUND2_LENGTH_Y, lower2_start + RL_BOUND2_LENGTH_X, -RLI_BOUND2_LENGTH_Y),
+        (lower2_start, -RLO_BOUND2_LENGTH_Y, lower2_start + RL_BOUND2_LENGTH_X, -RLO_BOUND2_LENGTH_Y),
+        (right_x, -RLI_BOUND2_LENGTH_Y, right_x, RUI_BOUND_LENGTH_Y),
+    ]
+    # Slants, with the slopes and intercepts ttc_to_boundary uses.
+    upper = RSU1_LENGTH_Y / RS1_LENGTH_X
+    lower_inner = (-ri + RLI_BOUND1_LENGTH_Y) / RL_BOUND1_LENGTH_X
+    lower_outer = (-ro + RLO_BOUND1_LENGTH_Y) / RL_BOUND1_LENGTH_X
+    lower2_inner = (-RLI_BOUND1_LENGTH_Y + RLI_BOUND2_LENGTH_Y) / RLS2_LENGTH_X
+    lower2_outer = (-RLO_BOUND1_LENGTH_Y + RLO_BOUND2_LENGTH_Y) / RLS2_LENGTH_X
+    segments += [
+        _slant(upper, ri, 0.0, RS1_LENGTH_X),
+        _slant(upper, ro, 0.0, RS1_LENGTH_X),
+        _slant(lower_inner, -ri, 0.0, RS1_LENGTH_X),
+        _slant(lower_outer, -ro, 0.0, RS1_LENGTH_X),
+        _slant(lower2_inner, -RLI_BOUND2_LENGTH_Y + lower2_inner * lower2_start, lower1_end, lower2_start),
+        _slant(lower2_outer, -RLO_BOUND2_LENGTH_Y + lower2_outer * lower2_start, lower1_end, lower2_start),
+    ]
+    arcs = [(side * rh, 0.0, radius, side) for side in (-1.0, 1.0) for radius in (ri, ro)]
+    return np.array(segments, dtype=float), np.array(arcs, dtype=float)
+
+
+def wall_distance(points: np.ndarray, segments: np.ndarray, arcs: np.ndarray) -> np.ndarray:
+    """Exact unsigned distance from (N, 2) points to the nearest wall primitive."""
+    best = np.full(len(points), np.inf)
+    px = points[:, 0]
+    py = points[:, 1]
+    for x0, y0, x1, y1 in segments:
+        dx, dy = x1 - x0, y1 - y0
+        t = np.clip(((px - x0) * dx + (py - y0) * dy) / max(dx * dx + dy * dy, 1e-12), 0.0, 1.0)
+        np.minimum(best, np.hypot(px - x0 - t * dx, py - y0 - t * dy), out=best)
+    for cx, cy, radius, side in arcs:
+        # Inside the arc's half-plane the nearest point is radial; elsewhere an endpoint.
+        radial = np.abs(np.hypot(px - cx, py - cy) - radius)
+        ends = np.minimum(np.hypot(px - cx, py - cy - radius), np.hypot(px - cx, py - cy + radius))
+        np.minimum(best, np.where((px - cx) * side >= 0.0, radial, ends), out=best)
+    return best
+
+
+def geometry_hash(segments: np.ndarray, arcs: np.ndarray, resolution: float) -> str:
+    """Stable key for a raster: changes whenever the walls or the resolution do."""
+    h = hashlib.sha256()
+    h.update(f"sdf{SDF_FORMAT}:{resolution!r}:{SDF_PADDING!r}:".encode())
+    h.update(np.ascontiguousarray(segments, dtype='<f8').tobytes())
+    h.update(np.ascontiguousarray(arcs, dtype='<f8').tobytes())
+    return h.hexdigest()[:16]
+
+
+class TrackSDF:
+    """
+    Distance to the track walls on a regular grid, with its gradient.
+
+    Attributes:
+        origin: (x, y) of grid node [0, 0].
+        resolution: Grid spacing in meters.
+        distance: (H, W) distance to the nearest wall at each node, row = y, column = x.
+        gradient: (H, W, 2) gradient of `distance`; points away from the nearest wall.
+        key: Geometry hash the raster was built for.
+    """
+
+    __slots__ = ('origin', 'resolution', 'distance', 'gradient', 'key')
+
+    def __init__(self, origin: tuple[float, float], resolution: float, distance: np.ndarray,
+                 gradient: np.ndarray, key: str):
+        self.origin = origin
+        self.resolution = resolution
+        self.distance = distance
+        self.gradient = gradient
+        self.key = key
+
+    @classmethod
+    def build(cls, resolution: float = TRACK_SDF_RESOLUTION) -> TrackSDF:
+        """Rasterize the compiled walls at `resolution` meters per cell."""
+        segments, arcs = compile_walls()
+        x_min = min(segments[:, [0, 2]].min(), (arcs[:, 0] - arcs[:, 2]).min()) - SDF_PADDING
+        x_max = max(segments[:, [0, 2]].max(), (arcs[:, 0] + arcs[:, 2]).max()) + SDF_PADDING
+        y_min = min(segments[:, [1, 3]].min(), (arcs[:, 1] - arcs[:, 2]).min()) - SDF_PADDING
+        y_max = max(segments[:, [1, 3]].max(), (arcs[:, 1] + arcs[:, 2]).max()) + SDF_PADDING
+
+        xs = x_min + resolution * np.arange(int(np.ceil((x_max - x_min) / resolution)) + 1)
+        ys = y_min + resolution * np.arange(int(np.ceil((y_max - y_min) / resolution)) + 1)
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        nodes = np.column_stack([grid_x.ravel(), grid_y.ravel()])
+
+        distance = wall_distance(nodes, segments, arcs).reshape(grid_x.shape)
+        grad_y, grad_x = np.gradient(distance, resolution)
+        return cls((float(xs[0]), float(ys[0])), resolution, distance,
+                   np.stack([grad_x, grad_y], axis=-1), geometry_hash(segments, arcs, resolution))
+
+    def _cells(self, x: np.ndarray, y: np.ndarray):
+        h, w = self.distance.shape
+        fx = np.clip((x - self.origin[0]) / self.resolution, 0.0, w - 1.000001)
+        fy = np.clip((y - self.origin[1]) / self.resolution, 0.0, h - 1.000001)
+        col = fx.astype(np.intp)
+        row = fy.astype(np.intp)
+        return row, col, fx - col, fy - row
+
+    @staticmethod
+    def _lerp(field: np.ndarray, row, col, tx, ty):
+        top = field[row, col] * (1.0 - tx) + field[row, col + 1] * tx
+        bottom = field[row + 1, col] * (1.0 - tx) + field[row + 1, col + 1] * tx
+        return top * (1.0 - ty) + bottom * ty
+
+    def sample(self, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Signed distance and unit wall normal at (N, 2) positions.
+
+        Returns:
+            (distance (N,), normals (N, 2)); distance is negative off the racing
+            surface, normals point away from the nearest wall and are zero where the
+            gradient vanishes (e.g. exactly midway between two walls).
+        """
+        row, col, tx, ty = self._cells(positions[:, 0], positions[:, 1])
+        lateral, _ = lateral_frame(positions)
+        inside = np.abs(lateral) <= HALF_WIDTH
+        distance = np.where(inside, 1.0, -1.0) * self._lerp(self.distance, row, col, tx, ty)
+        gradient = self._lerp(self.gradient, row, col, tx[:, None], ty[:, None])
+        length = np.sqrt(np.einsum('ij,ij->i', gradient, gradient))
+        normals = np.where(length[:, None] > 1e-12, gradient / np.maximum(length, 1e-12)[:, None], 0.0)
+        return distance, normals
+
+    def signed_distance(self, positions: np.ndarray) -> np.ndarray:
+        """Signed distance alone at (N, 2) positions; cheaper than sample()."""
+        row, col, tx, ty = self._cells(positions[:, 0], positions[:, 1])
+        lateral, _ = lateral_frame(positions)
+        distance = self._lerp(self.distance, row, col, tx, ty)
+        return np.where(np.abs(lateral) <= HALF_WIDTH, distance, -distance)
+
+    def wall_distance_xy(self, x: float, y: float) -> float:
+        """Distance to the nearest wall from one point, without array overhead."""
+        h, w = self.distance.shape
+        fx = min(max((x - self.origin[0]) / self.resolution, 0.0), w - 1.000001)
+        fy = min(max((y - self.origin[1]) / self.resolution, 0.0), h - 1.000001)
+        col = int(fx)
+        row = int(fy)
+        tx = fx - col
+        ty = fy - row
+        d = self.distance
+        top = float(d[row, col]) * (1.0 - tx) + float(d[row, col + 1]) * tx
+        bottom = float(d[row + 1, col]) * (1.0 - tx) + float(d[row + 1, col + 1]) * tx
+        return top * (1.0 - ty) + bottom * ty
+
+    def clear_of_walls(self, x: float, y: float, reach: float) -> bool:
+        """
+        True if no wall is within `reach` of (x, y), so a ray of that length cannot
+        hit one and the exact boundary TTC can be skipped. Allows for one cell of
+        interpolation error, so it never skips a real hit.
+        """
+        return self.wall_distance_xy(x, y) > reach + self.resolution
+
+    def on_track(self, positions: np.ndarray, clearance: float = 0.0) -> np.ndarray:
+        """(N,) True for positions on the racing surface at least `clearance` from any wall."""
+        return self.signed_distance(positions) >= clearance + self.resolution
+
+    def save(self, path: str) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, origin=np.array(self.origin), resolution=np.array(self.resolution),
+                     distance=self.distance, gradient=self.gradient, key=np.array(self.key))
+        # Atomic, so concurrent workers never read a half-written cache file.
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> TrackSDF:
+        with np.load(path) as data:
+            return cls(tuple(data['origin'].tolist()), float(data['resolution']),
+                       data['distance'], data['gradient'], str(data['key']))
+
+
+@functools.lru_cache(maxsize=None)
+def get_track_sdf(resolution: float = TRACK_SDF_RESOLUTION,
+                  cache_dir: str | None = TRACK_SDF_CACHE_DIR) -> TrackSDF:
+    """
+    The track SDF at `resolution`, built at most once per process and, with a
+    `cache_dir`, at most once per geometry.
+    """
+    if cache_dir is None:
+        return TrackSDF.build(resolution)
+    segments, arcs = compile_walls()
+    cache_dir = os.path.expanduser(cache_dir)
+    path = os.path.join(cache_dir, f"track_sdf_{geometry_hash(segments, arcs, resolution)}.npz")
+    if os.path.exists(path):
+        try:
+            return TrackSDF.load(path)
+        except (OSError, ValueError, KeyError):
+            pass  # unreadable cache file: rebuild and overwrite it
+    sdf = TrackSDF.build(resolution)
+    os.makedirs(cache_dir, exist_ok=True)
+    sdf.save(path)
+    return sdf
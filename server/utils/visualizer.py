@@ -1,22 +1,53 @@
-import matplotlib.pyplot as plt
-from matplotlib.patches import Circle, Arc
-from matplotlib.animation import FuncAnimation
-from sim.object.agent import Agent
+"""
+Matplotlib views of the oval track.
+
+Live:     python -m utils.visualizer
+Offline:  python -m utils.visualizer --render telemetry/race.json --out race.mp4
+          (an --out without a video extension writes a PNG sequence into that directory)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from typing import Callable, Iterable
+
+import numpy as np
+from matplotlib.animation import FuncAnimation, FFMpegWriter
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import EllipseCollection
+from matplotlib.figure import Figure
+from matplotlib.patches import Arc
+
 from configs.settings import LEFT_RECT_HALF, TRACK_OUTER_RADIUS, TRACK_INNER_RADIUS, AGENT_RADIUS
 
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.mov', '.avi')
+
 
 class OvalVisualizer:
     """
-    Simple matplotlib visualizer for the oval track and agents.
+    Matplotlib visualizer for the oval track and agents.
+
+    All agents are drawn by one EllipseCollection whose offsets are replaced from a
+    position array each frame, so a frame costs one artist update regardless of the
+    field size. Live animation blits that collection over a cached track background.
     """
 
-    def __init__(self, rect_half: float = LEFT_RECT_HALF, r_outer: float = TRACK_OUTER_RADIUS, r_inner: float = TRACK_INNER_RADIUS):
+    def __init__(self, rect_half: float = LEFT_RECT_HALF, r_outer: float = TRACK_OUTER_RADIUS,
+                 r_inner: float = TRACK_INNER_RADIUS, headless: bool = False):
         self.rect_half = rect_half
         self.r_outer = r_outer
         self.r_inner = r_inner
 
-        self.fig, self.ax = plt.subplots(figsize=(10, 6))
-        self.agents_artists = []
+        if headless:
+            # Agg canvas directly: no display, no pyplot global state.
+            self.fig = Figure(figsize=(10, 6))
+            FigureCanvasAgg(self.fig)
+        else:
+            import matplotlib.pyplot as plt
+            self.fig = plt.figure(figsize=(10, 6))
+        self.ax = self.fig.add_subplot()
+        self.agents_artist: EllipseCollection | None = None
 
     # -----------------------------------------------------
     # Track drawing
@@ -51,42 +82,123 @@ class OvalVisualizer:
     # -----------------------------------------------------
     # Agent setup
     # -----------------------------------------------------
-    def init_agents(self, agents: list[Agent]):
-        """Create matplotlib circles for agents."""
-        self.agents_artists.clear()
-
-        for agent in agents:
-            circle = Circle(
-                (agent.position.x, agent.position.y),
-                AGENT_RADIUS,
-                color="C0",
-                alpha=0.8,
-                label=f"Agent {agent.obj_id}",
-            )
-            self.ax.add_patch(circle)
-            self.agents_artists.append(circle)
+    def init_agents(self, positions: np.ndarray) -> EllipseCollection:
+        """Create the single collection that draws every agent."""
+        if self.agents_artist is not None:
+            self.agents_artist.remove()
+
+        diameter = 2 * AGENT_RADIUS
+        self.agents_artist = EllipseCollection(
+            widths=diameter, heights=diameter, angles=0.0, units="xy",
+            offsets=positions.reshape(-1, 2), offset_transform=self.ax.transData,
+            facecolors="C0", alpha=0.8, animated=True,
+        )
+        self.ax.add_collection(self.agents_artist)
+        return self.agents_artist
 
     # -----------------------------------------------------
     # Frame update
     # -----------------------------------------------------
-    def update(self, agents: list[Agent]):
+    def update(self, positions: np.ndarray) -> EllipseCollection:
         """Update agent positions only."""
-        for circle, agent in zip(self.agents_artists, agents):
-            circle.center = (agent.position.x, agent.position.y)
+        self.agents_artist.set_offsets(positions.reshape(-1, 2))
+        return self.agents_artist
 
     # -----------------------------------------------------
     # Run animation
     # -----------------------------------------------------
-    def run(self, agents: list[Agent], update_func, steps: int = 500):
-        """Run animation."""
+    def run(self, positions_func: Callable[[], np.ndarray], update_func: Callable[[], None],
+            steps: int = 500):
+        """
+        Run a live, blitted animation.
+
+        Args:
+            positions_func: Returns the current (N, 2) agent positions.
+            update_func: Advances the simulation by one step.
+            steps: Number of frames.
+        """
+        import matplotlib.pyplot as plt
+
         self._draw_track()
-        self.init_agents(agents)
+        self.init_agents(positions_func())
 
         def animate(_):
             update_func()
-            self.update(agents)
-            return self.agents_artists
+            return (self.update(positions_func()),)
 
-        anim = FuncAnimation(self.fig, animate, frames=steps, interval=60, blit=False)
+        anim = FuncAnimation(self.fig, animate, frames=steps, interval=60, blit=True)
         plt.show()
+        return anim
 
+    # -----------------------------------------------------
+    # Offline rendering
+    # -----------------------------------------------------
+    def render(self, frames: Iterable[np.ndarray], out: str, fps: int = 30, dpi: int = 100) -> int:
+        """
+        Render position frames to a video (by extension, needs ffmpeg) or to a
+        directory of PNGs. Works on the Agg canvas, so no display is required.
+
+        Returns:
+            Number of frames written.
+        """
+        self._draw_track()
+        frames = iter(frames)
+        first = next(frames, None)
+        if first is None:
+            return 0
+        self.init_agents(first)
+        self.agents_artist.set_animated(False)
+
+        count = 0
+        if out.lower().endswith(VIDEO_EXTENSIONS):
+            writer = FFMpegWriter(fps=fps)
+            with writer.saving(self.fig, out, dpi):
+                for positions in _chain(first, frames):
+                    self.update(positions)
+                    writer.grab_frame()
+                    count += 1
+            return count
+
+        os.makedirs(out, exist_ok=True)
+        for positions in _chain(first, frames):
+            self.update(positions)
+            self.fig.savefig(os.path.join(out, f"frame_{count:05d}.png"), dpi=dpi)
+            count += 1
+        return count
+
+
+def _chain(first: np.ndarray, rest: Iterable[np.ndarray]) -> Iterable[np.ndarray]:
+    yield first
+    yield from rest
+
+
+def telemetry_positions(frames: list[dict]) -> Iterable[np.ndarray]:
+    """Yield (N, 2) position arrays from recorded websocket frames."""
+    for frame in frames:
+        yield np.array([agent["position"] for agent in frame["agents"]], dtype=float).reshape(-1, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live or offline KINESIS track viewer")
+    parser.add_argument("--render", help="recorded telemetry JSON to render offline")
+    parser.add_argument("--out", default="race.mp4", help="video file or PNG directory")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--steps", type=int, default=500)
+    args = parser.parse_args()
+
+    if args.render:
+        with open(args.render) as f:
+            frames = json.load(f)
+        count = OvalVisualizer(headless=True).render(telemetry_positions(frames), args.out, args.fps)
+        print(f"Rendered {count} frames to {args.out}")
+        return
+
+    from sim.engine.sim_engine import SimulationEngine
+
+    engine = SimulationEngine()
+    engine.init_agents()
+    OvalVisualizer().run(lambda: engine.world_arrays().positions, engine.update, args.steps)
+
+
+if __name__ == "__main__":
+    main()